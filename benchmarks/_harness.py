@@ -0,0 +1,131 @@
+"""
+Shared loader for the benchmark scripts.
+
+Like the tests, the benchmarks load integration modules standalone (not via
+the package __init__, which pulls in the full Home Assistant stack) with the
+third-party imports stubbed, so the real code paths are timed unchanged.
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+import types
+
+PACKAGE_DIR = os.path.join(os.path.dirname(__file__), "..", "custom_components", "dirigera_platform")
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+def stub_third_party():
+    _stub("websocket", WebSocketApp=object)
+    _stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}))
+    _dir = _stub("dirigera", Hub=object)
+    _dir_dev = _stub("dirigera.devices")
+    _dir_dev_device = _stub("dirigera.devices.device", Room=object)
+    _stub("dirigera.devices.air_purifier", FanModeEnum=str)
+    _dir.devices = _dir_dev
+    _dir_dev.device = _dir_dev_device
+    _ha = _stub("homeassistant")
+    _ha.const = _stub("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+    _ha.components = _stub("homeassistant.components")
+    _ha.components.light = _stub(
+        "homeassistant.components.light",
+        ColorMode=type("ColorMode", (), {"HS": "hs", "COLOR_TEMP": "color_temp"}),
+    )
+    _ha.helpers = _stub(
+        "homeassistant.helpers",
+        device_registry=types.ModuleType("dr"),
+        entity_registry=types.ModuleType("er"),
+        area_registry=types.ModuleType("ar"),
+    )
+    _ha.helpers.aiohttp_client = _stub(
+        "homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None
+    )
+
+
+def load(module_file: str, name: str):
+    stub_third_party()
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PACKAGE_DIR, module_file))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def timeit(fn, repeat: int = 5) -> float:
+    """Best-of-``repeat`` wall time of fn() in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class _Anything(type):
+    """Metaclass for permissive stand-ins: any class attribute exists."""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return name
+
+
+def _permissive(name, **attrs):
+    """Stub module whose unknown attributes are plain placeholder classes."""
+    m = _stub(name, **attrs)
+
+    def __getattr__(attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        value = _Anything(attr, (), {})
+        setattr(m, attr, value)
+        return value
+
+    m.__getattr__ = __getattr__
+    return m
+
+
+def load_integration(module_name: str, package: str = "dirigera_platform_bench"):
+    """Load an integration module that uses relative imports (base_classes,
+    dirigera_lib_patch...) under a synthetic package, with Home Assistant and
+    dirigera replaced by permissive stubs."""
+    stub_third_party()
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    for name in (
+        "homeassistant.core", "homeassistant.components.sensor", "homeassistant.components.binary_sensor",
+        "homeassistant.components.cover", "homeassistant.components.fan", "homeassistant.components.switch",
+        "homeassistant.helpers.entity", "homeassistant.helpers.storage", "homeassistant.helpers.event",
+        "dirigera.devices.blinds", "dirigera.devices.environment_sensor", "dirigera.devices.light_sensor",
+        "dirigera.devices.controller", "dirigera.devices.air_purifier", "dirigera.devices.light",
+        "dirigera.devices.outlet", "dirigera.devices.scene", "dirigera.devices.motion_sensor",
+        "dirigera.devices.open_close_sensor", "dirigera.devices.water_sensor",
+        "dirigera.devices.device", "dirigera.hub", "dirigera.hub.hub", "dirigera.hub.abstract_smart_home_hub",
+        "requests", "requests.adapters",
+    ):
+        _permissive(name)
+    sys.modules["homeassistant.helpers.entity"].DeviceInfo = dict
+    sys.modules["homeassistant.helpers.entity"].Entity = object
+    sys.modules["homeassistant.core"].HomeAssistantError = Exception
+    sys.modules["homeassistant"].core = sys.modules["homeassistant.core"]
+    _permissive("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+    for stubbed in ("homeassistant.components.sensor", "homeassistant.components.binary_sensor",
+                    "homeassistant.components.cover", "homeassistant.components.fan",
+                    "homeassistant.components.switch"):
+        module = sys.modules[stubbed]
+        for base in ("SensorEntity", "BinarySensorEntity", "CoverEntity", "FanEntity", "SwitchEntity"):
+            setattr(module, base, type(base, (), {}))
+
+    if package not in sys.modules:
+        pkg = types.ModuleType(package)
+        pkg.__path__ = [PACKAGE_DIR]
+        sys.modules[package] = pkg
+    return importlib.import_module(f"{package}.{module_name}")
@@ -0,0 +1,61 @@
+"""
+Wait of a light switch press sent while the hub is busy with background work.
+
+A reconnect resync, discovery and a round of polls put 24 requests in front
+of the hub, which slows down as more requests run in parallel (150 ms each,
+plus 120 ms per other request in flight). A command arrives 50 ms later.
+Compares the old first-come-first-served semaphore with the hub_scheduler
+lanes.
+
+    python benchmarks/bench_command_latency.py
+"""
+import asyncio
+import time
+
+from _harness import load_integration
+
+lib = load_integration("dirigera_lib_patch")
+
+BACKGROUND = 24
+
+
+class SimulatedHub:
+    def __init__(self):
+        self.in_flight = 0
+
+    async def answer(self):
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(0.15 + 0.12 * (self.in_flight - 1))
+        finally:
+            self.in_flight -= 1
+
+
+async def run(make_slot):
+    hub = SimulatedHub()
+
+    async def request(lane):
+        with lib.request_priority(lane):
+            async with make_slot():
+                await hub.answer()
+
+    lanes = [lib.PRIORITY_BULK, lib.PRIORITY_DISCOVERY, lib.PRIORITY_POLL]
+    background = [asyncio.ensure_future(request(lanes[i % 3])) for i in range(BACKGROUND)]
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await request(lib.PRIORITY_COMMAND)
+    command_wait = time.perf_counter() - start
+    await asyncio.gather(*background)
+    return command_wait
+
+
+async def main():
+    semaphore = asyncio.Semaphore(lib.HubX.POOL_SIZE)
+    scheduler = lib.hub_scheduler(lib.HubX.POOL_SIZE)
+    print(f"{BACKGROUND} background requests, then one command")
+    for name, make_slot in (("semaphore", lambda: semaphore), ("hub_scheduler", scheduler.slot)):
+        print(f"{name:>14}: command answered after {await run(make_slot) * 1000:6.0f} ms")
+    print(f"hub_scheduler limit after the burst: {scheduler.limit}")
+
+
+asyncio.run(main())
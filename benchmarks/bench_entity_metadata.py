@@ -0,0 +1,104 @@
+"""
+CPU cost of the entity metadata HA reads on every state write.
+
+Builds a hub of outlets with power monitoring (one device, a switch and
+seven sensors each) plus split-device environment sensors, then times reading
+unique_id, name and device_info for every entity, as one state write per
+entity would, plus the device name (the device's own entity name for
+controllers, and what every poll logs). Compares computing them on every
+read (the old behaviour) with the per-device metadata cache and the unique_id
+fixed at construction.
+
+    python benchmarks/bench_entity_metadata.py
+"""
+import logging
+import types
+
+from _harness import load_integration, timeit
+
+base = load_integration("base_classes")
+
+OUTLETS = 100
+ENV_SENSORS = 50
+ROUNDS = 20
+
+
+class Attributes(types.SimpleNamespace):
+    def dict(self):
+        return dict(vars(self))
+
+
+class Hub:
+    websocket_base_url = "wss://bench-metadata/v1"
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: None
+
+
+def _json(uid, relation_id=None, **attributes):
+    return types.SimpleNamespace(
+        id=uid, relation_id=relation_id, is_reachable=True,
+        room=types.SimpleNamespace(id="room-1", name="Kitchen"),
+        attributes=Attributes(custom_name=f"name {uid}", manufacturer="IKEA", model="model",
+                              firmware_version="1.0", **attributes),
+    )
+
+
+def build():
+    base.hub_event_listener.device_registry.clear()
+    hub = Hub()
+    entities = []
+    for i in range(OUTLETS):
+        device = base.ikea_outlet_device(None, hub, _json(f"plug-{i}_1", f"rel-plug-{i}", is_on=True,
+                                                             current_amps=0.1, current_active_power=1.0))
+        entities.append(base.ikea_outlet_switch_sensor(device))
+        for cls in (base.current_amps_sensor, base.current_active_power_sensor, base.current_voltage_sensor,
+                    base.total_energy_consumed_sensor, base.energy_consumed_at_last_reset_sensor,
+                    base.time_of_last_energy_reset_sensor, base.total_energy_consumed_last_updated_sensor):
+            entities.append(cls(device))
+    for i in range(ENV_SENSORS):
+        for half in (1, 2):
+            device = base.ikea_vindstyrka_device(None, hub, _json(f"env-{i}_{half}", f"rel-env-{i}",
+                                                                  current_temperature=21.0))
+            entities.append(base.ikea_vindstyrka_temperature(device))
+    return entities
+
+
+def _uncached_metadata(self, key, compute):
+    return compute()
+
+
+def _uncached_unique_id(self):
+    return self._device.unique_id + self._id_suffix
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    entities = build()
+
+    def run():
+        for _ in range(ROUNDS):
+            for entity in entities:
+                entity.unique_id
+                entity.name
+                entity.device_info
+                entity._device.name
+
+    writes = ROUNDS * len(entities)
+    device_cls, sensor_cls = base.ikea_base_device, base.ikea_base_device_sensor
+    current = (device_cls._cached_metadata, sensor_cls.unique_id)
+    results = {}
+    for name, (cached_metadata, unique_id) in (
+        ("old", (_uncached_metadata, property(_uncached_unique_id))),
+        ("current", current),
+    ):
+        device_cls._cached_metadata, sensor_cls.unique_id = cached_metadata, unique_id
+        results[name] = timeit(run)
+    device_cls._cached_metadata, sensor_cls.unique_id = current
+    print(f"metadata: {len(entities)} entities")
+    for name, best in results.items():
+        print(f"{name:>8}: {best * 1e6 / writes:5.2f} us per state write")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Per-event CPU cost of hub_event_listener.on_message.
+
+Replays a representative mix of hub frames (outlet power readings, light
+commands, environment sensor readings and multi-button remote presses)
+through on_message and the coalescing flush, with HA stubbed out, and prints
+the mean cost per event. Compares the old decoding, which ran to_snake_case
+and a list scan per attribute per frame and formatted its debug lines (the
+device model twice per attribute) even with debug logging off, with the
+import-time decoder tables and lazy logging.
+
+The stand-in device models render cheaply. pydantic models do not, so the
+real old cost was higher than shown here.
+
+    python benchmarks/bench_event_decoding.py
+"""
+import json
+import logging
+import types
+
+from _harness import load, timeit
+
+hel = load("hub_event_listener.py", "hel_bench_decode")
+hub_event_listener = hel.hub_event_listener
+registry_entry = hel.registry_entry
+
+HUB_KEY = "wss://bench/v1"
+ROUNDS = 2000
+
+
+class Hub:
+    websocket_base_url = HUB_KEY
+
+
+class Hass:
+    bus = types.SimpleNamespace(fire=lambda **kw: None)
+
+    def async_create_task(self, coro):
+        coro.close()
+
+
+class Entity:
+    def __init__(self, uid, **attributes):
+        self.unique_id = uid
+        self.registry_entry = types.SimpleNamespace(device_id=uid, entity_id=f"sensor.{uid}")
+        self._json_data = types.SimpleNamespace(
+            id=uid, relation_id=None, is_reachable=True, room=None,
+            attributes=types.SimpleNamespace(custom_name=uid, **attributes),
+        )
+
+    def schedule_update_ha_state(self, force_refresh=False):
+        pass
+
+
+def _state(dev_id, device_type, **attributes):
+    return json.dumps({"type": "deviceStateChanged",
+                       "data": {"id": dev_id, "deviceType": device_type, "attributes": attributes}})
+
+
+FRAMES = [
+    _state("plug_1", "outlet", currentActivePower=91.5, currentAmps=0.41, currentVoltage=230.2),
+    _state("plug_1", "outlet", totalEnergyConsumed=12.5, totalEnergyConsumedLastUpdated="2026-10-18T10:00:00.000Z"),
+    _state("lamp_1", "light", isOn=True, lightLevel=40, colorTemperature=2700),
+    _state("lamp_1", "light", colorHue=120.0, colorSaturation=0.8),
+    _state("env_1", "environmentSensor", currentTemperature=21.5, currentRH=45, currentPM25=3, vocIndex=100),
+    json.dumps({"type": "remotePressEvent", "data": {"id": "remote-ab12_2", "clickPattern": "singlePress"}}),
+]
+
+
+class _LegacyDecoders:
+    """The old per-attribute decoding: a list scan and a regex per lookup."""
+
+    def __init__(self, keys):
+        self._keys = list(keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return hel.to_snake_case(key), hel.attribute_converters.get(key)
+
+
+class _EagerLogger:
+    """The old f-string log lines: formatted whether or not debug is on."""
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def debug(self, msg, *args):
+        if args:
+            msg % args
+
+    def __getattr__(self, name):
+        return getattr(self._logger, name)
+
+
+def _legacy_tables():
+    return {
+        "event_decoders": {dt: _LegacyDecoders(keys) for dt, keys in hel.process_events_from.items()},
+        "attribute_decoders": _LegacyDecoders(hel.attribute_decoders),
+        "logger": _EagerLogger(hel.logger),
+    }
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    hub_event_listener.device_registry.clear()
+    for uid, attrs in (
+        ("plug_1", dict(is_on=True, current_active_power=0, current_amps=0, current_voltage=0,
+                        total_energy_consumed=0, total_energy_consumed_last_updated=None)),
+        ("lamp_1", dict(is_on=False, light_level=1, color_temperature=0, color_hue=0, color_saturation=0)),
+        ("env_1", dict(current_temperature=0, current_r_h=0, current_p_m25=0, voc_index=0)),
+        ("remote-ab12_1", dict()),
+    ):
+        hub_event_listener.register(HUB_KEY, uid, registry_entry(Entity(uid, **attrs)))
+
+    listener = hub_event_listener(Hub(), Hass())
+    loop = listener._loop
+    flush = getattr(listener, "_flush_pending_states", None)
+
+    def run():
+        for _ in range(ROUNDS):
+            for frame in FRAMES:
+                listener.on_message(None, frame)
+            hel.controller_trigger_last_time_map.clear()
+            if flush is not None:
+                flush()
+        # drain any call_soon_threadsafe callbacks the run queued
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+
+    events = ROUNDS * len(FRAMES)
+    current = {name: getattr(hel, name) for name in ("event_decoders", "attribute_decoders", "logger")}
+    results = {}
+    for name, tables in (("old", _legacy_tables()), ("current", current)):
+        for attr, value in tables.items():
+            setattr(hel, attr, value)
+        results[name] = timeit(run)
+    for attr, value in current.items():
+        setattr(hel, attr, value)
+    print(f"on_message: {events} events")
+    for name, best in results.items():
+        print(f"{name:>8}: {best * 1e6 / events:6.2f} us/event")
+
+
+if __name__ == "__main__":
+    main()
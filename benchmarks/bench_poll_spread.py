@@ -0,0 +1,64 @@
+"""
+Hub requests per second from the poll cycles of several hubs.
+
+Simulates ten minutes of a WebSocket outage, the heaviest polling there is:
+every cycle of every hub fetches /devices and /scenes. Compares cycles on
+HA's shared interval tick, where every hub fires in the same instant, with
+the staggered schedule (poll_phases and next_slot, plus the jitter
+hub_poll_coordinator adds to each start).
+
+    python benchmarks/bench_poll_spread.py
+"""
+import collections
+import random
+
+from _harness import load
+
+pc = load("poll_coordinator.py", "poll_coordinator_bench")
+
+HUBS = 4
+MINUTES = 10
+REQUESTS_PER_CYCLE = 2
+
+
+def aligned():
+    times = []
+    for _ in range(HUBS):
+        times += [k * pc.POLL_INTERVAL for k in range(MINUTES * 60 // pc.POLL_INTERVAL)]
+    return times
+
+
+def staggered():
+    phases = pc.poll_phases()
+    hubs = [f"hub {i}" for i in range(HUBS)]
+    for hub in hubs:
+        phases.join(hub)
+    times = []
+    for hub in hubs:
+        slot = None
+        now = 0.0
+        while True:
+            after = None if slot is None else slot + pc.POLL_INTERVAL / 2
+            slot = pc.next_slot(now, phases.phase(hub), after)
+            now = max(now, slot + random.uniform(-pc.POLL_JITTER, pc.POLL_JITTER) * pc.POLL_INTERVAL)
+            if now >= MINUTES * 60:
+                break
+            times.append(now)
+    return times
+
+
+def profile(cycle_starts):
+    per_second = collections.Counter(int(t) for t in cycle_starts for _ in range(REQUESTS_PER_CYCLE))
+    return max(per_second.values()), len(per_second)
+
+
+def main():
+    random.seed(25)
+    print(f"{HUBS} hubs, {MINUTES} minutes of outage, {REQUESTS_PER_CYCLE} requests per cycle")
+    for name, schedule in (("aligned", aligned), ("staggered", staggered)):
+        peak, busy = profile(schedule())
+        print(f"{name:>10}: peak {peak:2d} requests in one second, requests in {busy:3d} distinct seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Hub requests for a simulated slider drag on one light.
+
+The UI fires a brightness service call every 25 ms while the slider moves.
+The simulated hub takes 80-200 ms per PATCH and applies each one when it
+completes, so concurrent writes can land out of order. Compares sending each
+call as its own PATCH (the old behaviour) with the per-device command queue.
+
+    python benchmarks/bench_slider_drag.py
+"""
+import asyncio
+import random
+
+from _harness import load
+
+device_command_queue = load("command_queue.py", "command_queue_bench").device_command_queue
+
+STEPS = 40
+STEP_INTERVAL = 0.025
+
+
+class SimulatedHub:
+    def __init__(self, seed):
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.level = None
+        self.applied = []
+
+    async def patch(self, attributes, options=None):
+        self.requests += 1
+        await asyncio.sleep(self._random.uniform(0.08, 0.2))
+        self.level = attributes["lightLevel"]
+        self.applied.append(self.level)
+
+
+async def drag(submit):
+    calls = []
+    for step in range(1, STEPS + 1):
+        calls.append(asyncio.ensure_future(submit({"lightLevel": round(step * 100 / STEPS)})))
+        await asyncio.sleep(STEP_INTERVAL)
+    await asyncio.gather(*calls)
+
+
+def walk_backs(applied):
+    return sum(1 for before, after in zip(applied, applied[1:]) if after < before)
+
+
+async def main():
+    print(f"slider drag: {STEPS} service calls, one every {STEP_INTERVAL * 1000:.0f} ms, hub 80-200 ms per PATCH")
+    for name, make_submit in (
+        ("one PATCH per call", lambda hub: hub.patch),
+        ("command queue", lambda hub: device_command_queue(hub.patch).submit),
+    ):
+        hub = SimulatedHub(seed=7)
+        await drag(make_submit(hub))
+        print(f"{name:>20}: {hub.requests:3d} hub requests, final level {hub.level:3d}, "
+              f"{walk_backs(hub.applied)} walk-backs")
+
+
+asyncio.run(main())
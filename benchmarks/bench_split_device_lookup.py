@@ -0,0 +1,58 @@
+"""
+CPU cost of the by-id lookups behind outlet and environment sensor polls.
+
+Seeds a HubX devices snapshot with outlets that report energy through a
+linked electricalSensor (GRILLPLATS / TOFSMYGGA) plus split-device
+environment sensors (TIMMERFLOTTE), then times one poll round: a power event
+for every plug followed by get_outlet_by_id / get_environment_sensor_by_id
+for every device, as the entity refreshes do.
+
+    python benchmarks/bench_split_device_lookup.py
+"""
+from _harness import load_integration, timeit
+
+lib = load_integration("dirigera_lib_patch")
+# The models are dirigera pydantic classes; the merge, not their
+# construction, is what is timed here.
+lib.dict_to_outlet = lambda data, client: data
+lib.dict_to_environment_sensor = lambda data, client: data
+
+OUTLETS = 150
+ENV_SENSORS = 25
+ROUNDS = 5
+
+
+def _device(uid, type_, device_type, relation_id, **attributes):
+    return {"id": uid, "type": type_, "deviceType": device_type, "relationId": relation_id,
+            "attributes": {"customName": uid, **attributes}}
+
+
+def build():
+    devices = []
+    for i in range(OUTLETS):
+        devices.append(_device(f"plug-{i}_1", "outlet", "outlet", f"rel-plug-{i}", isOn=True))
+        devices.append(_device(f"plug-{i}_2", "sensor", "electricalSensor", f"rel-plug-{i}",
+                               currentAmps=0.1, currentActivePower=20.0, currentVoltage=230.0))
+    for i in range(ENV_SENSORS):
+        devices.append(_device(f"env-{i}_1", "sensor", "environmentSensor", f"rel-env-{i}", currentTemperature=21.0))
+        devices.append(_device(f"env-{i}_2", "sensor", "environmentSensor", f"rel-env-{i}", currentRH=40))
+    hub = object.__new__(lib.HubX)
+    hub.devices_snapshot = lib.devices_snapshot(ttl=1e9)
+    hub.devices_snapshot.seed(devices)
+    return hub
+
+
+def poll_round(hub):
+    for i in range(OUTLETS):
+        hub.devices_snapshot.apply_state({"id": f"plug-{i}_2", "attributes": {"currentActivePower": 21.0 + i}})
+    for i in range(OUTLETS):
+        assert hub.get_outlet_by_id(f"plug-{i}_1")["attributes"]["currentActivePower"] == 21.0 + i
+    for i in range(ENV_SENSORS):
+        hub.get_environment_sensor_by_id(f"env-{i}_1")
+
+
+hub = build()
+lookups = OUTLETS + ENV_SENSORS
+elapsed = timeit(lambda: [poll_round(hub) for _ in range(ROUNDS)])
+print(f"{lookups} by-id lookups per round, {ROUNDS} rounds")
+print(f"{elapsed / (ROUNDS * lookups) * 1e6:.1f} us per lookup (incl. one state event per plug)")
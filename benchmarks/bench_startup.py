@@ -0,0 +1,95 @@
+"""
+Per-device construction cost at startup.
+
+Builds a hub of lights, outlets, blinds and sensors the way make_devices does
+and times one ikea_base_device construction. Compares the old
+induce_properties, which serialised the attributes with .dict(), formatted a
+debug line per key and re-created every property on every construction, with
+the current one, which only makes properties for attribute names it has not
+seen yet.
+
+The stand-in attributes serialise with a plain dict copy. pydantic's .dict()
+costs more, so the real old cost was higher than shown here.
+
+    python benchmarks/bench_startup.py
+"""
+import types
+
+from _harness import load_integration, timeit
+
+base = load_integration("base_classes")
+
+DEVICES = 400
+
+_COMMON = dict(manufacturer="IKEA", model="model", firmware_version="1.0", hardware_version="1",
+               serial_number="0", product_code="E0000", ota_status="upToDate", ota_state="readyToCheck",
+               ota_progress=0, ota_policy="autoUpdate", ota_schedule_start="00:00", ota_schedule_end="00:00",
+               identify_period=0, identify_started=None, permitting_join=False)
+
+
+class Attributes(types.SimpleNamespace):
+    def dict(self):
+        return dict(vars(self))
+
+
+class Hub:
+    websocket_base_url = "wss://bench-startup/v1"
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: None
+
+
+def _json(uid, **attributes):
+    return types.SimpleNamespace(
+        id=uid, relation_id=None, is_reachable=True,
+        room=types.SimpleNamespace(id="room-1", name="Kitchen"),
+        attributes=Attributes(custom_name=f"name {uid}", **_COMMON, **attributes),
+    )
+
+
+_KINDS = (
+    (base.ikea_outlet_device, dict(is_on=True, current_amps=0.1, current_active_power=1.0, current_voltage=230.0,
+                                   total_energy_consumed=1.0, startup_on_off="startOn", status_light=True,
+                                   child_lock=False)),
+    (base.ikea_blinds_device, dict(blinds_current_level=0, blinds_target_level=0, blinds_state="stopped",
+                                   battery_percentage=80)),
+    (base.ikea_motion_sensor_device, dict(is_on=False, battery_percentage=80, is_detected=False)),
+    (base.ikea_vindstyrka_device, dict(current_temperature=21.0, current_r_h=40, current_p_m25=3,
+                                       max_measured_p_m25=5, min_measured_p_m25=1, voc_index=100)),
+)
+
+
+def _payloads():
+    return [(_KINDS[i % len(_KINDS)][0], _json(f"dev-{i}_1", **_KINDS[i % len(_KINDS)][1]))
+            for i in range(DEVICES)]
+
+
+def _legacy_induce_properties(class_to_induce, attributes):
+    attr = attributes.dict()
+    for key in attr.keys():
+        base.logger.debug(f"Inducing class {class_to_induce.__name__} property {key} : value {attr[key]}")
+        base.make_property(class_to_induce, key)
+
+
+def build(payloads):
+    base.hub_event_listener.device_registry.clear()
+    hub = Hub()
+    for cls, json_data in payloads:
+        cls(None, hub, json_data)
+
+
+def main():
+    payloads = _payloads()
+    current = base.induce_properties
+    results = {}
+    for name, induce in (("old", _legacy_induce_properties), ("current", current)):
+        base.induce_properties = induce
+        results[name] = timeit(lambda: build(payloads))
+    base.induce_properties = current
+    print(f"{DEVICES} devices")
+    for name, best in results.items():
+        print(f"{name:>8}: {best * 1e6 / DEVICES:7.2f} us per device, {best * 1000:6.1f} ms in total")
+
+
+if __name__ == "__main__":
+    main()
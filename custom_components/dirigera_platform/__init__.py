@@ -1,10 +1,10 @@
 """Platform for IKEA dirigera hub integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 
-from dirigera import Hub 
-from .dirigera_lib_patch import HubX
+from .dirigera_lib_patch import HubX, AsyncHubX, HackScene, async_reconcile_empty_scenes
 
 from .ikea_gateway import ikea_gateway
 
@@ -17,11 +17,25 @@ from homeassistant.const import CONF_IP_ADDRESS, CONF_TOKEN, Platform
 
 # Import the device class from the component that you want to support
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, CONF_HIDE_DEVICE_SET_BULBS, PLATFORM, DISCOVERY_COORDINATOR
-from .hub_event_listener import hub_event_listener
+from .const import (
+    DOMAIN,
+    CONF_HIDE_DEVICE_SET_BULBS,
+    PLATFORM,
+    DISCOVERY_COORDINATOR,
+    CONF_LISTENER_MODE,
+    DEFAULT_LISTENER_MODE,
+    LISTENER_MODE_THREAD,
+    CONF_EVENT_COALESCE_WINDOW,
+    DEFAULT_EVENT_COALESCE_WINDOW,
+)
+from .hub_event_listener import hub_event_listener, async_hub_event_listener
 from .device_discovery import DeviceDiscoveryCoordinator, set_discovery_coordinator
+from .inventory_store import inventory_store
+from .poll_coordinator import hub_poll_coordinator
+from .scene import hub_scenes
 
 PLATFORMS_TO_SETUP = [  Platform.SWITCH, 
                         Platform.BINARY_SENSOR, 
@@ -201,7 +215,13 @@ async def async_setup_entry(
     hass.data[DOMAIN][entry.entry_id] = hass_data
 
     hass_data = dict(entry.data)
+    # One client (and so one keep-alive connection pool) per hub, shared by
+    # setup, every platform, the event listener and unload.
     hub = HubX(hass_data[CONF_TOKEN], hass_data[CONF_IP_ADDRESS])
+    # Entity commands and polls await this one on the loop; HA's shared
+    # session is closed by HA itself, so unload has nothing to release.
+    hub.async_client = AsyncHubX(hub, async_get_clientsession(hass, verify_ssl=False))
+    hass.data[DOMAIN][entry.entry_id]["hub"] = hub
     
     # Lets get all kinds that we are interested in one go and create the devices
     # such that the platform can go ahead and add the associated sensors
@@ -210,15 +230,23 @@ async def async_setup_entry(
     # A second hub entry used to clobber the first here, so one hub's devices
     # vanished and the two entries collided on duplicate IDs (multi-hub support).
     hass.data[DOMAIN][entry.entry_id]["gateway"] = platform
+    # With the inventory stored by the last run, entities come up at once
+    # instead of waiting for the hub (20 s or more after a power cut); they
+    # are checked against the hub in the background (_async_refresh_inventory).
+    store = inventory_store(hass, entry.entry_id)
+    stored = await store.async_load()
     logger.debug("Starting make_devices...")
     try:
-        await platform.make_devices(hass,hass_data[CONF_IP_ADDRESS], hass_data[CONF_TOKEN])
+        inventory = await platform.make_devices(hass, hub, stored)
     except (ConnectionError, OSError) as err:
+        hub.close()
         raise ConfigEntryNotReady(
             f"Cannot connect to IKEA Dirigera hub at {hass_data[CONF_IP_ADDRESS]}: {err}"
         ) from err
-    
-    #await hass.async_add_executor_job(platform.make_devices,hass, hass_data[CONF_IP_ADDRESS], hass_data[CONF_TOKEN])
+    if stored is None:
+        entry.async_create_background_task(
+            hass, store.async_save(inventory["devices"], inventory["scenes"]), f"{DOMAIN} inventory save"
+        )
 
     # Initialize the discovery coordinator BEFORE platform setup
     # so platforms can register their callbacks during async_setup_entry
@@ -228,14 +256,23 @@ async def async_setup_entry(
     hass.data[DOMAIN][entry.entry_id]["discovery"] = discovery
     logger.debug("Device discovery coordinator initialized")
 
+    # Scene entities follow the hub's scene events
+    scenes = hub_scenes(hass, hub, platform)
+    hass.data[DOMAIN][entry.entry_id]["scenes"] = scenes
+
     # Setup the entities - each platform will register its callback with discovery coordinator
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS_TO_SETUP)
 
     # Now lets start the event listener
-    hub_basic = Hub(hass_data[CONF_TOKEN], hass_data[CONF_IP_ADDRESS])
-
     if hass_data[CONF_IP_ADDRESS] != "mock":
-        hub_events = hub_event_listener(hub_basic, hass, discovery)
+        # The asyncio listener runs on HA's loop; the threaded one is kept as
+        # a fallback selectable via the listener_mode option.
+        listener_mode = hass_data.get(CONF_LISTENER_MODE, DEFAULT_LISTENER_MODE)
+        listener_cls = hub_event_listener if listener_mode == LISTENER_MODE_THREAD else async_hub_event_listener
+        coalesce_window = hass_data.get(CONF_EVENT_COALESCE_WINDOW, DEFAULT_EVENT_COALESCE_WINDOW) / 1000
+        hub_events = listener_cls(hub, hass, discovery, coalesce_window, scenes)
+        if platform.stale:
+            hub_events.resync_on_first_open()
         hub_events.start()
         try:
             # Sync device names and areas from Dirigera to HA device registry
@@ -245,16 +282,69 @@ async def async_setup_entry(
         except Exception:
             # Setup is about to fail — without this, the listener thread kept
             # running and every ConfigEntryNotReady retry started another one.
-            await hass.async_add_executor_job(hub_events.stop)
+            await hub_events.async_stop()
             raise
         # Per-entry storage instead of a module global: a second hub entry no
         # longer clobbers the first listener, and unload stops the right one.
         hass.data[DOMAIN][entry.entry_id]["hub_events"] = hub_events
 
+        # One poll cycle for the hub's silent devices, and for everything
+        # while the WebSocket is down, instead of HA polling each entity
+        # (see poll_coordinator)
+        poller = hub_poll_coordinator(hass, hub, lambda: _registered_devices(hub), scenes, hub_events.disconnected_for)
+        # Staggered against the other hubs' cycles, not on HA's scan tick
+        poller.start()
+        entry.async_on_unload(poller.stop)
+        hass.data[DOMAIN][entry.entry_id]["poller"] = poller
+
+    if platform.stale:
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_inventory(hass, hub, platform, store, discovery, stored),
+            f"{DOMAIN} inventory refresh",
+        )
+
     logger.debug("Complete async_setup_entry...")
 
     return True
 
+# Seconds between attempts to reach a hub that is not answering yet
+INVENTORY_RETRY_DELAY = 5
+INVENTORY_RETRY_MAX_DELAY = 300
+
+def _registered_devices(hub: HubX) -> list:
+    """The devices registered for events on ``hub``, each once: a device
+    rebound under several ids (see sensor.py) has an entry per id."""
+    index = hub_event_listener.get_device_index(hub.websocket_base_url)
+    return list(dict.fromkeys(reg_entry.entity for reg_entry in index.snapshot().values()))
+
+async def _async_refresh_inventory(hass, hub: HubX, platform: ikea_gateway, store: inventory_store,
+                                   discovery: DeviceDiscoveryCoordinator, stored: dict) -> None:
+    """Second half of a start from the stored inventory: wait for the hub,
+    store its live inventory, add the devices that appeared meanwhile and
+    reconcile the empty scenes. Device states are caught up by the event
+    listener's resync on its first connect."""
+    client = hub.async_client
+    delay = INVENTORY_RETRY_DELAY
+    while True:
+        try:
+            with client.priority(client.BULK):
+                devices, scenes = await asyncio.gather(client.get("/devices"), client.get("/scenes"))
+            break
+        except Exception as ex:
+            logger.info(f"Hub inventory not available yet ({ex}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, INVENTORY_RETRY_MAX_DELAY)
+
+    platform.stale = False
+    await store.async_save(devices, scenes)
+    stored_ids = {device["id"] for device in stored["devices"]}
+    added = await discovery.discover_devices([d for d in devices if d["id"] not in stored_ids])
+    logger.info(f"Hub inventory refreshed, {added} new devices")
+    await async_reconcile_empty_scenes(
+        hass, hub, platform.empty_scene_clicks, [HackScene.make_scene(hub, scene) for scene in scenes]
+    )
+
 async def options_update_listener(
     hass: core.HomeAssistant, config_entry: config_entries.ConfigEntry
 ):
@@ -272,20 +362,18 @@ async def async_unload_entry(
 
     entry_data = hass.data[DOMAIN].get(entry.entry_id, {})
 
-    # Stop the listener. stop() joins the websocket thread (worst case the
-    # full reconnect backoff), so run it in the executor — calling it
-    # directly used to freeze the event loop during unload/reload.
+    # Stop the listener. async_stop() never blocks the loop: the threaded
+    # listener joins its thread in the executor, the asyncio one cancels
+    # its task.
     hub_events = entry_data.get("hub_events")
     if hub_events is not None:
-        await hass.async_add_executor_job(hub_events.stop)
+        await hub_events.async_stop()
 
-    hass_data = dict(entry.data)
-    hub = HubX(hass_data[CONF_TOKEN], hass_data[CONF_IP_ADDRESS])
-
-    # For each controller if there is an empty scene delete it
-    logger.debug("In unload so forcing delete of scenes...")
-    await hass.async_add_executor_job(hub.delete_empty_scenes)
-    logger.debug("Done deleting empty scenes....")
+    # The controllers' empty scenes stay on the hub across reloads: sensor
+    # setup reconciles them, async_remove_entry deletes them
+    hub = entry_data.get("hub")
+    if hub is not None:
+        hub.close()
 
     # all() over the gather result list itself — the old all([gather])
     # wrapped it in another list and was therefore always True.
@@ -299,6 +387,24 @@ async def async_unload_entry(
     return unload_ok
 
 
+async def async_remove_entry(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Delete the controllers' empty scenes and the stored inventory once
+    the entry is removed."""
+    await inventory_store(hass, entry.entry_id).async_remove()
+    hass_data = dict(entry.data)
+    hub = HubX(hass_data[CONF_TOKEN], hass_data[CONF_IP_ADDRESS])
+    try:
+        await hass.async_add_executor_job(hub.delete_empty_scenes)
+        logger.debug("Done deleting empty scenes....")
+    except Exception as ex:
+        # The entry is gone either way; leftover scenes are harmless
+        logger.warning(f"Failed to delete empty scenes: {ex}")
+    finally:
+        hub.close()
+
+
 async def async_remove_config_entry_device(
     hass: HomeAssistant,
     config_entry: config_entries.ConfigEntry,
@@ -31,6 +31,8 @@ from dirigera.devices.controller import Controller
 from dirigera.devices.air_purifier import FanModeEnum
 
 from .hub_event_listener import hub_event_listener, registry_entry
+from .dirigera_lib_patch import async_hub_call
+from .device_commands import device_commands
 from .const import DOMAIN, DEFAULT_POWER_PUSH_THROTTLE
 
 from enum import Enum
@@ -44,15 +46,48 @@ from dateutil import parser
 
 logger = logging.getLogger("custom_components.dirigera_platform")
 
-def induce_properties(class_to_induce, attr):
-    for key in attr.keys():
-            logger.debug(f"Inducing class {class_to_induce.__name__} property {key} : value {attr[key]}")
-            make_property(class_to_induce, key, attr[key])
-
-def make_property(class_to_induce, name, value):
+# Attribute names already exposed as properties, per induced class
+_induced_names: dict = {}
+
+def _attribute_names(attributes) -> frozenset:
+    # pydantic declares the fields on the model class (model_fields in 2.x,
+    # __fields__ in 1.x), so the values need not be serialised to find them
+    model = type(attributes)
+    fields = getattr(model, "model_fields", None)
+    if fields is None:
+        fields = getattr(model, "__fields__", None)
+    if fields is None:
+        fields = vars(attributes)
+    return frozenset(fields)
+
+def induce_properties(class_to_induce, attributes):
+    """Expose the fields of ``attributes`` as properties of ``class_to_induce``.
+
+    The properties are shared by every instance, so they are only made for
+    names not seen before: once per attribute model, not once per device.
+    """
+    induced = _induced_names.setdefault(class_to_induce, set())
+    missing = _attribute_names(attributes) - induced
+    if not missing:
+        return
+    logger.debug(f"Inducing class {class_to_induce.__name__} properties {sorted(missing)}")
+    for name in missing:
+        make_property(class_to_induce, name)
+    induced |= missing
+
+def make_property(class_to_induce, name):
     setattr(class_to_induce, name, property(lambda self: getattr(self._json_data.attributes,name)))
 
-class ikea_base_device:
+class ikea_base_device(device_commands):
+    # The hub event listener passes the changed attributes to
+    # schedule_update_ha_state when this is set, so only the listeners that
+    # depend on them are woken (see ikea_base_device_sensor.depends_on).
+    pushes_by_attribute = True
+    # Seconds without a hub event after which the poll cycle refreshes the
+    # device anyway (hub_poll_coordinator); set by the event listener
+    silence_threshold = 3600
+    last_event_at = None
+
     def __init__(self, hass, hub, json_data, get_by_id_fx) -> None:
         logger.debug("ikea_base_device ctor...")
         self._hass = hass 
@@ -65,13 +100,19 @@ class ikea_base_device:
         # safely call it (contract used to be docstring-only).
         self._updated_at = None
         self._update_lock = asyncio.Lock()
+        self._init_commands()
+        # device_info/device_name/name, computed on first use. HA reads them on
+        # every state write; see invalidate_metadata for when they are dropped.
+        self._metadata = {}
 
         # inject properties based on attr
-        induce_properties(ikea_base_device, self._json_data.attributes.dict())
+        induce_properties(ikea_base_device, self._json_data.attributes)
         
         # Register the device for updates
         if self.should_register_with_listener:
             hub_event_listener.register(self._hub.websocket_base_url, self._json_data.id, registry_entry(self))
+            # A sub-device found later (discovery) can change its siblings' names
+            self.invalidate_metadata()
 
     @property
     def skip_update(self)->bool:
@@ -104,29 +145,66 @@ class ikea_base_device:
             return self._json_data.relation_id
         return self._json_data.id
 
+    def invalidate_metadata(self, siblings: bool = True) -> None:
+        """Drop the cached device_info/device_name/name.
+
+        Called by the hub event listener when customName, the room or the
+        relation changes, and after a poll that changed them. Split-device
+        siblings derive their names from each other, so they are dropped too.
+        """
+        self._metadata.clear()
+        if not siblings or not self._json_data.relation_id:
+            return
+        index = hub_event_listener.get_device_index(self._hub.websocket_base_url)
+        for reg_entry in index.relation_members(self._json_data.relation_id):
+            sibling = reg_entry.entity
+            if sibling is not self and hasattr(sibling, "invalidate_metadata"):
+                sibling.invalidate_metadata(siblings=False)
+
+    def _metadata_key(self) -> tuple:
+        json_data = self._json_data
+        room = json_data.room
+        return (
+            json_data.attributes.custom_name,
+            json_data.attributes.firmware_version,
+            json_data.relation_id,
+            room.id if room is not None else None,
+            room.name if room is not None else None,
+        )
+
+    def _cached_metadata(self, key: str, compute):
+        value = self._metadata.get(key)
+        if value is None:
+            value = compute()
+            self._metadata[key] = value
+        return value
+
     @property
     def device_name(self) -> str:
+        return self._cached_metadata("device_name", self._compute_device_name)
+
+    def _compute_device_name(self) -> str:
         """Return a consistent device name for split-devices.
         For devices with relation_id, all sub-devices should report the same
         device name. Uses the first non-empty custom_name found among siblings."""
         if self._json_data.relation_id:
-            # Collect all custom_names for this relation_id from registered entities
-            names = []
-            for reg_entry in hub_event_listener.device_registry.get(self._hub.websocket_base_url, {}).values():
+            # First custom_name among the entities registered for this relation_id
+            index = hub_event_listener.get_device_index(self._hub.websocket_base_url)
+            for reg_entry in index.relation_members(self._json_data.relation_id):
                 sibling = reg_entry.entity
                 if (hasattr(sibling, '_json_data')
                         and sibling._json_data.relation_id == self._json_data.relation_id
                         and sibling._json_data.attributes.custom_name):
-                    names.append(sibling._json_data.attributes.custom_name)
-            if names:
-                return names[0]
+                    return sibling._json_data.attributes.custom_name
         if self._json_data.attributes.custom_name:
             return self._json_data.attributes.custom_name
         return self.unique_id
 
     @property
     def device_info(self) -> DeviceInfo:
+        return self._cached_metadata("device_info", self._compute_device_info)
 
+    def _compute_device_info(self) -> DeviceInfo:
         return DeviceInfo(
             identifiers={("dirigera_platform", self.device_identifier)},
             name=self.device_name,
@@ -138,12 +216,16 @@ class ikea_base_device:
 
     @property
     def name(self):
+        return self._cached_metadata("name", self._compute_name)
+
+    def _compute_name(self):
         # For split-devices (same relation_id), prefer a sibling's user-configured
         # name over our own default name. The IKEA app only lets users rename the
         # "primary" device (e.g. occupancySensor), not the secondary (lightSensor).
         # Without this, the secondary keeps its factory default name.
         if self._json_data.relation_id:
-            for reg_entry in hub_event_listener.device_registry.get(self._hub.websocket_base_url, {}).values():
+            index = hub_event_listener.get_device_index(self._hub.websocket_base_url)
+            for reg_entry in index.relation_members(self._json_data.relation_id):
                 sibling = reg_entry.entity
                 if (hasattr(sibling, '_json_data')
                         and sibling._json_data.relation_id == self._json_data.relation_id
@@ -161,12 +243,45 @@ class ikea_base_device:
         
         logger.debug(f"update called {self.name}")
         try:
-            self._json_data = await self._hass.async_add_executor_job(self._get_by_id_fx, self._json_data.id)
+            self._set_polled_json_data(await self._fetch_json_data())
         except Exception as ex:
             logger.error("error encountered running update on : {}".format(self.name))
             logger.error(ex)
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
 
+    async def async_poll(self) -> None:
+        """Called by the poll cycle once the /devices snapshot is fresh: the
+        fetch below is then a memory read. Unlike async_update, push-only
+        devices (skip_update) are refreshed too."""
+        self._set_polled_json_data(await self._fetch_json_data())
+        self._updated_at = time.monotonic()
+        self.async_schedule_update_ha_state(False)
+
+    async def _fetch_json_data(self):
+        # _get_by_id_fx is a bound HubX method; the async client has the same
+        # helper under the same name.
+        return await async_hub_call(self._hass, self._hub, self._get_by_id_fx.__name__, self._json_data.id)
+
+    async def _async_patch(self, attributes: dict, **local) -> None:
+        """submit_command with the model values as keywords."""
+        await self.submit_command(attributes, local)
+
+    @property
+    def _command_hass(self):
+        return self._hass
+
+    def _push_state(self, changed_attributes: set) -> None:
+        self.async_schedule_update_ha_state(False, changed_attributes=changed_attributes)
+
+    def _set_polled_json_data(self, json_data) -> None:
+        # A poll replaces the whole model; only a changed name, room, relation
+        # or firmware has to drop the cached metadata.
+        old_key = self._metadata_key()
+        self._json_data = json_data
+        self._optimistic.overlay()
+        if self._metadata_key() != old_key:
+            self.invalidate_metadata()
+
     async def _throttled_update(self, ttl_seconds: int = 30) -> None:
         """Throttled, concurrency-safe device refresh for multi-entity devices.
 
@@ -182,10 +297,12 @@ class ikea_base_device:
         Double-checked locking collapses this to exactly one hub request per
         device per ``ttl_seconds``: entities that queue behind the winner see
         a fresh timestamp inside the lock and skip the request entirely.
+        Concurrent GETs of the same route across devices and subsystems are
+        collapsed one level down, by the hub clients' single-flight.
 
         Callers must define ``self._updated_at`` (init ``None``) and
-        ``self._update_lock`` (``asyncio.Lock``). Uses ``self._get_by_id_fx``
-        (set in ``__init__``) as the fetch function.
+        ``self._update_lock`` (``asyncio.Lock``). Fetches through
+        ``self._fetch_json_data`` (``self._get_by_id_fx``, set in ``__init__``).
         """
         # Fast path: throttle window still active -> no lock, no request.
         # time.monotonic() rather than wall-clock: an NTP/DST clock step must
@@ -202,7 +319,7 @@ class ikea_base_device:
                 return
             try:
                 logger.debug(f"throttled update fetching from hub for {self.name}")
-                self._json_data = await self._hass.async_add_executor_job(self._get_by_id_fx, self._json_data.id)
+                self._set_polled_json_data(await self._fetch_json_data())
             except Exception as ex:
                 logger.error("error encountered running update on : {}".format(self.name))
                 logger.error(ex)
@@ -215,7 +332,7 @@ class ikea_base_device:
                 self._updated_at = time.monotonic()
 
     # To ensure state update of hass is cascaded
-    def async_schedule_update_ha_state(self, force_refresh:bool = False) -> None:
+    def async_schedule_update_ha_state(self, force_refresh:bool = False, changed_attributes:set[str] = None) -> None:
         for listener in self._listeners:
             # A listener registered via add_listener but never added to HA
             # (async_add_entities not called for it) has hass=None; HA's
@@ -225,21 +342,39 @@ class ikea_base_device:
             # entity not registered with HA cannot receive a state push anyway.
             if listener.hass is None:
                 continue
+            if not self._listener_affected(listener, changed_attributes):
+                continue
             if self._push_throttled(listener, force_refresh):
                 continue
             listener.schedule_update_ha_state(force_refresh)
 
     # To ensure state update of hass is cascaded
-    def schedule_update_ha_state(self, force_refresh:bool = False) -> None:
+    def schedule_update_ha_state(self, force_refresh:bool = False, changed_attributes:set[str] = None) -> None:
         for listener in self._listeners:
             # See async_schedule_update_ha_state: a listener with hass=None
             # would raise AttributeError in HA's schedule_update_ha_state (#41).
             if listener.hass is None:
                 continue
+            if not self._listener_affected(listener, changed_attributes):
+                continue
             if self._push_throttled(listener, force_refresh):
                 continue
             listener.schedule_update_ha_state(force_refresh)
 
+    @staticmethod
+    def _listener_affected(listener, changed_attributes) -> bool:
+        # An outlet with power monitoring has a switch and seven sensors on one
+        # device; a currentVoltage frame used to schedule a state write for all
+        # eight. changed_attributes (snake_case model names) is None when
+        # everything may have changed (polls, reachability, room, rename), and
+        # a listener without depends_on is always woken.
+        if changed_attributes is None:
+            return True
+        depends_on = getattr(listener, "depends_on", None)
+        if depends_on is None:
+            return True
+        return not depends_on.isdisjoint(changed_attributes)
+
     @staticmethod
     def _push_throttled(listener, force_refresh: bool) -> bool:
         # Per-listener push throttle (#40): high-frequency sensors (power/amps/
@@ -261,6 +396,10 @@ class ikea_base_device:
 
 class ikea_base_device_sensor():
     _attr_has_entity_name = True
+    # Device attributes (snake_case, as on _json_data.attributes) this entity's
+    # state is derived from. Hub events that change none of them skip this
+    # entity's state push; None means depend on every attribute.
+    depends_on: frozenset[str] = None
 
     def __init__(self,  device, id_suffix:str = "", name:str = "", native_unit_of_measurement="", icon="", device_class=None, entity_category=None, state_class=None):
         self._device = device
@@ -273,10 +412,17 @@ class ikea_base_device_sensor():
         self._device.add_listener(self)
         self._icon = icon 
         self.printed = False 
+        # The device id never changes, so neither does ours
+        self._unique_id = self._device.unique_id + self._id_suffix
         
+    @property
+    def should_poll(self) -> bool:
+        # The device is refreshed by the hub's poll cycle (hub_poll_coordinator)
+        return False
+
     @property
     def unique_id(self):
-        return self._device.unique_id + self._id_suffix
+        return self._unique_id
 
     @property
     def available(self):
@@ -322,7 +468,7 @@ class ikea_outlet_device(ikea_base_device):
     async def async_turn_on(self):
         logger.debug("outlet turn_on")
         try:
-            await self._hass.async_add_executor_job(self._json_data.set_on, True)
+            await self._async_patch({"isOn": True}, is_on=True)
         except Exception as ex:
             logger.error("error encountered turning on : {}".format(self.name))
             logger.error(ex)
@@ -331,13 +477,15 @@ class ikea_outlet_device(ikea_base_device):
     async def async_turn_off(self):
         logger.debug("outlet turn_off")
         try:
-            await self._hass.async_add_executor_job(self._json_data.set_on, False)
+            await self._async_patch({"isOn": False}, is_on=False)
         except Exception as ex:
             logger.error("error encountered turning off : {}".format(self.name))
             logger.error(ex)
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
 
 class ikea_outlet_switch_sensor(ikea_base_device_sensor, SwitchEntity):
+    depends_on = frozenset({"is_on"})
+
     def __init__(self, device):
         # No suffix or name prefix - use device name dynamically
         super().__init__(device)
@@ -365,6 +513,8 @@ class ikea_motion_sensor_device(ikea_base_device):
         self.skip_update = True 
         
 class ikea_motion_sensor(ikea_base_device_sensor, BinarySensorEntity):  
+    depends_on = frozenset({"is_on", "is_detected"})
+
     def __init__(self, device: ikea_motion_sensor_device):
         logger.debug("ikea_motion_sensor ctor...")
         # No suffix or name prefix for backward compatibility
@@ -381,6 +531,8 @@ class ikea_light_sensor_device(ikea_base_device):
         self.skip_update = True
 
 class ikea_light_sensor_lux(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"illuminance"})
+
     def __init__(self, device: ikea_light_sensor_device):
         logger.debug("ikea_light_sensor_lux ctor...")
         super().__init__(
@@ -407,6 +559,8 @@ class ikea_open_close_device(ikea_base_device):
         self.skip_update = True 
 
 class ikea_open_close_sensor(ikea_base_device_sensor, BinarySensorEntity):
+    depends_on = frozenset({"is_open"})
+
     def __init__(self, device: ikea_open_close_device):
         logger.debug("ikea_motion_sensor ctor...")
         # No suffix or name prefix for backward compatibility
@@ -426,6 +580,8 @@ class ikea_water_sensor_device(ikea_base_device):
         self.skip_update = True 
         
 class ikea_water_sensor(ikea_base_device_sensor, BinarySensorEntity):
+    depends_on = frozenset({"water_leak_detected"})
+
     def __init__(self, device : ikea_water_sensor_device):
         logger.debug("ikea_water_sensor ctor...")
         super().__init__(device)
@@ -448,16 +604,19 @@ class ikea_blinds_device(ikea_base_device):
         return CoverDeviceClass.BLIND
     
     async def async_open_cover(self):
-        await self._hass.async_add_executor_job(self._json_data.set_target_level, 0)
+        await self._async_patch({"blindsTargetLevel": 0}, blinds_target_level=0)
 
     async def async_close_cover(self):
-        await self._hass.async_add_executor_job(self._json_data.set_target_level, 100)
+        await self._async_patch({"blindsTargetLevel": 100}, blinds_target_level=100)
 
     async def async_set_cover_position(self, position:int):
         if position >= 0 and position <= 100:
-            await self._hass.async_add_executor_job(self._json_data.set_target_level,100 - position)
+            target_level = 100 - position
+            await self._async_patch({"blindsTargetLevel": target_level}, blinds_target_level=target_level)
     
 class ikea_blinds_sensor(ikea_base_device_sensor, CoverEntity):
+    depends_on = frozenset({"blinds_current_level", "blinds_target_level", "blinds_state"})
+
     def __init__(self, device:ikea_blinds_device):
         logger.debug("IkeaBlinds ctor...")
         super().__init__(device)
@@ -494,8 +653,17 @@ class ikea_blinds_sensor(ikea_base_device_sensor, CoverEntity):
             return False
         return self.current_cover_position == 0
 
+    @property
+    def _blinds_state(self):
+        # "up", "down" or "stopped" while the hub reports it; older library
+        # models have no such field
+        return getattr(self._device, "blinds_state", None)
+
     @property
     def is_closing(self):
+        if self._blinds_state is not None:
+            return self._blinds_state == "down"
+
         if self.current_cover_position is None or self.target_cover_position is None:
             return False
 
@@ -506,6 +674,9 @@ class ikea_blinds_sensor(ikea_base_device_sensor, CoverEntity):
 
     @property
     def is_opening(self):
+        if self._blinds_state is not None:
+            return self._blinds_state == "up"
+
         if self.current_cover_position is None or self.target_cover_position is None:
             return False
 
@@ -525,6 +696,9 @@ class ikea_blinds_sensor(ikea_base_device_sensor, CoverEntity):
         await self._device.async_set_cover_position(position)
 
 class ikea_vindstyrka_device(ikea_base_device):
+    # Reports its readings every few minutes
+    silence_threshold = 600
+
     def __init__(self, hass:core.HomeAssistant, hub:Hub , json_data:EnvironmentSensor) -> None:
         super().__init__(hass, hub, json_data, hub.get_environment_sensor_by_id)
 
@@ -534,6 +708,8 @@ class ikea_vindstyrka_device(ikea_base_device):
         await self._throttled_update()
 
 class ikea_vindstyrka_temperature(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"current_temperature"})
+
     def __init__(self, device: ikea_vindstyrka_device) -> None:
         super().__init__(
             device, 
@@ -549,6 +725,8 @@ class ikea_vindstyrka_temperature(ikea_base_device_sensor, SensorEntity):
         return self._device.current_temperature
  
 class ikea_vindstyrka_humidity(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"current_r_h"})
+
     def __init__(self, device: ikea_vindstyrka_device) -> None:
         logger.debug("ikea_vindstyrka_humidity ctor...")
         super().__init__(
@@ -568,6 +746,12 @@ class WhichPM25(Enum):
     MIN = 1
     MAX = 2
 
+PM25_ATTRIBUTES = {
+    WhichPM25.CURRENT: "current_p_m25",
+    WhichPM25.MAX: "max_measured_p_m25",
+    WhichPM25.MIN: "min_measured_p_m25",
+}
+
 class ikea_vindstyrka_pm25(ikea_base_device_sensor, SensorEntity):
     def __init__(
         self, device: ikea_vindstyrka_device, pm25_type: WhichPM25
@@ -585,6 +769,7 @@ class ikea_vindstyrka_pm25(ikea_base_device_sensor, SensorEntity):
         if self._pm25_type == WhichPM25.MIN:
             id_suffix = "MINPM25"
             name_suffix = "Min Measured PM2.5"
+        self.depends_on = frozenset({PM25_ATTRIBUTES[self._pm25_type]})
         
         super().__init__(device,
                          id_suffix=id_suffix,
@@ -605,6 +790,8 @@ class ikea_vindstyrka_pm25(ikea_base_device_sensor, SensorEntity):
         return None
 
 class ikea_vindstyrka_voc_index(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"voc_index"})
+
     def __init__(self, device: ikea_vindstyrka_device) -> None:
         logger.debug("ikea_vindstyrka_voc_index ctor...")
         # The hub reports a Sensirion-style dimensionless VOC *index* (1-500),
@@ -620,6 +807,8 @@ class ikea_vindstyrka_voc_index(ikea_base_device_sensor, SensorEntity):
         return self._device.voc_index
 
 class ikea_alpstuga_co2(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"current_c_o2"})
+
     def __init__(self, device: ikea_vindstyrka_device) -> None:
         logger.debug("ikea_alpstuga_co2 ctor...")
         super().__init__(
@@ -660,7 +849,7 @@ class ikea_controller_device(ikea_base_device, SensorEntity):
         super().__init__(hass , hub, json_data, hub.get_controller_by_id)
         self.skip_update = True
 
-    def schedule_update_ha_state(self, force_refresh: bool = False) -> None:
+    def schedule_update_ha_state(self, force_refresh: bool = False, changed_attributes: set[str] = None) -> None:
         # This device IS its own HA entity (no separate sensor wrapper), so a
         # hub push event must reach Entity.schedule_update_ha_state directly:
         # the base-device fan-out only forwards to _listeners, which is empty
@@ -670,6 +859,12 @@ class ikea_controller_device(ikea_base_device, SensorEntity):
             return
         Entity.schedule_update_ha_state(self, force_refresh)
 
+    def async_schedule_update_ha_state(self, force_refresh: bool = False, changed_attributes: set[str] = None) -> None:
+        # Likewise for the poll cycle's async_poll and optimistic writes
+        if self.hass is None:
+            return
+        Entity.async_schedule_update_ha_state(self, force_refresh)
+
     @property
     def entity_category(self):
         return EntityCategory.DIAGNOSTIC
@@ -745,19 +940,19 @@ class ikea_starkvind_air_purifier_device(ikea_base_device):
         # Convert percent to speed
         desired_speed = math.ceil(percentage * 50 / 100)
         logger.debug("set_percentage got : {}, scaled to : {}".format(percentage, desired_speed))
-        await self._hass.async_add_executor_job(self._json_data.set_motor_state, desired_speed)
+        await self._async_patch({"motorState": desired_speed}, motor_state=desired_speed)
 
     async def async_set_status_light(self, status: bool) -> None:
         logger.debug("set_status_light : {}".format(status))
-        await self._hass.async_add_executor_job(self._json_data.set_status_light, status)
+        await self._async_patch({"statusLight": status}, status_light=status)
 
     async def async_set_child_lock(self, status: bool) -> None:
         logger.debug("set_child_lock : {}".format(status))
-        await self._hass.async_add_executor_job(self._json_data.set_child_lock, status)
+        await self._async_patch({"childLock": status}, child_lock=status)
 
     async def async_set_fan_mode(self, preset_mode: FanModeEnum) -> None:
         logger.debug("set_fan_mode : {}".format(preset_mode.value))
-        await self._hass.async_add_executor_job(self._json_data.set_fan_mode, preset_mode)
+        await self._async_patch({"fanMode": preset_mode.value}, fan_mode=preset_mode)
 
     async def async_set_preset_mode(self, preset_mode: str):
         logger.debug("set_preset_mode : {}".format(preset_mode))
@@ -778,8 +973,7 @@ class ikea_starkvind_air_purifier_device(ikea_base_device):
             return
 
         logger.debug("set_preset_mode equated to : {}".format(mode_to_set.value))
-        #await self._hass.async_add_executor_job(self.async_set_fan_mode, mode_to_set)
-        await self._hass.async_add_executor_job(self._json_data.set_fan_mode, mode_to_set)
+        await self._async_patch({"fanMode": mode_to_set.value}, fan_mode=mode_to_set)
         
     async def async_turn_on(self, percentage=None, preset_mode=None) -> None:
         logger.debug("Airpurifier call to turn_on with percentage: {}, preset_mode: {}".format(percentage, preset_mode))
@@ -805,6 +999,8 @@ class ikea_starkvind_air_purifier_device(ikea_base_device):
         #await self._hass.async_add_executor_job(self.set_percentage, 0)
 
 class ikea_starkvind_air_purifier_fan(ikea_base_device_sensor, FanEntity):
+    depends_on = frozenset({"fan_mode", "motor_state"})
+
     def __init__(self, device: ikea_starkvind_air_purifier_device) -> None:
         logger.debug("Air purifer Fan sensor ctor ...")
         super().__init__(device)
@@ -865,6 +1061,7 @@ class ikea_starkvind_air_purifier_sensor(ikea_base_device_sensor, SensorEntity):
                     icon=icon_name)
 
         self._native_value_prop = native_value_prop
+        self.depends_on = frozenset({native_value_prop})
 
     @property
     def native_value(self):
@@ -894,6 +1091,7 @@ class ikea_starkvind_air_purifier_binary_sensor(ikea_base_device_sensor, BinaryS
                             icon=icon_name)
         
         self._native_value_prop = native_value_prop
+        self.depends_on = frozenset({native_value_prop})
         # NOTE: no device.add_listener(self) here — ikea_base_device_sensor's
         # __init__ already registers this entity; doing it again doubled every
         # state update for this sensor.
@@ -919,6 +1117,7 @@ class ikea_starkvind_air_purifier_switch_sensor(ikea_base_device_sensor, SwitchE
                             device_class=SwitchDeviceClass.SWITCH,
                             icon=icon_name)
         self._is_on_prop = is_on_prop
+        self.depends_on = frozenset({is_on_prop})
         self._turn_on_off = getattr(self._device, turn_on_off_fx)
 
     @property
@@ -944,6 +1143,8 @@ class ikea_starkvind_air_purifier_switch_sensor(ikea_base_device_sensor, SwitchE
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
                     
 class battery_percentage_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"battery_percentage"})
+
     def __init__(self, device):
         super().__init__(
                             device = device, 
@@ -960,6 +1161,9 @@ class battery_percentage_sensor(ikea_base_device_sensor, SensorEntity):
         return getattr(self._device, "battery_percentage")
     
 class current_amps_sensor(ikea_base_device_sensor, SensorEntity):
+    # is_on: the value is clamped to 0 while the outlet is off (#36)
+    depends_on = frozenset({"current_amps", "is_on"})
+
     # Rate-limit HA state pushes to spare the recorder (#40). Default from
     # const; overridden per-instance from the integration options at setup.
     _ha_push_throttle_seconds: int = DEFAULT_POWER_PUSH_THROTTLE
@@ -985,6 +1189,8 @@ class current_amps_sensor(ikea_base_device_sensor, SensorEntity):
         return getattr(self._device, "current_amps")
 
 class current_active_power_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"current_active_power", "is_on"})
+
     # Rate-limit HA state pushes to spare the recorder (#40). Default from
     # const; overridden per-instance from the integration options at setup.
     _ha_push_throttle_seconds: int = DEFAULT_POWER_PUSH_THROTTLE
@@ -1008,6 +1214,8 @@ class current_active_power_sensor(ikea_base_device_sensor, SensorEntity):
         return getattr(self._device, "current_active_power")
     
 class current_voltage_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"current_voltage"})
+
     # Rate-limit HA state pushes to spare the recorder (#40). Voltage moves
     # slowly so its impact is lower, but it rides the same ~8s WebSocket push.
     # Default from const; overridden per-instance from the options at setup.
@@ -1029,6 +1237,8 @@ class current_voltage_sensor(ikea_base_device_sensor, SensorEntity):
         return getattr(self._device, "current_voltage")
     
 class total_energy_consumed_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"total_energy_consumed"})
+
     def __init__(self, device):
         super().__init__(
                             device = device, 
@@ -1044,6 +1254,8 @@ class total_energy_consumed_sensor(ikea_base_device_sensor, SensorEntity):
         return getattr(self._device, "total_energy_consumed")
     
 class energy_consumed_at_last_reset_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"energy_consumed_at_last_reset"})
+
     def __init__(self, device):
         super().__init__(
                             device = device, 
@@ -1077,6 +1289,8 @@ def _as_aware_datetime(value):
     return value
 
 class time_of_last_energy_reset_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"time_of_last_energy_reset"})
+
     def __init__(self, device):
         super().__init__(
                             device = device,
@@ -1090,6 +1304,8 @@ class time_of_last_energy_reset_sensor(ikea_base_device_sensor, SensorEntity):
         return _as_aware_datetime(getattr(self._device, "time_of_last_energy_reset"))
 
 class total_energy_consumed_last_updated_sensor(ikea_base_device_sensor, SensorEntity):
+    depends_on = frozenset({"total_energy_consumed_last_updated"})
+
     def __init__(self, device):
         super().__init__(
                             device = device,
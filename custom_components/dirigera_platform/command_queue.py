@@ -0,0 +1,80 @@
+"""
+Per-device command queue for Dirigera writes.
+
+Dragging a brightness slider, cover position or fan percentage in the UI
+fires a stream of service calls. Sent as they come, every one becomes its own
+PATCH, they race each other to the hub and can land out of order, so a light
+"walks back" to a stale level. The queue keeps at most one write per device
+in flight; commands submitted meanwhile are merged per attribute, newest
+value wins, and go out as one write when the hub answers.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# send(attributes, options): PATCH the hub attributes, plus options such as
+# transitionTime. The model is not written here: optimistic_state already holds
+# the targets.
+SendFx = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[None]]
+
+
+class device_command_queue:
+    def __init__(self, send: SendFx):
+        self._send = send
+        self._attributes: Dict[str, Any] = {}
+        self._options: Dict[str, Any] = {}
+        self._waiters: List[asyncio.Future] = []
+        self._worker: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.sent = 0
+
+    async def submit(self, attributes: Dict[str, Any], options: Optional[Dict[str, Any]] = None) -> None:
+        """Queue a write and wait until the write carrying it has been sent.
+
+        Raises whatever the send raised, for every command merged into it.
+        """
+        self.submitted += 1
+        self._attributes.update(attributes)
+        # options belong to the newest command (e.g. its transition)
+        self._options = dict(options or {})
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if self._worker is None:
+            self._worker = asyncio.ensure_future(self._drain())
+        await waiter
+
+    async def _drain(self) -> None:
+        waiters: List[asyncio.Future] = []
+        try:
+            while self._waiters:
+                attributes, options, waiters = self._attributes, self._options, self._waiters
+                self._attributes, self._options, self._waiters = {}, {}, []
+                try:
+                    await self._send(attributes, options)
+                except Exception as err:
+                    _finish(waiters, err)
+                else:
+                    self.sent += 1
+                    _finish(waiters)
+        finally:
+            self._worker = None
+            # Cancelled (unload) mid-write: the callers must not wait forever,
+            # and a plain exception lets them roll their optimistic state back
+            stopped = RuntimeError("command not sent: the command queue was stopped")
+            _finish(waiters, stopped)
+            _finish(self._waiters, stopped)
+            self._attributes, self._options, self._waiters = {}, {}, []
+
+    def stats(self) -> dict:
+        return {"submitted": self.submitted, "sent": self.sent}
+
+
+def _finish(waiters: List[asyncio.Future], err: Optional[BaseException] = None) -> None:
+    for waiter in waiters:
+        if waiter.done():
+            continue
+        if err is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(err)
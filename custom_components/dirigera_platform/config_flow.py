@@ -16,6 +16,12 @@ from .const import (
     CONF_HIDE_DEVICE_SET_BULBS,
     CONF_POWER_PUSH_THROTTLE,
     DEFAULT_POWER_PUSH_THROTTLE,
+    CONF_LISTENER_MODE,
+    DEFAULT_LISTENER_MODE,
+    LISTENER_MODE_ASYNCIO,
+    LISTENER_MODE_THREAD,
+    CONF_EVENT_COALESCE_WINDOW,
+    DEFAULT_EVENT_COALESCE_WINDOW,
 )
 
 logger = logging.getLogger("custom_components.dirigera_platform")
@@ -23,7 +29,9 @@ logger = logging.getLogger("custom_components.dirigera_platform")
 HUB_SCHEMA = vol.Schema({
     vol.Required(CONF_IP_ADDRESS): cv.string,
     vol.Optional(CONF_HIDE_DEVICE_SET_BULBS, default=True): cv.boolean,
-    vol.Optional(CONF_POWER_PUSH_THROTTLE, default=DEFAULT_POWER_PUSH_THROTTLE): vol.All(vol.Coerce(int), vol.Range(min=0))
+    vol.Optional(CONF_POWER_PUSH_THROTTLE, default=DEFAULT_POWER_PUSH_THROTTLE): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional(CONF_LISTENER_MODE, default=DEFAULT_LISTENER_MODE): vol.In([LISTENER_MODE_ASYNCIO, LISTENER_MODE_THREAD]),
+    vol.Optional(CONF_EVENT_COALESCE_WINDOW, default=DEFAULT_EVENT_COALESCE_WINDOW): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
     })
 
 NULL_SCHEMA = vol.Schema({})
@@ -54,6 +62,8 @@ class dirigera_platform_config_flow(config_entries.ConfigFlow, domain=DOMAIN):
         self.code = None
         self.hide_device_set_bulbs = True
         self.power_push_throttle = DEFAULT_POWER_PUSH_THROTTLE
+        self.listener_mode = DEFAULT_LISTENER_MODE
+        self.event_coalesce_window = DEFAULT_EVENT_COALESCE_WINDOW
         self.code_verifier = None
 
     async def async_step_user(
@@ -71,6 +81,8 @@ class dirigera_platform_config_flow(config_entries.ConfigFlow, domain=DOMAIN):
             self.ip = user_input[CONF_IP_ADDRESS]
             self.hide_device_set_bulbs = user_input[CONF_HIDE_DEVICE_SET_BULBS]
             self.power_push_throttle = user_input.get(CONF_POWER_PUSH_THROTTLE, DEFAULT_POWER_PUSH_THROTTLE)
+            self.listener_mode = user_input.get(CONF_LISTENER_MODE, DEFAULT_LISTENER_MODE)
+            self.event_coalesce_window = user_input.get(CONF_EVENT_COALESCE_WINDOW, DEFAULT_EVENT_COALESCE_WINDOW)
 
             if self.ip is None or len(self.ip.strip()) == 0:
                 logger.debug("IP specified is blank...")
@@ -130,6 +142,8 @@ class dirigera_platform_config_flow(config_entries.ConfigFlow, domain=DOMAIN):
             user_input[CONF_TOKEN] = token
             user_input[CONF_HIDE_DEVICE_SET_BULBS] = self.hide_device_set_bulbs
             user_input[CONF_POWER_PUSH_THROTTLE] = self.power_push_throttle
+            user_input[CONF_LISTENER_MODE] = self.listener_mode
+            user_input[CONF_EVENT_COALESCE_WINDOW] = self.event_coalesce_window
 
             return self.async_create_entry(
                 title="IKEA Dirigera Hub : {}".format(user_input[CONF_IP_ADDRESS]),
@@ -170,6 +184,8 @@ class OptionsFlowHandler(config_entries.OptionsFlowWithConfigEntry):
             self.ip = user_input[CONF_IP_ADDRESS]
             self.hide_device_set_bulbs = user_input[CONF_HIDE_DEVICE_SET_BULBS]
             self.power_push_throttle = user_input.get(CONF_POWER_PUSH_THROTTLE, DEFAULT_POWER_PUSH_THROTTLE)
+            self.listener_mode = user_input.get(CONF_LISTENER_MODE, DEFAULT_LISTENER_MODE)
+            self.event_coalesce_window = user_input.get(CONF_EVENT_COALESCE_WINDOW, DEFAULT_EVENT_COALESCE_WINDOW)
             logger.debug(f"IN THIS STEP hide.. set {self.hide_device_set_bulbs}")
 
             if self.ip is None or len(self.ip.strip()) == 0:
@@ -226,6 +242,8 @@ class OptionsFlowHandler(config_entries.OptionsFlowWithConfigEntry):
             user_input[CONF_TOKEN] = token
             user_input[CONF_HIDE_DEVICE_SET_BULBS] = self.hide_device_set_bulbs
             user_input[CONF_POWER_PUSH_THROTTLE] = getattr(self, "power_push_throttle", DEFAULT_POWER_PUSH_THROTTLE)
+            user_input[CONF_LISTENER_MODE] = getattr(self, "listener_mode", DEFAULT_LISTENER_MODE)
+            user_input[CONF_EVENT_COALESCE_WINDOW] = getattr(self, "event_coalesce_window", DEFAULT_EVENT_COALESCE_WINDOW)
             logger.debug("before create entry...")
 
             self.hass.config_entries.async_update_entry(self.config_entry, data=user_input,
@@ -11,3 +11,20 @@ DISCOVERY_COORDINATOR = "discovery_coordinator"
 # See issue #40.
 CONF_POWER_PUSH_THROTTLE = "power_push_throttle_seconds"
 DEFAULT_POWER_PUSH_THROTTLE = 60
+
+# How the hub WebSocket is consumed. "thread" is the original
+# websocket-client thread. "asyncio" runs the listener as a task on HA's
+# event loop (no listener/keepalive threads, no cross-thread hop per event);
+# it is opt-in until it has proven itself, so existing installs keep the
+# thread.
+CONF_LISTENER_MODE = "listener_mode"
+LISTENER_MODE_ASYNCIO = "asyncio"
+LISTENER_MODE_THREAD = "thread"
+DEFAULT_LISTENER_MODE = LISTENER_MODE_THREAD
+
+# deviceStateChanged frames for one device that arrive within this window are
+# merged and pushed to HA as a single state write (lights send 2-4 frames per
+# command, outlets send power/amps/voltage separately). 0 coalesces only the
+# frames handled in the same event-loop tick.
+CONF_EVENT_COALESCE_WINDOW = "event_coalesce_window_ms"
+DEFAULT_EVENT_COALESCE_WINDOW = 100
@@ -0,0 +1,66 @@
+"""
+The command path shared by ikea_base_device and ikea_bulb: a write is shown
+optimistically (optimistic_state), queued per device (command_queue) and
+rolled back if the PATCH fails or the hub never echoes it.
+
+Users set ``_hub`` and ``_json_data``, call _init_commands() in __init__ and
+implement _command_hass and _push_state.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+from typing import Optional
+
+from .command_queue import device_command_queue
+from .dirigera_lib_patch import async_hub_call, PRIORITY_COMMAND
+from .optimistic_state import optimistic_state
+
+
+class device_commands(abc.ABC):
+    def _init_commands(self) -> None:
+        # Serialises writes to this device; a slider drag collapses to the
+        # newest value per attribute instead of a PATCH per step.
+        self._commands = device_command_queue(self._send_patch)
+        # Commands show in HA at once; the hub echo confirms or rolls them back
+        self._optimistic = optimistic_state(lambda: self._json_data.attributes, self._push_rollback)
+
+    @property
+    @abc.abstractmethod
+    def _command_hass(self):
+        """The HomeAssistant instance the hub calls run on."""
+
+    @abc.abstractmethod
+    def _push_state(self, changed_attributes: set) -> None:
+        """Write the HA state of whatever shows ``changed_attributes``."""
+
+    async def submit_command(self, attributes: dict, local: dict, options: Optional[dict] = None) -> None:
+        """PATCH ``attributes`` (hub names) to this device. ``local`` (model
+        names) is shown at once until the hub echoes it, and rolled back if
+        the write fails."""
+        options = options or {}
+        # A fade only ends (and is echoed) after its transitionTime (ms)
+        transition = options.get("transitionTime", 0) / 1000
+        self._optimistic.expect(local)
+        self._push_state(set(local))
+        try:
+            await self._commands.submit(attributes, options)
+        except asyncio.CancelledError:
+            # The queue still sends it: time the echo from now
+            self._optimistic.sent(local, transition)
+            raise
+        except Exception:
+            self._optimistic.rollback(local)
+            raise
+        self._optimistic.sent(local, transition)
+
+    async def _send_patch(self, attributes: dict, options: dict) -> None:
+        # No write-through: the model already holds the targets, and writing
+        # them after the round-trip could undo a newer queued command
+        await async_hub_call(
+            self._command_hass, self._hub, "patch", f"/devices/{self._json_data.id}",
+            [{"attributes": attributes, **options}], priority=PRIORITY_COMMAND,
+        )
+
+    def _push_rollback(self, keys: set) -> None:
+        self._push_state(keys)
@@ -86,6 +86,32 @@ class DeviceDiscoveryCoordinator:
         """
         return device_id in self._known_device_ids
 
+    async def _hub_call(self, method: str, *args) -> Any:
+        """Await the hub's async client, or fall back to the blocking HubX
+        method in the executor (same contract as async_hub_call)."""
+        async_client = getattr(self._hub, "async_client", None)
+        if async_client is not None:
+            with async_client.priority(async_client.DISCOVERY):
+                return await getattr(async_client, method)(*args)
+        return await self._hass.async_add_executor_job(getattr(self._hub, method), *args)
+
+    async def discover_devices(self, devices: list) -> int:
+        """
+        Discover the supported devices of a /devices payload that have no
+        entity yet, e.g. the ones added while Home Assistant was down when
+        setup used the stored inventory.
+
+        Returns:
+            The number of devices added
+        """
+        added = 0
+        for device in devices:
+            device_type = device.get("deviceType")
+            if device_type in DEVICE_TYPE_TO_PLATFORM and not self.is_known_device(device["id"]):
+                if await self.discover_device(device["id"], device_type):
+                    added += 1
+        return added
+
     async def discover_device(self, device_id: str, device_type: str) -> bool:
         """
         Discover and register a new device.
@@ -131,9 +157,7 @@ class DeviceDiscoveryCoordinator:
                 return False
 
             # Fetch the full device info from the API
-            device_data = await self._hass.async_add_executor_job(
-                self._hub.get, f"/devices/{device_id}"
-            )
+            device_data = await self._hub_call("get", f"/devices/{device_id}")
 
             if device_data is None:
                 logger.error(f"Failed to fetch device data for {device_id}")
@@ -242,12 +266,9 @@ class DeviceDiscoveryCoordinator:
                 # See issue #31.
                 outlet_id = device_data.get("id")
                 try:
-                    # get_outlet_by_id() chains to a blocking requests call
-                    # (hub.get("/devices")); run it in the executor so we don't
-                    # block the event loop during runtime discovery. See issue #37.
-                    outlet = await self._hass.async_add_executor_job(
-                        self._hub.get_outlet_by_id, outlet_id
-                    )
+                    # Never block the event loop during runtime discovery
+                    # (issue #37): see _hub_call.
+                    outlet = await self._hub_call("get_outlet_by_id", outlet_id)
                 except Exception as e:
                     logger.warning(
                         "get_outlet_by_id failed for runtime-discovered outlet "
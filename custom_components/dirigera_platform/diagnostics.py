@@ -0,0 +1,37 @@
+"""Diagnostics support for the IKEA dirigera hub integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant import config_entries, core
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> dict[str, Any]:
+    """Return runtime counters for a config entry (no credentials)."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    diagnostics = {}
+
+    hub = entry_data.get("hub")
+    if hub is not None:
+        diagnostics["hub_connection_pool"] = hub.pool_stats()
+        diagnostics["devices_snapshot"] = hub.devices_snapshot.stats()
+        if hub.async_client is not None:
+            diagnostics["hub_async_client"] = hub.async_client.stats()
+
+    platform = entry_data.get("gateway")
+    if platform is not None:
+        diagnostics["inventory"] = {"stale": platform.stale}
+
+    poller = entry_data.get("poller")
+    if poller is not None:
+        diagnostics["poll_coordinator"] = poller.stats()
+
+    hub_events = entry_data.get("hub_events")
+    if hub_events is not None:
+        diagnostics["event_listener"] = hub_events.stats()
+
+    return diagnostics
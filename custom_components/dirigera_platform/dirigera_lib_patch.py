@@ -1,50 +1,327 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
-
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import contextvars
+import copy
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
 from dirigera import Hub
 
 from dirigera.devices.device import Attributes, Device
+from dirigera.devices.air_purifier import dict_to_air_purifier
+from dirigera.devices.blinds import dict_to_blind
+from dirigera.devices.light import dict_to_light
+from dirigera.devices.light_sensor import dict_to_light_sensor
+from dirigera.devices.open_close_sensor import dict_to_open_close_sensor
+from dirigera.devices.water_sensor import dict_to_water_sensor
 from dirigera.devices.outlet import Outlet, dict_to_outlet
 from dirigera.devices.environment_sensor import EnvironmentSensor, dict_to_environment_sensor
 from dirigera.hub.abstract_smart_home_hub import AbstractSmartHomeHub
-from dirigera.devices.scene import Info, Icon, Trigger, TriggerDetails, ControllerType
 import logging
+import json
 
 logger = logging.getLogger("custom_components.dirigera_platform")
 
 
+class devices_snapshot:
+    """
+    In-memory copy of the hub's /devices payload, keyed by device id.
+
+    Seeded by every real /devices fetch (the startup make_devices fetch, the
+    reconnect resync) and kept current by the WebSocket stream, so the
+    get_*_by_id reads behind entity polls are served from memory instead of
+    downloading the whole inventory. It is trusted for ``ttl`` seconds after
+    the last fetch and dropped when the stream reconnects, so events missed
+    while the stream was down cannot linger.
+
+    Device dicts are never mutated in place: an update swaps in a new dict,
+    so a reader in an executor thread always sees a consistent device. What
+    get, devices and merged return is the snapshot's own data and read-only
+    for callers (they build models from it). seed and add take ownership of
+    the payloads they are given: the hub clients hand them a parse of their
+    own, never one a caller also holds.
+
+    Split devices (an outlet and its electricalSensor, the halves of a
+    TIMMERFLOTTE) share a relationId. Merged payloads are computed over that
+    relation group only, cached per device, and dropped for just that group
+    when one of its members changes.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._devices: Dict[str, Dict[str, Any]] = {}
+        # relationId -> member ids, in /devices order
+        self._relations: Dict[str, List[str]] = {}
+        # device id -> {merge function: merged payload or None}
+        self._merged: Dict[str, Dict[Any, Optional[Dict[str, Any]]]] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._reads = 0
+        self._fetches = 0
+        self._merges = 0
+
+    def _reindex(self, devices: Dict[str, Dict[str, Any]]) -> None:
+        # Callers hold the lock. Structural changes only (seed/add/remove,
+        # a device moving to another relation): state events keep the index.
+        relations = {}
+        for device_id, device in devices.items():
+            relation_id = device.get("relationId")
+            if relation_id:
+                relations.setdefault(relation_id, []).append(device_id)
+        self._devices = devices
+        self._relations = relations
+        self._merged = {}
+
+    def _group(self, device: Dict[str, Any]) -> List[str]:
+        relation_id = device.get("relationId")
+        return self._relations.get(relation_id, [device["id"]]) if relation_id else [device["id"]]
+
+    def seed(self, devices: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._reindex({device["id"]: device for device in devices})
+            self._fetched_at = time.monotonic()
+            self._fetches += 1
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._fetched_at = None
+
+    def is_fresh(self) -> bool:
+        fetched_at = self._fetched_at
+        return fetched_at is not None and time.monotonic() - fetched_at <= self._ttl
+
+    def apply_state(self, data: Dict[str, Any]) -> None:
+        """Merge a deviceStateChanged payload into the device it names."""
+        with self._lock:
+            current = self._devices.get(data["id"])
+            if current is None:
+                return
+            device = {**current, **data}
+            if "attributes" in data:
+                device["attributes"] = {**current.get("attributes", {}), **data["attributes"]}
+            if device.get("relationId") != current.get("relationId"):
+                self._reindex({**self._devices, data["id"]: device})
+                return
+            # same key: the dict keeps its size, so iterating readers are safe
+            self._devices[data["id"]] = device
+            for member_id in self._group(device):
+                self._merged.pop(member_id, None)
+
+    def add(self, device: Dict[str, Any]) -> None:
+        with self._lock:
+            self._reindex({**self._devices, device["id"]: device})
+
+    def remove(self, device_id: str) -> None:
+        with self._lock:
+            if device_id in self._devices:
+                devices = dict(self._devices)
+                del devices[device_id]
+                self._reindex(devices)
+
+    def get(self, device_id: str) -> Optional[Dict[str, Any]]:
+        self._reads += 1
+        return self._devices.get(device_id)
+
+    def devices(self) -> List[Dict[str, Any]]:
+        self._reads += 1
+        return list(self._devices.values())
+
+    def merged(self, device_id: str, merge) -> Optional[Dict[str, Any]]:
+        """
+        The payload ``merge`` (merge_outlets / merge_environment_sensors)
+        produces for ``device_id`` over the whole inventory, or None when it
+        produces none (wrong type, or a non-primary split-device half).
+        """
+        self._reads += 1
+        with self._lock:
+            cached = self._merged.get(device_id)
+            if cached is not None and merge in cached:
+                return cached[merge]
+            device = self._devices.get(device_id)
+            result = None
+            if device is not None:
+                # Every merge pairs devices by relationId, so the group gives
+                # the same answer as the full list.
+                group = [self._devices[member_id] for member_id in self._group(device)]
+                result = next((d for d in merge(group) if d["id"] == device_id), None)
+                self._merges += 1
+            self._merged.setdefault(device_id, {})[merge] = result
+            return result
+
+    def stats(self) -> dict:
+        fetched_at = self._fetched_at
+        return {
+            "devices": len(self._devices),
+            "age_seconds": None if fetched_at is None else round(time.monotonic() - fetched_at, 1),
+            "memory_reads": self._reads,
+            "split_device_merges": self._merges,
+            "inventory_fetches": self._fetches,
+        }
+
+
+class single_flight:
+    """
+    Collapses concurrent identical calls from executor threads: the first
+    caller for a key runs the call, callers arriving while it is in flight
+    wait for it and share its result (or exception). The result is the same
+    object for every caller: share something immutable (HubX shares the
+    response body and parses it per caller).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Any, Dict[str, Any]] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    def run(self, key, fx):
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = {"done": threading.Event()}
+                self.calls += 1
+            else:
+                self.collapsed += 1
+        if not leader:
+            flight["done"].wait()
+            if "error" in flight:
+                raise flight["error"]
+            return flight["result"]
+        try:
+            flight["result"] = fx()
+            return flight["result"]
+        except Exception as err:
+            flight["error"] = err
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight["done"].set()
+
+
 class HubX(Hub):
+    # Set by async_setup_entry to the AsyncHubX of the same hub; None means
+    # callers use the blocking methods below in the executor.
+    async_client: Optional[AsyncHubX] = None
+
+    # Keep-alive connections held open to the hub. The hub is slow at TLS, so
+    # callers beyond this wait for a free connection (pool_block) instead of
+    # opening a throwaway one with its own handshake.
+    POOL_SIZE = 4
+
+    # How long the WebSocket-maintained /devices snapshot is trusted before a
+    # read refetches the inventory. Events keep it current in between; this
+    # only bounds the damage of a missed event.
+    DEVICES_SNAPSHOT_TTL = 300
+
     def __init__(
         self, token: str, ip_address: str, port: str = "8443", api_version: str = "v1"
     ) -> None:
         super().__init__(token, ip_address, port, api_version)
-        # issue #38 punt 1: batch-cache voor /devices. Tijdens make_devices() roepen
-        # ~10 get_X-methoden elk self.get("/devices") aan -> 10x de volledige device-lijst
-        # over een verse TLS-handshake. Met een actieve batch fetcht alleen de eerste; de
-        # rest hergebruikt. Cache is UITSLUITEND actief binnen begin/end_devices_batch
-        # (alleen make_devices), dus runtime-calls (get_*_by_id, reload) halen verse data op.
-        self._devices_cache_active = False
-        self._devices_cache = None
-        self._devices_fetch_count = 0   # aantal échte /devices-fetches binnen de laatste batch
+        # The dirigera library does a bare requests.get/patch/... per call:
+        # a new TCP connection and TLS handshake for every request. All REST
+        # calls go through this session instead, which reuses the pooled
+        # connections (and so their TLS sessions) for the lifetime of the entry.
+        self._session = requests.Session()
+        self._session.verify = False
+        self._session.headers.update(self.headers())
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_SIZE, pool_block=True)
+        self._session.mount("https://", self._adapter)
+        self._stats_lock = threading.Lock()
+        self._requests_total = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        # Concurrent GETs of one route (a resync and a discovery fetching
+        # /devices, entities polling the same device) share one request.
+        self._get_flights = single_flight()
+        # Shared with the AsyncHubX of this hub and updated by its event listener
+        self.devices_snapshot = devices_snapshot(self.DEVICES_SNAPSHOT_TTL)
+
+    def _request(self, method: str, route: str, data: Any = None) -> requests.Response:
+        with self._stats_lock:
+            self._requests_total += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        try:
+            response = self._session.request(
+                method, f"{self.api_base_url}{route}", json=data, timeout=10
+            )
+        finally:
+            with self._stats_lock:
+                self._in_flight -= 1
+        if not response.ok:
+            logger.debug(f"{method} {route} failed: {response.text}")
+        response.raise_for_status()
+        return response
 
     def get(self, route: str):
-        if route == "/devices" and self._devices_cache_active:
-            if self._devices_cache is None:
-                self._devices_fetch_count += 1
-                self._devices_cache = super().get(route)
-            return self._devices_cache
-        return super().get(route)
-
-    def begin_devices_batch(self) -> None:
-        """Start het coalescen van /devices-fetches (één fetch voor de hele make_devices-run)."""
-        self._devices_cache = None
-        self._devices_fetch_count = 0
-        self._devices_cache_active = True
-
-    def end_devices_batch(self) -> None:
-        """Stop coalescen en gooi de cache weg (runtime krijgt weer verse data)."""
-        self._devices_cache_active = False
-        self._devices_cache = None
+        # Joined callers share the body and each parse their own copy: one
+        # mutating its result (dump_data sanitises ids in place) must not
+        # corrupt the others' or the snapshot's
+        return json.loads(self._get_body(route))
+
+    def _get_body(self, route: str) -> bytes:
+        return self._get_flights.run(route, lambda: self._fetch(route))
+
+    def _fetch(self, route: str) -> bytes:
+        body = self._request("GET", route).content
+        if route == "/devices":
+            self.devices_snapshot.seed(json.loads(body))
+        return body
+
+    def _snapshot(self) -> devices_snapshot:
+        if not self.devices_snapshot.is_fresh():
+            self._get_body("/devices")
+        return self.devices_snapshot
+
+    def _get_device_data_by_id(self, id_: str) -> Dict:
+        # Serves every inherited get_*_by_id from the snapshot; an id it does
+        # not know yet (a device added since) still goes to the hub.
+        device = self._snapshot().get(id_)
+        if device is None:
+            device = super()._get_device_data_by_id(id_)
+            self.devices_snapshot.add(copy.deepcopy(device))
+        return device
+
+    def patch(self, route: str, data: List[Dict[str, Any]]) -> Any:
+        return self._request("PATCH", route, data).text
+
+    def post(self, route: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        response = self._request("POST", route, data)
+        if len(response.content) == 0:
+            return None
+        return response.json()
+
+    def delete(self, route: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        response = self._request("DELETE", route, data)
+        if len(response.content) == 0:
+            return None
+        return response.json()
+
+    def pool_stats(self) -> dict:
+        """Connection pool utilisation, for the integration's diagnostics."""
+        pool = self._adapter.poolmanager.connection_from_url(self.api_base_url)
+        with self._stats_lock:
+            return {
+                "pool_size": self.POOL_SIZE,
+                "requests": self._requests_total,
+                # each opened connection is one TLS handshake
+                "connections_opened": pool.num_connections,
+                "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "collapsed_gets": self._get_flights.collapsed,
+            }
+
+    def close(self) -> None:
+        self._session.close()
 
     def get_controllers(self) -> List[ControllerX]:
         """
@@ -74,38 +351,13 @@ class HubX(Hub):
     def create_empty_scene(self, controller_id: str, clicks_supported:list):
         logger.debug(f"Creating empty scene for controller : {controller_id} with clicks : {clicks_supported}")
         for click in clicks_supported:
-            scene_name = f'dirigera_integration_empty_scene_{controller_id}_{click}'
-            info = Info(name=f'dirigera_integration_empty_scene_{controller_id}_{click}', icon=Icon.SCENES_CAKE)
-            device_trigger = Trigger(type="controller", disabled=False,
-                                     trigger=TriggerDetails(clickPattern=click, buttonIndex=0, deviceId=controller_id, controllerType=ControllerType.SHORTCUT_CONTROLLER))
-
-            logger.debug(f"Creating empty scene : {info.name}")
-            #self.create_scene(info=info, scene_type=SceneType.USER_SCENE,triggers=[device_trigger])
-            data = {
-                        "info": {"name" : scene_name, "icon" : "scenes_cake"},
-                        "type": "customScene",
-                        "triggers":[
-                                        {
-                                            "type": "controller", 
-                                            "disabled": False, 
-                                            "trigger": 
-                                                {
-                                                    "controllerType": "shortcutController",
-                                                    "clickPattern": click,
-                                                    "buttonIndex": 0,
-                                                    "deviceId": controller_id
-                                                }
-                                        }
-                                    ],
-                "actions": []
-            }
-            
-            self.post("/scenes/", data=data)
+            logger.debug(f"Creating empty scene : {empty_scene_name(controller_id, click)}")
+            self.post("/scenes/", data=empty_scene_data(controller_id, click))
         
     def delete_empty_scenes(self):
         scenes = self.get_scenes()
         for scene in scenes:
-            if scene.name.startswith("dirigera_integration_empty_scene_"):
+            if scene.name.startswith(EMPTY_SCENE_PREFIX):
                 logger.debug(f"Deleting Scene id: {scene.id} name: {scene.name}...")
                 self.delete_scene(scene.id)
 
@@ -115,55 +367,16 @@ class HubX(Hub):
         For split-device plugs (GRILLPLATS, TOFSMYGGA), merges energy attributes
         from the linked electricalSensor device into the outlet.
         """
-        devices = self.get("/devices")
-        outlets = list(filter(lambda x: x["type"] == "outlet", devices))
-        electrical_sensors = list(filter(
-            lambda x: x.get("deviceType") == "electricalSensor", devices
-        ))
-
-        # Build lookup: relationId -> electricalSensor attributes
-        energy_by_relation = {}
-        for sensor in electrical_sensors:
-            rel_id = sensor.get("relationId")
-            if rel_id:
-                energy_by_relation[rel_id] = sensor.get("attributes", {})
-
-        # Merge energy attributes into outlets that have a matching relationId
-        energy_attrs = [
-            ("currentActivePower", "current_active_power"),
-            ("currentAmps", "current_amps"),
-            ("currentVoltage", "current_voltage"),
-            ("totalEnergyConsumed", "total_energy_consumed"),
-            ("totalEnergyConsumedLastUpdated", "total_energy_consumed_last_updated"),
-            ("energyConsumedAtLastReset", "energy_consumed_at_last_reset"),
-            ("timeOfLastEnergyReset", "time_of_last_energy_reset"),
-        ]
-
-        for outlet in outlets:
-            rel_id = outlet.get("relationId")
-            if rel_id and rel_id in energy_by_relation:
-                sensor_attrs = energy_by_relation[rel_id]
-                for api_key, snake_key in energy_attrs:
-                    if api_key in sensor_attrs and sensor_attrs[api_key] is not None:
-                        outlet.setdefault("attributes", {})[api_key] = sensor_attrs[api_key]
-                logger.debug(
-                    f"Merged energy attributes from electricalSensor into outlet "
-                    f"'{outlet.get('attributes', {}).get('customName', '?')}' "
-                    f"(relationId: {rel_id})"
-                )
-
-        return [dict_to_outlet(outlet, self) for outlet in outlets]
+        return [dict_to_outlet(outlet, self) for outlet in merge_outlets(self.get("/devices"))]
 
     def get_outlet_by_id(self, id_: str) -> Outlet:
         """
         Fetches an outlet by ID, merging energy data from linked electricalSensor.
         """
-        # Fetch all to enable relationId matching
-        outlets = self.get_outlets()
-        for outlet in outlets:
-            if outlet.id == id_:
-                return outlet
-        raise ValueError(f"No outlet found with id {id_}")
+        outlet = self._snapshot().merged(id_, merge_outlets)
+        if outlet is None:
+            raise ValueError(f"No outlet found with id {id_}")
+        return dict_to_outlet(outlet, self)
 
     def get_environment_sensors(self) -> list:
         """
@@ -172,61 +385,16 @@ class HubX(Hub):
         multiple devices sharing the same relationId into a single sensor.
         TIMMERFLOTTE exposes temperature and humidity as separate devices.
         """
-        devices = self.get("/devices")
-        env_sensors = list(filter(
-            lambda x: x.get("deviceType") == "environmentSensor", devices
-        ))
-
-        if not env_sensors:
-            return []
-
-        # Group by relationId to find split-device sensors
-        by_relation = {}
-        standalone = []
-        for sensor in env_sensors:
-            rel_id = sensor.get("relationId")
-            if rel_id:
-                if rel_id not in by_relation:
-                    by_relation[rel_id] = []
-                by_relation[rel_id].append(sensor)
-            else:
-                standalone.append(sensor)
-
-        merged = []
-
-        # Merge split-device sensors
-        for rel_id, group in by_relation.items():
-            if len(group) == 1:
-                merged.append(group[0])
-            else:
-                # Multiple devices with same relationId — merge attributes
-                base = group[0].copy()
-                base_attrs = base.get("attributes", {})
-                for other in group[1:]:
-                    other_attrs = other.get("attributes", {})
-                    for key, value in other_attrs.items():
-                        if key not in base_attrs or base_attrs[key] is None:
-                            base_attrs[key] = value
-                base["attributes"] = base_attrs
-                logger.debug(
-                    f"Merged {len(group)} environment sensor devices for "
-                    f"'{base_attrs.get('customName', '?')}' (relationId: {rel_id})"
-                )
-                merged.append(base)
-
-        merged.extend(standalone)
-        return [dict_to_environment_sensor(s, self) for s in merged]
+        return [dict_to_environment_sensor(s, self) for s in merge_environment_sensors(self.get("/devices"))]
 
     def get_environment_sensor_by_id(self, id_: str) -> EnvironmentSensor:
         """
         Fetches an environment sensor by ID, with relationId merging for split-device sensors.
         """
-        # Use the full get_environment_sensors() to get merged results
-        sensors = self.get_environment_sensors()
-        for sensor in sensors:
-            if sensor.id == id_:
-                return sensor
-        raise ValueError(f"No environment sensor found with id {id_}")
+        sensor = self._snapshot().merged(id_, merge_environment_sensors)
+        if sensor is None:
+            raise ValueError(f"No environment sensor found with id {id_}")
+        return dict_to_environment_sensor(sensor, self)
 
     def get_motion_sensors(self) -> List[MotionSensorX]:
         """
@@ -249,6 +417,97 @@ class HubX(Hub):
         return dict_to_motion_sensor_x(motion_sensor, self)
 
 
+def merge_outlets(devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Outlet payloads from a /devices list, with the energy attributes of a
+    linked electricalSensor (same relationId) merged in."""
+    # One pass: outlets, and a relationId -> electricalSensor attributes lookup
+    outlets = []
+    energy_by_relation = {}
+    for device in devices:
+        if device["type"] == "outlet":
+            outlets.append(device)
+        elif device.get("deviceType") == "electricalSensor":
+            rel_id = device.get("relationId")
+            if rel_id:
+                energy_by_relation[rel_id] = device.get("attributes", {})
+
+    # Merge energy attributes into outlets that have a matching relationId
+    energy_attrs = [
+        ("currentActivePower", "current_active_power"),
+        ("currentAmps", "current_amps"),
+        ("currentVoltage", "current_voltage"),
+        ("totalEnergyConsumed", "total_energy_consumed"),
+        ("totalEnergyConsumedLastUpdated", "total_energy_consumed_last_updated"),
+        ("energyConsumedAtLastReset", "energy_consumed_at_last_reset"),
+        ("timeOfLastEnergyReset", "time_of_last_energy_reset"),
+    ]
+
+    for i, outlet in enumerate(outlets):
+        rel_id = outlet.get("relationId")
+        if rel_id and rel_id in energy_by_relation:
+            sensor_attrs = energy_by_relation[rel_id]
+            # Merge into copies: the payloads may be devices_snapshot entries
+            outlet = outlets[i] = {**outlet, "attributes": dict(outlet.get("attributes", {}))}
+            for api_key, snake_key in energy_attrs:
+                if api_key in sensor_attrs and sensor_attrs[api_key] is not None:
+                    outlet["attributes"][api_key] = sensor_attrs[api_key]
+            logger.debug(
+                f"Merged energy attributes from electricalSensor into outlet "
+                f"'{outlet.get('attributes', {}).get('customName', '?')}' "
+                f"(relationId: {rel_id})"
+            )
+
+    return outlets
+
+
+def merge_environment_sensors(devices: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Environment sensor payloads from a /devices list, with split-device
+    sensors sharing a relationId merged into one payload."""
+    env_sensors = list(filter(
+        lambda x: x.get("deviceType") == "environmentSensor", devices
+    ))
+
+    if not env_sensors:
+        return []
+
+    # Group by relationId to find split-device sensors
+    by_relation = {}
+    standalone = []
+    for sensor in env_sensors:
+        rel_id = sensor.get("relationId")
+        if rel_id:
+            if rel_id not in by_relation:
+                by_relation[rel_id] = []
+            by_relation[rel_id].append(sensor)
+        else:
+            standalone.append(sensor)
+
+    merged = []
+
+    # Merge split-device sensors
+    for rel_id, group in by_relation.items():
+        if len(group) == 1:
+            merged.append(group[0])
+        else:
+            # Multiple devices with same relationId — merge attributes
+            base = group[0].copy()
+            base_attrs = dict(base.get("attributes", {}))
+            for other in group[1:]:
+                other_attrs = other.get("attributes", {})
+                for key, value in other_attrs.items():
+                    if key not in base_attrs or base_attrs[key] is None:
+                        base_attrs[key] = value
+            base["attributes"] = base_attrs
+            logger.debug(
+                f"Merged {len(group)} environment sensor devices for "
+                f"'{base_attrs.get('customName', '?')}' (relationId: {rel_id})"
+            )
+            merged.append(base)
+
+    merged.extend(standalone)
+    return merged
+
+
 class ControllerAttributesX(Attributes):
     is_on: Optional[bool] = None
     battery_percentage: Optional[int] = None
@@ -277,6 +536,34 @@ def dict_to_controller(
 ) -> ControllerX:
     return ControllerX(dirigeraClient=dirigera_client, **data)
 
+# Controllers only send remotePressEvents for click patterns some scene is
+# triggered by, so the integration keeps an action-less scene per pattern.
+EMPTY_SCENE_PREFIX = "dirigera_integration_empty_scene_"
+# Scene writes in flight at once while reconciling
+EMPTY_SCENE_PARALLELISM = 4
+
+def empty_scene_name(controller_id: str, click: str) -> str:
+    return f"{EMPTY_SCENE_PREFIX}{controller_id}_{click}"
+
+def empty_scene_data(controller_id: str, click: str) -> Dict[str, Any]:
+    return {
+        "info": {"name": empty_scene_name(controller_id, click), "icon": "scenes_cake"},
+        "type": "customScene",
+        "triggers": [
+            {
+                "type": "controller",
+                "disabled": False,
+                "trigger": {
+                    "controllerType": "shortcutController",
+                    "clickPattern": click,
+                    "buttonIndex": 0,
+                    "deviceId": controller_id,
+                },
+            }
+        ],
+        "actions": [],
+    }
+
 class HackScene():
 
     def __init__(self, hub, id, name, icon):
@@ -334,4 +621,384 @@ class MotionSensorX(Device):
 def dict_to_motion_sensor_x(
     data: Dict[str, Any], dirigera_client: AbstractSmartHomeHub
 ) -> MotionSensorX:
-    return MotionSensorX(dirigeraClient=dirigera_client, **data)
\ No newline at end of file
+    return MotionSensorX(dirigeraClient=dirigera_client, **data)
+
+
+# Per-hub request scheduling for AsyncHubX.
+#
+# Commands, polls, reconnect resyncs, discovery fetches and scene maintenance
+# used to reach the hub through one plain semaphore, first come first served:
+# on a struggling hub a light switch press queued behind a full /devices
+# resync. Requests now wait in priority lanes (commands, discovery, polls,
+# bulk), and commands may use one slot beyond the limit, so they never wait
+# for background traffic to drain.
+#
+# The limit adapts to the hub (AIMD, as in TCP congestion control): every
+# request answered within TARGET_LATENCY adds 1/limit, about one slot per
+# round of requests; a slow answer or timeout halves it, at most once per
+# TARGET_LATENCY so one burst of slow answers counts as one signal.
+
+# Lanes, highest priority first
+PRIORITY_COMMAND = 0
+PRIORITY_DISCOVERY = 1
+PRIORITY_POLL = 2
+PRIORITY_BULK = 3
+LANE_NAMES = ("command", "discovery", "poll", "bulk")
+
+# Seconds; slower answers are treated as congestion
+TARGET_LATENCY = 2.0
+# Slots commands may use beyond the limit
+COMMAND_RESERVE = 1
+
+# Lane of the hub requests made in the current task; polls unless a caller
+# says otherwise (see request_priority). Tasks inherit it, so a GET started
+# for a caller runs in that caller's lane.
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "dirigera_request_priority", default=PRIORITY_POLL
+)
+
+
+@contextmanager
+def request_priority(priority: Optional[int]):
+    """Run the enclosed hub requests in ``priority``'s lane (None: unchanged)."""
+    if priority is None:
+        yield
+        return
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class hub_scheduler:
+    def __init__(self, limit: int, min_limit: int = 1, max_limit: int = 8, target_latency: float = TARGET_LATENCY):
+        self._limit = float(limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._target_latency = target_latency
+        self._lanes: List[Deque[asyncio.Future]] = [deque() for _ in LANE_NAMES]
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._admitted = [0] * len(LANE_NAMES)
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _capacity(self, priority: int) -> int:
+        return self.limit + (COMMAND_RESERVE if priority == PRIORITY_COMMAND else 0)
+
+    def _lanes_ahead(self, priority: int) -> bool:
+        return any(self._lanes[lane] for lane in range(priority + 1))
+
+    async def _acquire(self, priority: int) -> None:
+        if self._in_flight < self._capacity(priority) and not self._lanes_ahead(priority):
+            self._in_flight += 1
+            self._admitted[priority] += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._lanes[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # granted and cancelled in the same tick: hand the slot on
+                self._release()
+            else:
+                # A release in the same tick may have dropped it already
+                lane = self._lanes[priority]
+                if waiter in lane:
+                    lane.remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for priority, lane in enumerate(self._lanes):
+            while lane and self._in_flight < self._capacity(priority):
+                waiter = lane.popleft()
+                if waiter.done():
+                    continue
+                self._in_flight += 1
+                self._admitted[priority] += 1
+                waiter.set_result(None)
+            if lane:
+                # lower lanes must not overtake a waiting one
+                return
+
+    def _observe(self, elapsed: float, congested: bool) -> None:
+        if congested or elapsed > self._target_latency:
+            now = time.monotonic()
+            if now - self._last_decrease >= self._target_latency:
+                self._last_decrease = now
+                self._limit = max(self._min_limit, self._limit / 2)
+                self._decreases += 1
+        else:
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a request slot in the current task's lane for the enclosed
+        request; its response time feeds the limit."""
+        await self._acquire(_current_priority.get())
+        start = time.monotonic()
+        congested = False
+        try:
+            yield
+        except asyncio.TimeoutError:
+            congested = True
+            raise
+        finally:
+            self._observe(time.monotonic() - start, congested)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queued": {name: len(lane) for name, lane in zip(LANE_NAMES, self._lanes)},
+            "admitted": dict(zip(LANE_NAMES, self._admitted)),
+            "limit_decreases": self._decreases,
+        }
+
+
+class AsyncHubX:
+    """
+    Non-blocking counterpart of HubX for the event loop.
+
+    Commands and polls awaited through this client run on aiohttp instead of
+    an executor thread each, so a slow hub no longer ties up Home Assistant's
+    shared executor pool. The typed get_*_by_id helpers build the same models
+    as HubX and bind them to the blocking hub, so model methods keep working.
+
+    Requests wait for a slot in the hub_scheduler lane of their caller (see
+    priority), starting from the blocking pool's bound: the hub copes badly
+    with many parallel requests.
+    """
+
+    # Lanes for priority(); requests default to POLL
+    COMMAND = PRIORITY_COMMAND
+    DISCOVERY = PRIORITY_DISCOVERY
+    POLL = PRIORITY_POLL
+    BULK = PRIORITY_BULK
+
+    def __init__(self, hub: HubX, session: aiohttp.ClientSession) -> None:
+        self._hub = hub
+        self._session = session
+        self._scheduler = hub_scheduler(HubX.POOL_SIZE)
+        self._timeout = aiohttp.ClientTimeout(total=10)
+        self._requests_total = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        # route -> task of the GET in flight, shared by concurrent callers
+        self._get_flights: Dict[str, asyncio.Task] = {}
+        self._collapsed_gets = 0
+
+    async def _request(self, method: str, route: str, data: Any = None) -> bytes:
+        self._requests_total += 1
+        async with self._scheduler.slot():
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                async with self._session.request(
+                    method,
+                    f"{self._hub.api_base_url}{route}",
+                    json=data,
+                    headers=self._hub.headers(),
+                    ssl=False,
+                    timeout=self._timeout,
+                ) as response:
+                    body = await response.read()
+                    if not response.ok:
+                        logger.debug(f"{method} {route} failed: {body!r}")
+                    response.raise_for_status()
+                    return body
+            finally:
+                self._in_flight -= 1
+
+    async def get(self, route: str) -> Any:
+        # Parsed per caller, see HubX.get
+        return json.loads(await self._get_body(route))
+
+    async def _get_body(self, route: str) -> bytes:
+        task = self._get_flights.get(route)
+        if task is None:
+            task = self._get_flights[route] = asyncio.ensure_future(self._fetch(route))
+            task.add_done_callback(lambda done: self._end_flight(route, done))
+        else:
+            self._collapsed_gets += 1
+        # shield: one caller being cancelled must not cancel the others' fetch
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def priority(lane: Optional[int]):
+        """Context manager: requests awaited inside it use ``lane``."""
+        return request_priority(lane)
+
+    def _end_flight(self, route: str, task: asyncio.Task) -> None:
+        if self._get_flights.get(route) is task:
+            del self._get_flights[route]
+        if not task.cancelled():
+            # retrieved here too, so a fetch whose callers were all cancelled
+            # does not log "exception was never retrieved"
+            task.exception()
+
+    async def _fetch(self, route: str) -> bytes:
+        body = await self._request("GET", route)
+        if route == "/devices":
+            self._hub.devices_snapshot.seed(json.loads(body))
+        return body
+
+    async def _snapshot(self) -> devices_snapshot:
+        if not self._hub.devices_snapshot.is_fresh():
+            await self._get_body("/devices")
+        return self._hub.devices_snapshot
+
+    async def patch(self, route: str, data: List[Dict[str, Any]]) -> Any:
+        return (await self._request("PATCH", route, data)).decode()
+
+    async def post(self, route: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        body = await self._request("POST", route, data)
+        return json.loads(body) if body else None
+
+    async def delete(self, route: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        body = await self._request("DELETE", route, data)
+        return json.loads(body) if body else None
+
+    def stats(self) -> dict:
+        """Request counters, for the integration's diagnostics."""
+        return {
+            "requests": self._requests_total,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "collapsed_gets": self._collapsed_gets,
+            "scheduler": self._scheduler.stats(),
+        }
+
+    async def _get_device_data_by_id(self, id_: str) -> Dict:
+        device = (await self._snapshot()).get(id_)
+        if device is not None:
+            return device
+        try:
+            device = await self.get("/devices/" + id_)
+        except aiohttp.ClientResponseError as err:
+            if err.status == 404:
+                raise ValueError("Device id not found") from err
+            raise
+        self._hub.devices_snapshot.add(copy.deepcopy(device))
+        return device
+
+    async def _get_typed_by_id(self, id_: str, key: str, value: str, factory):
+        data = await self._get_device_data_by_id(id_)
+        if data[key] != value:
+            raise ValueError(f"Device is not a {value}")
+        return factory(data, self._hub)
+
+    async def get_light_by_id(self, id_: str):
+        return await self._get_typed_by_id(id_, "type", "light", dict_to_light)
+
+    async def get_blinds_by_id(self, id_: str):
+        return await self._get_typed_by_id(id_, "deviceType", "blinds", dict_to_blind)
+
+    async def get_air_purifier_by_id(self, id_: str):
+        return await self._get_typed_by_id(id_, "deviceType", "airPurifier", dict_to_air_purifier)
+
+    async def get_controller_by_id(self, id_: str) -> ControllerX:
+        return await self._get_typed_by_id(id_, "type", "controller", dict_to_controller)
+
+    async def get_light_sensor_by_id(self, id_: str):
+        return await self._get_typed_by_id(id_, "deviceType", "lightSensor", dict_to_light_sensor)
+
+    async def get_open_close_by_id(self, id_: str):
+        return await self._get_typed_by_id(id_, "deviceType", "openCloseSensor", dict_to_open_close_sensor)
+
+    async def get_water_sensor_by_id(self, id_: str):
+        return await self._get_typed_by_id(id_, "deviceType", "waterSensor", dict_to_water_sensor)
+
+    async def get_motion_sensor_by_id(self, id_: str) -> MotionSensorX:
+        data = await self._get_device_data_by_id(id_)
+        if data["deviceType"] not in ("motionSensor", "occupancySensor"):
+            raise ValueError("Device is not a MotionSensor or OccupancySensor")
+        return dict_to_motion_sensor_x(data, self._hub)
+
+    async def get_outlet_by_id(self, id_: str) -> Outlet:
+        outlet = (await self._snapshot()).merged(id_, merge_outlets)
+        if outlet is None:
+            raise ValueError(f"No outlet found with id {id_}")
+        return dict_to_outlet(outlet, self._hub)
+
+    async def get_environment_sensor_by_id(self, id_: str) -> EnvironmentSensor:
+        sensor = (await self._snapshot()).merged(id_, merge_environment_sensors)
+        if sensor is None:
+            raise ValueError(f"No environment sensor found with id {id_}")
+        return dict_to_environment_sensor(sensor, self._hub)
+
+    async def get_scene_by_id(self, scene_id: str) -> HackScene:
+        return HackScene.make_scene(self._hub, await self.get(f"/scenes/{scene_id}"))
+
+
+async def async_hub_call(hass, hub: HubX, method: str, *args, priority: Optional[int] = None) -> Any:
+    """
+    Await ``method`` on the hub's AsyncHubX, or run the blocking HubX method of
+    the same name in the executor when the entry has no async client.
+    ``priority`` is the scheduler lane (AsyncHubX.COMMAND...); polls by default.
+    """
+    if hub.async_client is not None:
+        with hub.async_client.priority(priority):
+            return await getattr(hub.async_client, method)(*args)
+    return await hass.async_add_executor_job(getattr(hub, method), *args)
+
+
+async def async_reconcile_empty_scenes(
+    hass, hub: HubX, clicks_by_controller: Dict[str, List[str]], existing: List[HackScene]
+) -> Dict[str, int]:
+    """
+    Make the hub's empty scenes match ``clicks_by_controller``: create the
+    missing ones, delete the integration's scenes no controller needs (and
+    duplicates), leave the rest alone. ``existing`` is the scene list the
+    gateway already fetched. Up to EMPTY_SCENE_PARALLELISM writes run at once,
+    in the scheduler's bulk lane; a failed write is logged and retried by the
+    next reconcile.
+    """
+    wanted = {
+        empty_scene_name(controller_id, click): (controller_id, click)
+        for controller_id, clicks in clicks_by_controller.items()
+        for click in clicks
+    }
+    present = set()
+    orphans = []
+    for scene in existing:
+        if not scene.name.startswith(EMPTY_SCENE_PREFIX):
+            continue
+        if scene.name in wanted and scene.name not in present:
+            present.add(scene.name)
+        else:
+            orphans.append(scene)
+    missing = [name for name in wanted if name not in present]
+
+    slots = asyncio.Semaphore(EMPTY_SCENE_PARALLELISM)
+
+    async def _write(description: str, method: str, *args) -> bool:
+        async with slots:
+            try:
+                await async_hub_call(hass, hub, method, *args, priority=PRIORITY_BULK)
+                return True
+            except Exception as ex:
+                logger.warning(f"Failed to {description}: {ex}")
+                return False
+
+    results = await asyncio.gather(
+        *(_write(f"create empty scene {name}", "post", "/scenes/", empty_scene_data(*wanted[name])) for name in missing),
+        *(_write(f"delete empty scene {scene.name}", "delete", f"/scenes/{scene.id}") for scene in orphans),
+    )
+    stats = {
+        "kept": len(present),
+        "created": sum(results[:len(missing)]),
+        "deleted": sum(results[len(missing):]),
+    }
+    logger.debug(f"Reconciled empty scenes: {stats}")
+    return stats
@@ -6,15 +6,18 @@ import json
 import re 
 import websocket
 import ssl
+import aiohttp
 from typing import Any
 import datetime
 from dateutil import parser
 from dirigera import Hub
 from dirigera.devices.device import Room
+from dirigera.devices.air_purifier import FanModeEnum
 
 from homeassistant.const import ATTR_ENTITY_ID
 from homeassistant.components.light import ColorMode
 from homeassistant.helpers import device_registry as dr, entity_registry as er, area_registry as ar
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 logger = logging.getLogger("custom_components.dirigera_platform.hub_event_listener")
 
@@ -42,7 +45,17 @@ process_events_from = {
     "light"           :     ["isOn", "lightLevel", "colorTemperature", "colorHue", "colorSaturation", "customName"],
     "openCloseSensor" :     ["isOpen","batteryPercentage","customName"],
     "waterSensor"     :     ["waterLeakDetected","batteryPercentage","customName"],
-    "blinds"          :     ["blindsCurrentLevel","batteryPercentage","customName"],
+    "blinds"          :     ["blindsCurrentLevel","blindsTargetLevel","blindsState","batteryPercentage","customName"],
+    "airPurifier"     :     [   "fanMode",
+                                "motorState",
+                                "motorRuntime",
+                                "currentPM25",
+                                "filterAlarmStatus",
+                                "filterElapsedTime",
+                                "filterLifetime",
+                                "childLock",
+                                "statusLight",
+                                "customName"],
     "lightSensor"     :     ["illuminance","batteryPercentage","customName"],
     "environmentSensor":    [   "currentTemperature",
                                 "currentRH",
@@ -55,9 +68,64 @@ process_events_from = {
 
 controller_trigger_last_time_map = {}
 
+# Sentinel for "attribute not on the model yet" in value-change gating
+_MISSING = object()
+
 def to_snake_case(name:str) -> str:
     return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
 
+def _parse_date_time(value):
+    try :
+        return parser.parse(value)
+    except Exception:
+        #Ignore the exception, keep the raw value
+        logger.warning(f"Failed to convert {value} to date/time...")
+        return value
+
+def _fan_mode(value):
+    try:
+        return FanModeEnum(value)
+    except ValueError:
+        logger.warning(f"Unknown air purifier fan mode {value}...")
+        return value
+
+# Hub attributes whose raw value needs converting before it is set on the model
+attribute_converters = {
+    "timeOfLastEnergyReset"         : _parse_date_time,
+    "totalEnergyConsumedLastUpdated": _parse_date_time,
+    "fanMode"                       : _fan_mode,
+}
+
+def _make_decoders(keys) -> dict:
+    return {key: (to_snake_case(key), attribute_converters.get(key)) for key in keys}
+
+# Decoder table built once at import from process_events_from:
+# {device_type: {camelKey: (snake_attr, converter or None)}}. The event path
+# used to run a regex (to_snake_case) and a list scan per attribute per frame.
+event_decoders = {device_type: _make_decoders(keys) for device_type, keys in process_events_from.items()}
+
+# camelKey -> (snake_attr, converter) across all device types. A merged
+# pending state can mix frames of split devices (outlet + electricalSensor),
+# so applying it needs the union; filtering already happened per frame.
+attribute_decoders = {}
+for _decoders in event_decoders.values():
+    attribute_decoders.update(_decoders)
+
+# Only light-relevant attributes are applied from scene actions
+scene_action_decoders = _make_decoders(["isOn", "lightLevel", "colorTemperature", "colorHue", "colorSaturation"])
+
+# Multi button controllers report each button as <base id>_<button>
+_button_suffix_pattern = re.compile(r'(([0-9]|[a-z]|-)*)_([0-9])+')
+
+def split_button_id(device_id: str) -> tuple[str, int]:
+    """Return (registry id, button index) for a controller device id; the
+    registry id is the _1 sibling the controller entity registers under."""
+    match = _button_suffix_pattern.search(device_id)
+    if match is None:
+        return device_id, 0
+    groups = match.groups()
+    return f"{groups[0]}_1", int(groups[2])
+
 class registry_entry:
     def __init__(self, entity:any, cascade_entity:any = None):
         self._entity = entity
@@ -83,22 +151,118 @@ class registry_entry:
             str = str + f"{self._cascade_entity}"
         return str
 
+def base_device_id(id: str) -> str:
+    """Id without its _<n> sub-device suffix (shared by split-device halves)."""
+    return id.rsplit("_", 1)[0] if "_" in id else id
+
+class device_index:
+    """Registered devices of one hub, by id, relation_id and base id.
+
+    Split-device lookups (device_name/name siblings, environmentSensor event
+    routing) used to scan every registered device. The secondary indexes make
+    them a dict lookup.
+
+    Copy-on-write: a registration builds new dicts and swaps them in under
+    the lock, so readers (the listener thread, HA's state writes) never lock
+    and can iterate a snapshot() while discovery registers new devices.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        # relation_id / base id -> tuple of device ids, in registration order
+        self._by_relation = {}
+        self._by_base = {}
+
+    @staticmethod
+    def _relation_id(entry: registry_entry):
+        json_data = getattr(entry.entity, "_json_data", None)
+        return getattr(json_data, "relation_id", None)
+
+    def register(self, id: str, entry: registry_entry, replace: bool = False) -> bool:
+        """Add a device; an existing id is kept unless replace is set."""
+        with self._lock:
+            previous = self._by_id.get(id)
+            if previous is not None and not replace:
+                return False
+            by_id = {**self._by_id, id: entry}
+            by_relation = self._by_relation
+            old_relation = self._relation_id(previous) if previous is not None else None
+            new_relation = self._relation_id(entry)
+            if previous is not None and old_relation != new_relation and old_relation:
+                by_relation = {**by_relation, old_relation: tuple(x for x in by_relation[old_relation] if x != id)}
+            if new_relation and id not in by_relation.get(new_relation, ()):
+                by_relation = {**by_relation, new_relation: by_relation.get(new_relation, ()) + (id,)}
+            by_base = self._by_base
+            base = base_device_id(id)
+            if id not in by_base.get(base, ()):
+                by_base = {**by_base, base: by_base.get(base, ()) + (id,)}
+            self._by_id, self._by_relation, self._by_base = by_id, by_relation, by_base
+            return True
+
+    def move_relation(self, id: str, old_relation_id: str):
+        """Re-index id after its entity's relation_id changed from old_relation_id."""
+        with self._lock:
+            entry = self._by_id.get(id)
+            if entry is None:
+                return
+            new_relation = self._relation_id(entry)
+            by_relation = dict(self._by_relation)
+            if old_relation_id:
+                by_relation[old_relation_id] = tuple(x for x in by_relation.get(old_relation_id, ()) if x != id)
+            if new_relation and id not in by_relation.get(new_relation, ()):
+                by_relation[new_relation] = by_relation.get(new_relation, ()) + (id,)
+            self._by_relation = by_relation
+
+    def get(self, id: str) -> registry_entry:
+        return self._by_id.get(id)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def snapshot(self) -> dict:
+        """{device_id: registry_entry} as of now. Never mutated: treat as read-only."""
+        return self._by_id
+
+    def relation_members(self, relation_id: str) -> list[registry_entry]:
+        """Entries registered for the sub-devices of one physical device."""
+        by_id = self._by_id
+        return [by_id[x] for x in self._by_relation.get(relation_id, ()) if x in by_id]
+
+    def find_related(self, id: str) -> str:
+        """First registered id, other than id, sharing id's base id."""
+        for other in self._by_base.get(base_device_id(id), ()):
+            if other != id:
+                return other
+        return None
+
 class hub_event_listener(threading.Thread):
-    # Per-hub device registries: {hub_key: {device_id: registry_entry}}.
+    # Per-hub device indexes: {hub_key: device_index}.
     # hub_key is the hub's websocket_base_url, which a hub's entities and its
     # listener share (both are built from the same config-entry IP). Keeping a
     # registry per hub means stopping or unloading one hub no longer wipes
     # another hub's device registrations. See issue #39.
     device_registry = {}
 
+    def get_device_index(hub_key: str) -> device_index:
+        index = hub_event_listener.device_registry.get(hub_key)
+        if index is None:
+            index = hub_event_listener.device_registry.setdefault(hub_key, device_index())
+        return index
+
     def register(hub_key: str, id: str, entry: registry_entry):
-        bucket = hub_event_listener.device_registry.setdefault(hub_key, {})
-        if id in bucket:
-            return
-        bucket[id] = entry
+        hub_event_listener.get_device_index(hub_key).register(id, entry)
+
+    def rebind(hub_key: str, id: str, entry: registry_entry):
+        """Point an already registered id at another entry."""
+        hub_event_listener.get_device_index(hub_key).register(id, entry, replace=True)
 
     def get_registry_entry(hub_key: str, id: str) -> registry_entry:
-        return hub_event_listener.device_registry.get(hub_key, {}).get(id)
+        index = hub_event_listener.device_registry.get(hub_key)
+        return index.get(id) if index is not None else None
 
     def unregister_hub(hub_key: str):
         hub_event_listener.device_registry.pop(hub_key, None)
@@ -106,13 +270,15 @@ class hub_event_listener(threading.Thread):
     def find_registry_entry(id: str) -> registry_entry:
         # Hub-agnostic lookup for callers without a hub reference (e.g. device
         # triggers). Device ids are unique across hubs, so the first match wins.
-        for bucket in hub_event_listener.device_registry.values():
-            if id in bucket:
-                return bucket[id]
+        for index in list(hub_event_listener.device_registry.values()):
+            entry = index.get(id)
+            if entry is not None:
+                return entry
         return None
 
     def _own_registry(self) -> dict:
-        return hub_event_listener.device_registry.get(self._hub_key, {})
+        index = hub_event_listener.device_registry.get(self._hub_key)
+        return index.snapshot() if index is not None else {}
     
     # Dirigera hubs disconnect WebSocket clients after ~60 minutes of
     # "inactivity". Crucially, the hub does NOT count WebSocket protocol-level
@@ -125,7 +291,7 @@ class hub_event_listener(threading.Thread):
     # Fix: send a minimal application-level text frame well within that window.
     KEEPALIVE_INTERVAL = 15 * 60  # seconds — well below the hub's ~60 min timeout
 
-    def __init__(self, hub : Hub, hass, discovery_coordinator=None):
+    def __init__(self, hub : Hub, hass, discovery_coordinator=None, coalesce_window: float = 0, scene_handler=None):
         super().__init__()
         self._hub : Hub = hub
         # Key into the per-hub device registry. Entities of this hub register
@@ -136,6 +302,8 @@ class hub_event_listener(threading.Thread):
         self._hass = hass
         self._loop = asyncio.get_event_loop()
         self._discovery_coordinator = discovery_coordinator
+        # Receives scene events on the loop (scene.hub_scenes)
+        self._scene_handler = scene_handler
         self._wsapp = None
         self._session_started_at = None
         self._keepalive_timer = None
@@ -145,6 +313,24 @@ class hub_event_listener(threading.Thread):
         # False until the first WebSocket open; used to tell an initial connect
         # (setup already fetched state) from a reconnect (must re-pull state).
         self._has_opened = False
+        # Set by resync_on_first_open: the entities were built from stored data
+        self._resync_on_open = False
+        # When the WebSocket last went down (or the listener was created),
+        # None while it is open. The poll cycle falls back to polling every
+        # device once it has been down for a while (see hub_poll_coordinator).
+        self._disconnected_at = time.monotonic()
+        # deviceStateChanged coalescing: frames for one device that arrive
+        # within coalesce_window seconds (0 = the same loop tick) are merged
+        # and applied with a single HA state push. {device_id: (device_type, info)}
+        self._coalesce_window = coalesce_window
+        self._pending_states = {}
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
+        # Value-change gating: device states that changed nothing (hub echoes,
+        # the reconnect resync replaying every device) are not pushed.
+        # hits = applied states gated out, misses = states that were pushed.
+        self._gate_hits = 0
+        self._gate_misses = 0
 
     async def _update_device_area(self, device_id: str, room_name: str):
         """Update the device's area in Home Assistant's device registry if needed."""
@@ -273,6 +459,12 @@ class hub_event_listener(threading.Thread):
                 logger.error(f"Failed to sync area for device {device_id}: {ex}")
         logger.info(f"Device area sync complete, processed {synced_count} devices with rooms")
 
+    def _call_in_loop(self, callback):
+        """Run callback on HA's event loop. The threaded listener receives
+        events on its own thread, so every loop-side effect (tasks, area/name
+        registry updates, resync) has to hop over thread-safely."""
+        self._loop.call_soon_threadsafe(callback)
+
     def on_error(self, ws:Any, ws_msg:str):
         logger.debug(f"on_error hub event listener {ws_msg}")
     
@@ -282,6 +474,9 @@ class hub_event_listener(threading.Thread):
         if "data" not in msg:
             logger.warning(f"discarding message as key 'data' not found: {msg}")
             return 
+
+        # A rename or icon change shows at once
+        self._forward_scene_event("scene_updated", msg["data"])
         
         if "triggers" not in msg["data"]:
             logger.warning(f"discarding message as key 'data/triggers'")
@@ -326,15 +521,9 @@ class hub_event_listener(threading.Thread):
                 logger.debug(f"click_pattern : {click_pattern} not in list of types...ignoring")
                 continue
             
-            device_id_for_registry = device_id
-             
-            button_idx = 0
-            pattern = '(([0-9]|[a-z]|-)*)_([0-9])+'
-            match = re.search(pattern, device_id)
-            if match is not None:
-                device_id_for_registry = f"{match.groups()[0]}_1"
-                button_idx = int(match.groups()[2])
-                logger.debug(f"Multi button controller, device_id effective : {device_id_for_registry} with buttons : {button_idx}")
+            device_id_for_registry, button_idx = split_button_id(device_id)
+            if button_idx != 0:
+                logger.debug("Multi button controller, device_id effective : %s with buttons : %s", device_id_for_registry, button_idx)
                 
             if button_idx != 0:
                 trigger_type =f"button{button_idx}_{trigger_type}"
@@ -414,16 +603,15 @@ class hub_event_listener(threading.Thread):
 
             entity = registry_value.entity
 
-            # Only process light-relevant attributes from scene actions
-            light_attrs = ["isOn", "lightLevel", "colorTemperature", "colorHue", "colorSaturation"]
             updated = False
 
             for key in attributes:
-                if key not in light_attrs:
+                decoder = scene_action_decoders.get(key)
+                if decoder is None:
                     continue
                 try:
-                    key_attr = to_snake_case(key)
-                    logger.debug(f"Scene action: setting {key_attr} to {attributes[key]} on {device_id}")
+                    key_attr = decoder[0]
+                    logger.debug("Scene action: setting %s to %s on %s", key_attr, attributes[key], device_id)
                     setattr(entity._json_data.attributes, key_attr, attributes[key])
                     updated = True
                 except Exception as ex:
@@ -480,14 +668,9 @@ class hub_event_listener(threading.Thread):
             return
 
         # Handle multi-button controllers (device_id like xxx_2 means button 2)
-        device_id_for_registry = device_id
-        button_idx = 0
-        pattern = '(([0-9]|[a-z]|-)*)_([0-9])+'
-        match = re.search(pattern, device_id)
-        if match is not None:
-            device_id_for_registry = f"{match.groups()[0]}_1"
-            button_idx = int(match.groups()[2])
-            logger.debug(f"remotePressEvent: Multi button controller, device_id effective: {device_id_for_registry} with button: {button_idx}")
+        device_id_for_registry, button_idx = split_button_id(device_id)
+        if button_idx != 0:
+            logger.debug("remotePressEvent: Multi button controller, device_id effective: %s with button: %s", device_id_for_registry, button_idx)
 
         if button_idx != 0:
             trigger_type = f"button{button_idx}_{trigger_type}"
@@ -526,273 +709,403 @@ class hub_event_listener(threading.Thread):
         self._hass.bus.fire(event_type="dirigera_platform_event", event_data=event_data)
         logger.debug(f"remotePressEvent fired: {event_data}")
 
+    def _forward_scene_event(self, method: str, data: dict) -> None:
+        handler = self._scene_handler
+        if handler is None:
+            return
+        self._call_in_loop(lambda: getattr(handler, method)(data))
+
+    def _on_scene_created(self, msg):
+        if "data" in msg:
+            self._forward_scene_event("scene_created", msg["data"])
+
+    def _on_scene_deleted(self, msg):
+        if "data" in msg:
+            self._forward_scene_event("scene_deleted", msg["data"])
+
+    # Message type -> handler method name; anything else is discarded
+    message_handlers = {
+        "sceneUpdated"      : "parse_scene_update",
+        "sceneCreated"      : "_on_scene_created",
+        "sceneDeleted"      : "_on_scene_deleted",
+        "remotePressEvent"  : "parse_remote_press_event",
+        "deviceAdded"       : "_on_device_added",
+        "deviceRemoved"     : "_on_device_removed",
+        "deviceStateChanged": "_on_device_state_changed",
+    }
+
     def on_message(self, ws:Any, ws_msg:str):
         
         try:
-            logger.debug(f"rcvd message : {ws_msg}")
+            logger.debug("rcvd message : %s", ws_msg)
             msg = json.loads(ws_msg)
             if "type" not in msg:
-                logger.debug(f"'type' not found in incoming message, discarding : {msg}")
+                logger.debug("'type' not found in incoming message, discarding : %s", msg)
                 return 
             
-            if msg['type'] == "sceneUpdated":
-                logger.debug(f"Found sceneUpdated message... ")
-                return self.parse_scene_update(msg)
-
-            if msg['type'] == "remotePressEvent":
-                logger.debug(f"Found remotePressEvent message... ")
-                return self.parse_remote_press_event(msg)
-
-            # Handle deviceAdded events - trigger dynamic discovery
-            if msg['type'] == "deviceAdded":
-                if "data" in msg and "id" in msg['data']:
-                    device_id = msg['data']['id']
-                    device_type = msg['data'].get('deviceType', msg['data'].get('type'))
-                    if device_type and self._discovery_coordinator is not None:
-                        logger.info(f"Device added event received: {device_id} (type: {device_type})")
-                        # Schedule discovery on the main event loop
-                        self._loop.call_soon_threadsafe(
-                            lambda did=device_id, dt=device_type: self._hass.async_create_task(
-                                self._discovery_coordinator.discover_device(did, dt)
-                            )
-                        )
-                    else:
-                        logger.debug(f"deviceAdded event without discovery coordinator or type: {msg}")
-                return
+            handler = self.message_handlers.get(msg['type'])
+            if handler is None:
+                logger.debug("discarding non state message: %s", msg)
+                return 
 
-            # Log deviceRemoved events for now (entities will become unavailable)
-            if msg['type'] == "deviceRemoved":
-                if "data" in msg and "id" in msg['data']:
-                    device_id = msg['data']['id']
-                    logger.info(f"Device removed event received: {device_id}")
-                    # Note: The entity will remain in HA but become unavailable
-                    # Full removal requires manual deletion in HA UI or a restart
-                return
+            return getattr(self, handler)(msg)
 
-            if msg['type'] != "deviceStateChanged":
-                logger.debug(f"discarding non state message: {msg}")
-                return 
+        except Exception:
+            # Visible at default log level: a swallowed DEBUG here used to hide
+            # every event-processing bug behind silently-stale entities.
+            logger.warning(f"error processing hub event: {ws_msg}", exc_info=True)
 
-            if "data" not in msg or "id" not in msg['data']:
-                logger.info(f"discarding message as  key 'data' or 'data/id' not found: {msg}")
-                return  
-            
-            info = msg['data'] 
-            id = info['id']
-
-            device_type = None
-            if "deviceType" in info:
-                device_type = info["deviceType"]
-            elif "type" in info:
-                device_type = info["type"]
+    def _devices_snapshot(self):
+        # The hub's WebSocket-maintained /devices copy (HubX.devices_snapshot)
+        return getattr(self._hub, "devices_snapshot", None)
+
+    def _on_device_added(self, msg):
+        # Trigger dynamic discovery
+        if "data" in msg and "id" in msg['data']:
+            device_id = msg['data']['id']
+            snapshot = self._devices_snapshot()
+            if snapshot is not None:
+                snapshot.add(msg['data'])
+            device_type = msg['data'].get('deviceType', msg['data'].get('type'))
+            if device_type and self._discovery_coordinator is not None:
+                logger.info(f"Device added event received: {device_id} (type: {device_type})")
+                # Schedule discovery on the main event loop
+                self._call_in_loop(
+                    lambda did=device_id, dt=device_type: self._hass.async_create_task(
+                        self._discovery_coordinator.discover_device(did, dt)
+                    )
+                )
             else:
-                logger.warning("expected type or deviceType in JSON, none found, ignoring...")
-                return
-
-            logger.debug(f"device type of message {device_type}")
-            if device_type not in process_events_from:
-                # To avoid issues been reported. If we dont have it in our list
-                # then best to not process this event
-                return
+                logger.debug(f"deviceAdded event without discovery coordinator or type: {msg}")
+
+    def _on_device_removed(self, msg):
+        # Log deviceRemoved events for now (entities will become unavailable)
+        if "data" in msg and "id" in msg['data']:
+            device_id = msg['data']['id']
+            logger.info(f"Device removed event received: {device_id}")
+            snapshot = self._devices_snapshot()
+            if snapshot is not None:
+                snapshot.remove(device_id)
+            # Note: The entity will remain in HA but become unavailable
+            # Full removal requires manual deletion in HA UI or a restart
+
+    def _on_device_state_changed(self, msg):
+        if "data" not in msg or "id" not in msg['data']:
+            logger.info(f"discarding message as  key 'data' or 'data/id' not found: {msg}")
+            return  
+        
+        info = msg['data'] 
+        id = info['id']
 
-            if id not in self._own_registry():
-                # Split-device routing: try to find parent entity for unregistered devices
-                routed = False
+        # A resync replays the /devices fetch that just seeded the snapshot
+        snapshot = self._devices_snapshot()
+        if snapshot is not None and not self._resyncing:
+            snapshot.apply_state(info)
 
-                # For electricalSensor events (GRILLPLATS/TOFSMYGGA _2 -> _1)
-                if device_type == "electricalSensor" and id.endswith("_2"):
-                    outlet_id = id[:-2] + "_1"
-                    if outlet_id in self._own_registry():
-                        logger.debug(f"Routing electricalSensor {id} events to outlet {outlet_id}")
-                        id = outlet_id
-                        routed = True
+        device_type = info.get("deviceType", info.get("type"))
+        if device_type is None:
+            logger.warning("expected type or deviceType in JSON, none found, ignoring...")
+            return
 
-                # For split-device environmentSensors (TIMMERFLOTTE: temp + humidity)
-                # Try _1 suffix pattern first, then search by relationId prefix
-                if not routed and device_type == "environmentSensor":
-                    # Try _1/_2 suffix pattern
-                    if id.endswith("_2"):
-                        sibling_id = id[:-2] + "_1"
-                        if sibling_id in self._own_registry():
-                            logger.debug(f"Routing environmentSensor {id} events to sibling {sibling_id}")
-                            id = sibling_id
-                            routed = True
-                    # Try finding any registered device sharing the same base ID (relationId)
-                    if not routed:
-                        base_id = id.rsplit("_", 1)[0] if "_" in id else id
-                        for reg_id in self._own_registry():
-                            if reg_id.startswith(base_id) and reg_id != id:
-                                logger.debug(f"Routing environmentSensor {id} events to related {reg_id}")
-                                id = reg_id
-                                routed = True
-                                break
+        logger.debug("device type of message %s", device_type)
+        decoders = event_decoders.get(device_type)
+        if decoders is None:
+            # To avoid issues been reported. If we dont have it in our list
+            # then best to not process this event
+            return
 
+        own_registry = self._own_registry()
+        if id not in own_registry:
+            # Split-device routing: try to find parent entity for unregistered devices
+            routed = False
+
+            # For electricalSensor events (GRILLPLATS/TOFSMYGGA _2 -> _1)
+            if device_type == "electricalSensor" and id.endswith("_2"):
+                outlet_id = id[:-2] + "_1"
+                if outlet_id in own_registry:
+                    logger.debug(f"Routing electricalSensor {id} events to outlet {outlet_id}")
+                    id = outlet_id
+                    routed = True
+
+            # For split-device environmentSensors (TIMMERFLOTTE: temp + humidity)
+            # Try _1 suffix pattern first, then search by relationId prefix
+            if not routed and device_type == "environmentSensor":
+                # Try _1/_2 suffix pattern
+                if id.endswith("_2"):
+                    sibling_id = id[:-2] + "_1"
+                    if sibling_id in own_registry:
+                        logger.debug(f"Routing environmentSensor {id} events to sibling {sibling_id}")
+                        id = sibling_id
+                        routed = True
+                # Try finding any registered device sharing the same base ID (relationId)
                 if not routed:
-                    # During a reconnect resync we replay every device, so an
-                    # unknown id here is just a device with no entity — skip it
-                    # silently rather than firing discovery for it on every
-                    # reconnect. See issue #39.
-                    if self._resyncing:
-                        return
-                    # Unknown device - try to discover it
-                    if self._discovery_coordinator is not None:
-                        logger.info(f"Unknown device detected: {id} (type: {device_type}), triggering discovery")
-                        self._loop.call_soon_threadsafe(
-                            lambda: self._hass.async_create_task(
-                                self._discovery_coordinator.discover_device(id, device_type)
-                            )
-                        )
-                    else:
-                        logger.info(f"discarding message as device for id: {id} not found for msg: {msg}")
+                    index = hub_event_listener.device_registry.get(self._hub_key)
+                    reg_id = index.find_related(id) if index is not None else None
+                    if reg_id is not None:
+                        logger.debug(f"Routing environmentSensor {id} events to related {reg_id}")
+                        id = reg_id
+                        routed = True
+
+            if not routed:
+                # During a reconnect resync we replay every device, so an
+                # unknown id here is just a device with no entity — skip it
+                # silently rather than firing discovery for it on every
+                # reconnect. See issue #39.
+                if self._resyncing:
                     return
+                # Unknown device - try to discover it
+                if self._discovery_coordinator is not None:
+                    logger.info(f"Unknown device detected: {id} (type: {device_type}), triggering discovery")
+                    self._call_in_loop(
+                        lambda: self._hass.async_create_task(
+                            self._discovery_coordinator.discover_device(id, device_type)
+                        )
+                    )
+                else:
+                    logger.info(f"discarding message as device for id: {id} not found for msg: {msg}")
+                return
 
+        self._queue_device_state(id, device_type, info)
+
+    def _queue_device_state(self, id: str, device_type: str, info: dict):
+        """Merge a deviceStateChanged frame into the pending batch for its device.
+
+        Lights send 2-4 frames per command (isOn, lightLevel, colorMode...) and
+        outlets report power/amps/voltage in separate frames. Applying each one
+        cost an HA state write (and a recorder row) per frame; instead the
+        deltas are merged per device and flushed on the event loop once the
+        coalesce window has passed, giving one state push per entity.
+        """
+        # Filter with the frame's own device type: split devices (e.g. an
+        # electricalSensor routed to its outlet) share one pending entry but
+        # not one attribute list.
+        if info.get("attributes") is not None:
+            decoders = event_decoders[device_type]
+            attributes = {}
+            for key, value in info["attributes"].items():
+                if key not in decoders:
+                    logger.debug("attribute %s with value %s not in list of device type %s, ignoring update...", key, value, device_type)
+                    continue
+                attributes[key] = value
+            info = {**info, "attributes": attributes}
+
+        with self._pending_lock:
+            pending = self._pending_states.get(id)
+            if pending is None:
+                pending = (device_type, {})
+                self._pending_states[id] = pending
+            merged = pending[1]
+            for key, value in info.items():
+                if key == "attributes":
+                    if value is None:
+                        merged.setdefault("attributes", None)
+                        continue
+                    if merged.get("attributes") is None:
+                        merged["attributes"] = {}
+                    merged["attributes"].update(value)
+                else:
+                    merged[key] = value
+            schedule = not self._flush_scheduled
+            self._flush_scheduled = True
+        if schedule:
+            self._call_in_loop(self._schedule_flush)
+
+    def _schedule_flush(self):
+        if self._coalesce_window > 0:
+            self._loop.call_later(self._coalesce_window, self._flush_pending_states)
+        else:
+            self._loop.call_soon(self._flush_pending_states)
+
+    def _flush_pending_states(self):
+        """Apply every merged device state collected in the current window."""
+        with self._pending_lock:
+            pending = self._pending_states
+            self._pending_states = {}
+            self._flush_scheduled = False
+        for id, (device_type, info) in pending.items():
+            # Re-resolve: the hub may have been unloaded since the frame arrived.
             registry_value = hub_event_listener.get_registry_entry(self._hub_key, id)
-            entity = registry_value.entity
+            if registry_value is None:
+                continue
+            try:
+                self._apply_device_state(registry_value, id, device_type, info)
+            except Exception:
+                logger.warning(f"error applying hub state for {id}: {info}", exc_info=True)
 
-            reachability_changed = False
-            if "isReachable" in info:
-                try:
-                    logger.debug(f"Setting {id} reachable as {info['isReachable']}")
-                    entity._json_data.is_reachable=info["isReachable"]
-                    reachability_changed = True
-                except Exception as ex:
-                    logger.error(f"Failed to setattr is_reachable on device: {id} for msg: {msg}")
-                    logger.error(ex)
+    def _apply_device_state(self, registry_value: registry_entry, id: str, device_type: str, info: dict):
+        """Apply one (merged) device state to its entity and push it to HA.
 
-            # Process room updates (room info comes as separate field, not in attributes)
-            room_changed = False
-            if "room" in info:
-                try:
-                    room_data = info["room"]
-                    if room_data is not None:
-                        new_room = Room(
-                            id=room_data.get("id"),
-                            name=room_data.get("name"),
-                            color=room_data.get("color"),
-                            icon=room_data.get("icon")
-                        )
-                        if entity._json_data.room is None or entity._json_data.room.id != new_room.id:
-                            logger.debug(f"Setting {id} room to {new_room.name}")
-                            entity._json_data.room = new_room
-                            room_changed = True
-                        # Always ensure HA device registry area matches (even if _json_data room didn't change)
-                        # This handles the case where HA restarts and the room is already set in _json_data
-                        # but not yet in the HA device registry
-                        try:
-                            self._loop.call_soon_threadsafe(
-                                lambda room=new_room.name, device_id=(entity._json_data.relation_id or id): self._hass.async_create_task(
-                                    self._update_device_area(device_id, room)
-                                )
-                            )
-                        except Exception as ex:
-                            logger.error(f"Failed to schedule device area update for {id}: {ex}")
-                    elif entity._json_data.room is not None:
-                        # Room was removed
-                        logger.debug(f"Removing room from {id}")
-                        entity._json_data.room = None
+        Always runs on the event loop (see _flush_pending_states), so the
+        registry side effects below can create their tasks directly.
+        """
+        entity = registry_value.entity
+        # Any frame, changed or not, shows the device is still reporting
+        entity.last_event_at = time.monotonic()
+
+        reachability_changed = False
+        if "isReachable" in info and entity._json_data.is_reachable != info["isReachable"]:
+            try:
+                logger.debug(f"Setting {id} reachable as {info['isReachable']}")
+                entity._json_data.is_reachable=info["isReachable"]
+                reachability_changed = True
+            except Exception as ex:
+                logger.error(f"Failed to setattr is_reachable on device: {id} for state: {info}")
+                logger.error(ex)
+
+        # Relation membership (split devices) only shows up in full device
+        # payloads such as the reconnect resync
+        relation_changed = False
+        if "relationId" in info and getattr(entity._json_data, "relation_id", None) != info["relationId"]:
+            try:
+                old_relation_id = entity._json_data.relation_id
+                entity._json_data.relation_id = info["relationId"]
+                index = hub_event_listener.device_registry.get(self._hub_key)
+                if index is not None:
+                    index.move_relation(id, old_relation_id)
+                relation_changed = True
+            except Exception as ex:
+                logger.error(f"Failed to set relation_id on device: {id} for state: {info}")
+                logger.error(ex)
+
+        # Process room updates (room info comes as separate field, not in attributes)
+        room_changed = False
+        if "room" in info:
+            try:
+                room_data = info["room"]
+                if room_data is not None:
+                    new_room = Room(
+                        id=room_data.get("id"),
+                        name=room_data.get("name"),
+                        color=room_data.get("color"),
+                        icon=room_data.get("icon")
+                    )
+                    if entity._json_data.room is None or entity._json_data.room.id != new_room.id:
+                        logger.debug(f"Setting {id} room to {new_room.name}")
+                        entity._json_data.room = new_room
                         room_changed = True
-                        try:
-                            self._loop.call_soon_threadsafe(
-                                lambda device_id=(entity._json_data.relation_id or id): self._hass.async_create_task(
-                                    self._update_device_area(device_id, "")
-                                )
-                            )
-                        except Exception as ex:
-                            logger.error(f"Failed to schedule device area removal for {id}: {ex}")
-                except Exception as ex:
-                    logger.error(f"Failed to set room on device: {id} for msg: {msg}")
-                    logger.error(ex)
-
-            to_process_attr = process_events_from[device_type]
-            turn_on_off = False
-            has_attributes = "attributes" in info and info["attributes"] is not None
-            name_changed = False
-            new_name = None
-            skip_state_push = False
-
-            if has_attributes:
-                attributes = info["attributes"]
-
-                for key in attributes:
-                    if key not in to_process_attr:
-                        logger.debug(f"attribute {key} with value {attributes[key]} not in list of device type {device_type}, ignoring update...")
-                        continue
+                    # Always ensure HA device registry area matches (even if _json_data room didn't change)
+                    # This handles the case where HA restarts and the room is already set in _json_data
+                    # but not yet in the HA device registry
                     try:
-                        key_attr = to_snake_case(key)
-                        # This is a hack need a better impl
-                        if key_attr == "is_on":
-                            turn_on_off = True
-                        # Track name changes for device registry update
-                        if key == "customName":
-                            old_name = entity._json_data.attributes.custom_name
-                            if old_name != attributes[key]:
-                                name_changed = True
-                                new_name = attributes[key]
-                        logger.debug(f"setting {key_attr}  to {attributes[key]}")
-                        logger.debug(f"Entity before setting: {entity._json_data}")
-
-                        value_to_set = attributes[key]
-                        #Need a hack for outlet with date/time entities
-                        if key in ["timeOfLastEnergyReset","totalEnergyConsumedLastUpdated"]:
-                            logger.debug(f"Got into date/time so will set the value accordingly...")
-                            try :
-                                value_to_set = parser.parse(attributes[key])
-                            except:
-                                #Ignore the exception
-                                logger.warning(f"Failed to convert {attributes[key]} to date/time...")
-
-                        setattr(entity._json_data.attributes,key_attr, value_to_set)
-                        logger.debug(f"Entity after setting: {entity._json_data}")
+                        self._hass.async_create_task(
+                            self._update_device_area(entity._json_data.relation_id or id, new_room.name)
+                        )
                     except Exception as ex:
-                        logger.warning(f"Failed to set attribute key: {key} converted to {key_attr} on device: {id}")
-                        logger.warning(ex)
-                                
-                # Update color_mode for lights when color attributes change.
-                # Guard with _supported_color_modes so we never set a mode the
-                # entity cannot report (e.g. Tradfri Driver is brightness-only
-                # but the hub may still emit colorHue/colorSaturation keys).
-                if device_type == "light" and hasattr(entity, '_color_mode') and hasattr(entity, '_supported_color_modes'):
-                    supported = entity._supported_color_modes or []
-                    if ("colorHue" in attributes or "colorSaturation" in attributes) and ColorMode.HS in supported:
-                        entity._color_mode = ColorMode.HS
-                    elif "colorTemperature" in attributes and ColorMode.COLOR_TEMP in supported:
-                        entity._color_mode = ColorMode.COLOR_TEMP
-
-                # Lights behave odd with hubs when setting attribute one event is generated which
-                # causes brightness or other to toggle so put in a hack to fix that
-                # if its is_on attribute then ignore this routine.
-                # Only the redundant state push is skipped — a customName change
-                # piggybacked on the echo event must still reach the device
-                # registry update below (a bare return used to drop it).
-                if device_type == "light" and entity.should_ignore_update and not turn_on_off:
-                    entity.reset_ignore_update()
-                    logger.debug("Ignoring calling update_ha_state as ignore_update is set")
-                    skip_state_push = True
-
-                # Update HA device registry name if customName changed
-                if name_changed and new_name is not None:
+                        logger.error(f"Failed to schedule device area update for {id}: {ex}")
+                elif entity._json_data.room is not None:
+                    # Room was removed
+                    logger.debug(f"Removing room from {id}")
+                    entity._json_data.room = None
+                    room_changed = True
                     try:
-                        self._loop.call_soon_threadsafe(
-                            lambda name=new_name, device_id=(entity._json_data.relation_id or id): self._hass.async_create_task(
-                                self._update_device_name(device_id, name)
-                            )
+                        self._hass.async_create_task(
+                            self._update_device_area(entity._json_data.relation_id or id, "")
                         )
                     except Exception as ex:
-                        logger.error(f"Failed to schedule device name update for {id}: {ex}")
+                        logger.error(f"Failed to schedule device area removal for {id}: {ex}")
+            except Exception as ex:
+                logger.error(f"Failed to set room on device: {id} for state: {info}")
+                logger.error(ex)
+
+        has_attributes = "attributes" in info and info["attributes"] is not None
+        name_changed = False
+        new_name = None
+        # snake_case names of the attributes set below, so a multi-entity
+        # device only wakes the entities that depend on them
+        changed_attributes = set()
+        color_mode_changed = False
+        # Pending optimistic writes (optimistic_state) absorb their echoes
+        optimistic = getattr(entity, "_optimistic", None)
+
+        if has_attributes:
+            attributes = info["attributes"]
 
-            # Update HA state if attributes changed OR if reachability/room changed
-            if (has_attributes or reachability_changed or room_changed) and not skip_state_push:
-                entity.schedule_update_ha_state(False)
+            for key in attributes:
+                key_attr = key
+                try:
+                    key_attr, converter = attribute_decoders[key]
+                    # Track name changes for device registry update
+                    if key == "customName":
+                        old_name = entity._json_data.attributes.custom_name
+                        if old_name != attributes[key]:
+                            name_changed = True
+                            new_name = attributes[key]
+                    # Lazy %s formatting: these used to render the full device
+                    # model twice per attribute even with debug logging off
+                    logger.debug("setting %s  to %s", key_attr, attributes[key])
+                    logger.debug("Entity before setting: %s", entity._json_data)
+
+                    value_to_set = attributes[key]
+                    #Need a hack for outlet with date/time entities
+                    if converter is not None:
+                        value_to_set = converter(value_to_set)
+
+                    if optimistic is not None and optimistic.absorb(key_attr, value_to_set):
+                        continue
+                    # Gate on the current value: echoes and resync replays
+                    # mostly carry what the model already holds
+                    if getattr(entity._json_data.attributes, key_attr, _MISSING) == value_to_set:
+                        continue
+                    setattr(entity._json_data.attributes,key_attr, value_to_set)
+                    changed_attributes.add(key_attr)
+                    logger.debug("Entity after setting: %s", entity._json_data)
+                except Exception as ex:
+                    logger.warning(f"Failed to set attribute key: {key} converted to {key_attr} on device: {id}")
+                    logger.warning(ex)
+                            
+            # Update color_mode for lights when color attributes change.
+            # Guard with _supported_color_modes so we never set a mode the
+            # entity cannot report (e.g. Tradfri Driver is brightness-only
+            # but the hub may still emit colorHue/colorSaturation keys).
+            if device_type == "light" and hasattr(entity, '_color_mode') and hasattr(entity, '_supported_color_modes'):
+                supported = entity._supported_color_modes or []
+                previous_mode = entity._color_mode
+                if ("colorHue" in attributes or "colorSaturation" in attributes) and ColorMode.HS in supported:
+                    entity._color_mode = ColorMode.HS
+                elif "colorTemperature" in attributes and ColorMode.COLOR_TEMP in supported:
+                    entity._color_mode = ColorMode.COLOR_TEMP
+                color_mode_changed = entity._color_mode != previous_mode
 
-                if registry_value.cascade_entity is not None:
-                    # Cascade the update
-                    logger.debug(f"Cascading to cascade entity : {registry_value.cascade_entity.unique_id}")
-                    registry_value.cascade_entity.schedule_update_ha_state(False)
+            # Update HA device registry name if customName changed
+            if name_changed and new_name is not None:
+                try:
+                    self._hass.async_create_task(
+                        self._update_device_name(entity._json_data.relation_id or id, new_name)
+                    )
+                except Exception as ex:
+                    logger.error(f"Failed to schedule device name update for {id}: {ex}")
+
+        # Cached device_info/name (see ikea_base_device.invalidate_metadata)
+        if name_changed or room_changed or relation_changed:
+            invalidate = getattr(entity, "invalidate_metadata", None)
+            if invalidate is not None:
+                invalidate()
+
+        # Update HA state only if an attribute, reachability, the room or the
+        # relation actually changed
+        if not (changed_attributes or reachability_changed or room_changed or relation_changed or color_mode_changed):
+            if has_attributes or "isReachable" in info or "room" in info:
+                self._gate_hits += 1
+            return
 
-        except Exception:
-            # Visible at default log level: a swallowed DEBUG here used to hide
-            # every event-processing bug behind silently-stale entities.
-            logger.warning(f"error processing hub event: {ws_msg}", exc_info=True)
+        self._gate_misses += 1
+        if getattr(entity, "pushes_by_attribute", False) and not (reachability_changed or room_changed or relation_changed or name_changed):
+            entity.schedule_update_ha_state(False, changed_attributes=changed_attributes)
+        else:
+            # availability, area and device name show on every entity
+            entity.schedule_update_ha_state(False)
+
+        if registry_value.cascade_entity is not None:
+            # Cascade the update
+            logger.debug(f"Cascading to cascade entity : {registry_value.cascade_entity.unique_id}")
+            registry_value.cascade_entity.schedule_update_ha_state(False)
+
+    def stats(self) -> dict:
+        """Counters for the integration's diagnostics."""
+        return {
+            "value_gate_hits": self._gate_hits,
+            "value_gate_misses": self._gate_misses,
+        }
 
     def _send_keepalive(self):
         """Send an application-level text frame to reset the hub's inactivity timer.
@@ -828,7 +1141,21 @@ class hub_event_listener(threading.Thread):
             self._keepalive_timer.cancel()
             self._keepalive_timer = None
 
+    @property
+    def connected(self) -> bool:
+        return self._disconnected_at is None
+
+    def disconnected_for(self) -> float:
+        """Seconds the WebSocket has been down, 0 while it is open."""
+        disconnected_at = self._disconnected_at
+        return 0.0 if disconnected_at is None else time.monotonic() - disconnected_at
+
+    def _mark_disconnected(self) -> None:
+        if self._disconnected_at is None:
+            self._disconnected_at = time.monotonic()
+
     def _on_close(self, ws, close_status_code, close_msg):
+        self._mark_disconnected()
         # Log cleanly when the hub closes the WebSocket. Dirigera sends
         # status 1000 with message "disconnected due to inactivity" when
         # it drops idle connections — this makes that visible at INFO level.
@@ -842,6 +1169,7 @@ class hub_event_listener(threading.Thread):
 
     def _on_open(self, ws):
         self._session_started_at = time.time()
+        self._disconnected_at = None
         logger.info("Dirigera WebSocket opened")
         self._start_keepalive()
         # On a *reconnect* (not the first open), the hub only delivers state
@@ -850,20 +1178,41 @@ class hub_event_listener(threading.Thread):
         # fairly often (every few minutes on some setups), so without this
         # entities silently accumulate stale state until they happen to change
         # again. Re-pull all device state on reconnect. See issue #39.
-        if self._has_opened:
+        if self._has_opened or self._resync_on_open:
+            self._resync_on_open = False
             logger.info("WebSocket reconnected — scheduling device state resync")
-            self._loop.call_soon_threadsafe(
+            # Events missed while disconnected never reached the snapshot;
+            # the resync's /devices fetch reseeds it.
+            snapshot = self._devices_snapshot()
+            if snapshot is not None:
+                snapshot.invalidate()
+            self._call_in_loop(
                 lambda: self._hass.async_create_task(self._resync_all_states())
             )
+            if self._scene_handler is not None:
+                self._call_in_loop(
+                    lambda: self._hass.async_create_task(self._resync_scenes())
+                )
         self._has_opened = True
 
+    def resync_on_first_open(self) -> None:
+        """Resync on the first connect too, as on a reconnect: setup built the
+        entities from the stored inventory, which may be out of date."""
+        self._resync_on_open = True
+
     async def _resync_all_states(self):
         """Re-pull current state for all devices after a reconnect and replay
         it through the normal event path, so changes missed during the
         disconnect gap are caught up. One /devices fetch (no per-device
         hammering); discovery is suppressed during the replay. See issue #39."""
         try:
-            devices = await self._hass.async_add_executor_job(self._hub.get, "/devices")
+            async_client = getattr(self._hub, "async_client", None)
+            if async_client is not None:
+                # Bulk lane: commands go first on a hub that just came back
+                with async_client.priority(async_client.BULK):
+                    devices = await async_client.get("/devices")
+            else:
+                devices = await self._hass.async_add_executor_job(self._hub.get, "/devices")
         except Exception as ex:
             logger.warning(f"State resync failed to fetch /devices: {ex}")
             return
@@ -884,6 +1233,22 @@ class hub_event_listener(threading.Thread):
         finally:
             self._resyncing = False
 
+    async def _resync_scenes(self):
+        """Scene events missed while disconnected: reconcile the scene
+        entities against one /scenes fetch."""
+        try:
+            async_client = getattr(self._hub, "async_client", None)
+            if async_client is not None:
+                with async_client.priority(async_client.BULK):
+                    scenes = await async_client.get("/scenes")
+            else:
+                scenes = await self._hass.async_add_executor_job(self._hub.get, "/scenes")
+        except Exception as ex:
+            logger.warning(f"Scene resync failed to fetch /scenes: {ex}")
+            return
+        self._scene_handler.reconcile(scenes)
+        logger.info(f"Scene resync applied for {len(scenes)} scenes after reconnect")
+
     def create_listener(self):
         try:
             logger.info("Starting dirigera hub event listener")
@@ -906,11 +1271,12 @@ class hub_event_listener(threading.Thread):
             logger.error("Error creating event listener...")
             logger.error(ex)
         finally:
+            self._mark_disconnected()
             self._stop_keepalive()
 
     def stop(self):
-        # NOTE: blocks until the thread exits — call from the event loop via
-        # hass.async_add_executor_job (see async_unload_entry).
+        # NOTE: blocks until the thread exits — from the event loop use
+        # async_stop(), which runs this in the executor.
         logger.info("Listener request for stop..")
 
         self._request_to_stop = True
@@ -925,6 +1291,12 @@ class hub_event_listener(threading.Thread):
         hub_event_listener.unregister_hub(self._hub_key)
         logger.info("Listener stopped..")
 
+    async def async_stop(self):
+        # stop() joins the websocket thread (worst case the full reconnect
+        # backoff), so run it in the executor — calling it directly used to
+        # freeze the event loop during unload/reload.
+        await self._hass.async_add_executor_job(self.stop)
+
     def run(self):
         while True:
             # Blocking call — returns when the WebSocket connection ends
@@ -938,4 +1310,135 @@ class hub_event_listener(threading.Thread):
             # not have to sit out the retry backoff. (This used to be two
             # stacked time.sleep(10) calls — 20s, with the log saying 10.)
             if self._stop_event.wait(timeout=10):
-                break
\ No newline at end of file
+                break
+class async_hub_event_listener(hub_event_listener):
+    """Asyncio-native variant of the hub event listener.
+
+    Runs as one task per hub on HA's event loop and reads the WebSocket with
+    aiohttp. It shares on_message, the reconnect resync in _on_open and the
+    per-hub registry with the threaded listener, but needs no listener thread,
+    no threading.Timer per keepalive and no call_soon_threadsafe hop per event.
+    Entity state (_json_data) is therefore only ever touched on the loop.
+
+    The threading.Thread base is never started; start()/async_stop() replace
+    the thread lifecycle with a background task. stop() still works for
+    callers of the threaded interface.
+    """
+
+    def __init__(self, hub : Hub, hass, discovery_coordinator=None, coalesce_window: float = 0, scene_handler=None):
+        super().__init__(hub, hass, discovery_coordinator, coalesce_window, scene_handler)
+        self._task = None
+        self._ws = None
+        self._stop_task = None
+
+    def _call_in_loop(self, callback):
+        # Already on the event loop: no thread-safe hop needed.
+        callback()
+
+    def start(self):
+        """Start the listener task. Must be called from the event loop."""
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"dirigera_platform event listener {self._hub_key}"
+        )
+
+    def _send_keepalive(self):
+        # Same application-level frame as the threaded listener, but sent
+        # from the loop and rescheduled with call_later instead of a Timer.
+        ws = self._ws
+        if ws is not None and not ws.closed and not self._request_to_stop:
+            self._hass.async_create_task(self._async_send_keepalive(ws))
+        if not self._request_to_stop:
+            self._keepalive_timer = self._loop.call_later(
+                self.KEEPALIVE_INTERVAL, self._send_keepalive)
+
+    async def _async_send_keepalive(self, ws):
+        try:
+            await ws.send_str('{"type":"ping"}')
+            logger.info("WebSocket keepalive sent")
+        except Exception as ex:
+            logger.warning(f"WebSocket keepalive failed: {ex}")
+
+    def _start_keepalive(self):
+        """Schedule the periodic keepalive on the event loop."""
+        self._stop_keepalive()
+        self._keepalive_timer = self._loop.call_later(
+            self.KEEPALIVE_INTERVAL, self._send_keepalive)
+        logger.info(f"WebSocket keepalive timer started ({self.KEEPALIVE_INTERVAL}s interval)")
+
+    async def _async_create_listener(self, session):
+        try:
+            logger.info("Starting dirigera hub event listener (asyncio)")
+            # heartbeat sends WebSocket ping frames like ping_interval does in
+            # the threaded listener; the hub's inactivity timer still needs the
+            # application-level keepalive started in _on_open.
+            async with session.ws_connect(
+                self._hub.websocket_base_url,
+                headers={"Authorization": f"Bearer {self._hub.token}"},
+                heartbeat=30,
+            ) as ws:
+                self._ws = ws
+                self._on_open(ws)
+                async for ws_msg in ws:
+                    if ws_msg.type == aiohttp.WSMsgType.TEXT:
+                        self.on_message(ws, ws_msg.data)
+                    elif ws_msg.type == aiohttp.WSMsgType.ERROR:
+                        self.on_error(ws, ws.exception())
+                        break
+                self._on_close(ws, ws.close_code, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            logger.error("Error creating event listener...")
+            logger.error(ex)
+        finally:
+            self._ws = None
+            self._mark_disconnected()
+            self._stop_keepalive()
+
+    async def _async_run(self):
+        # The hub uses a self-signed certificate (the threaded listener runs
+        # with CERT_NONE), so use HA's shared non-verifying session.
+        session = async_get_clientsession(self._hass, verify_ssl=False)
+        while not self._request_to_stop:
+            await self._async_create_listener(session)
+            logger.debug("Listener task iteration complete...")
+            if self._request_to_stop:
+                break
+            logger.warning("Failed to create listener or listener exited, sleeping 10 seconds before retrying")
+            # Cancelled by async_stop, so an unload never sits out the backoff.
+            await asyncio.sleep(10)
+
+    def stop(self):
+        """Stop from any thread, as the threaded listener's stop() does.
+
+        Off the loop (an executor job) this waits for async_stop(). The loop
+        itself must not block, so there it only schedules async_stop().
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._stop_task = self._loop.create_task(self.async_stop())
+            return
+        asyncio.run_coroutine_threadsafe(self.async_stop(), self._loop).result()
+
+    async def async_stop(self):
+        logger.info("Listener request for stop..")
+        self._request_to_stop = True
+        self._stop_event.set()
+        self._stop_keepalive()
+        try:
+            if self._ws is not None:
+                await self._ws.close()
+        except Exception:
+            pass
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        hub_event_listener.unregister_hub(self._hub_key)
+        logger.info("Listener stopped..")
@@ -1,7 +1,16 @@
+import asyncio
 import logging 
 from enum import Enum
 
-from .dirigera_lib_patch import HubX
+from .dirigera_lib_patch import (
+    HubX,
+    HackScene,
+    EMPTY_SCENE_PREFIX,
+    dict_to_controller,
+    dict_to_motion_sensor_x,
+    merge_environment_sensors,
+    merge_outlets,
+)
 from .scene import ikea_scene
 from .light import ikea_bulb
 from .base_classes import (
@@ -16,6 +25,14 @@ from .base_classes import (
     ikea_light_sensor_device,
 )
 
+from dirigera.devices.air_purifier import dict_to_air_purifier
+from dirigera.devices.blinds import dict_to_blind
+from dirigera.devices.environment_sensor import dict_to_environment_sensor
+from dirigera.devices.light import dict_to_light
+from dirigera.devices.light_sensor import dict_to_light_sensor
+from dirigera.devices.open_close_sensor import dict_to_open_close_sensor
+from dirigera.devices.outlet import dict_to_outlet
+from dirigera.devices.water_sensor import dict_to_water_sensor
 from dirigera.devices.scene import Trigger, TriggerDetails, EndTriggerEvent
 
 logger = logging.getLogger("custom_components.dirigera_platform")
@@ -34,6 +51,58 @@ class HubDeviceType(Enum):
     WATER_SENSOR        = "water_sensor"
     LIGHT_SENSOR        = "light_sensor"
 
+# One row per device list: the (payload field, value) pairs routed to it, the
+# merge for split devices (the electricalSensor half of a plug, the halves of
+# a TIMMERFLOTTE), the dirigera model and the entity wrapper(hass, hub, model).
+# A device can match both a "type" and a "deviceType" pair, as it could match
+# the separate HubX.get_* filters this replaces.
+DEVICE_TABLE = {
+    HubDeviceType.LIGHT: (
+        [("type", "light")], None, dict_to_light, lambda hass, hub, light: ikea_bulb(hub, light)),
+    HubDeviceType.BLIND: (
+        [("type", "blinds")], None, dict_to_blind, ikea_blinds_device),
+    HubDeviceType.AIR_PURIFIER: (
+        [("type", "airPurifier")], None, dict_to_air_purifier, ikea_starkvind_air_purifier_device),
+    HubDeviceType.OUTLET: (
+        [("type", "outlet"), ("deviceType", "electricalSensor")], merge_outlets, dict_to_outlet, ikea_outlet_device),
+    HubDeviceType.ENVIRONMENT_SENSOR: (
+        [("deviceType", "environmentSensor")], merge_environment_sensors, dict_to_environment_sensor,
+        ikea_vindstyrka_device),
+    HubDeviceType.CONTROLLER: (
+        [("type", "controller")], None, dict_to_controller, ikea_controller_device),
+    HubDeviceType.OPEN_CLOSE_SENSOR: (
+        [("deviceType", "openCloseSensor")], None, dict_to_open_close_sensor, ikea_open_close_device),
+    HubDeviceType.MOTION_SENSOR: (
+        # MYGGSPRAY reports as occupancySensor
+        [("deviceType", "motionSensor"), ("deviceType", "occupancySensor")], None, dict_to_motion_sensor_x,
+        ikea_motion_sensor_device),
+    HubDeviceType.LIGHT_SENSOR: (
+        [("deviceType", "lightSensor")], None, dict_to_light_sensor, ikea_light_sensor_device),
+    HubDeviceType.WATER_SENSOR: (
+        [("deviceType", "waterSensor")], None, dict_to_water_sensor, ikea_water_sensor_device),
+}
+
+# (payload field, value) -> device lists, derived from DEVICE_TABLE
+_DEVICE_ROUTES = {}
+for _kind, (_matches, *_) in DEVICE_TABLE.items():
+    for _match in _matches:
+        _DEVICE_ROUTES.setdefault(_match, []).append(_kind)
+
+def classify_devices(hub: HubX, devices: list) -> dict:
+    """Walk a /devices payload once and build the dirigera models of every
+    DEVICE_TABLE list. Blocking (pydantic models): run it in the executor."""
+    raw = {kind: [] for kind in DEVICE_TABLE}
+    for device in devices:
+        for field in ("type", "deviceType"):
+            for kind in _DEVICE_ROUTES.get((field, device.get(field)), ()):
+                raw[kind].append(device)
+
+    models = {}
+    for kind, (_, merge, factory, _) in DEVICE_TABLE.items():
+        payloads = merge(raw[kind]) if merge is not None else raw[kind]
+        models[kind] = [factory(payload, hub) for payload in payloads]
+    return models
+
 class ikea_gateway:
     def __init__(self):
         Trigger.update_forward_refs()
@@ -42,85 +111,48 @@ class ikea_gateway:
         
         logger.debug("dirigera_platform init...")
         self.devices = {}
-
-    async def make_devices(self, hass, ip, token):
-        hub: HubX = HubX(token, ip)
-
-        # issue #38 punt 1+4: coalesce de ~10 /devices-fetches van de get_X-calls hieronder
-        # tot één enkele fetch. try/finally garandeert dat de cache-vlag áltijd reset —
-        # de hub-instance blijft leven in de entities en mag runtime geen stale cache houden.
-        hub.begin_devices_batch()
-        try:
-            #Scenes
-            scenes = await hass.async_add_executor_job(hub.get_scenes)
-            logger.debug(f"Found {len(scenes)} scenes...")
-            empty_scenes = []
-            non_empty_scenes = []
-            for scene in scenes:
-                if scene.name.startswith("dirigera_integration_empty_scene_"):
-                    empty_scenes.append(ikea_scene(hub,scene))
-                else:
-                    non_empty_scenes.append(ikea_scene(hub,scene))
-
-            self.devices[HubDeviceType.EMPTY_SCENE] = empty_scenes
-            self.devices[HubDeviceType.SCENE] = non_empty_scenes
-
-            #Light
-            lights = await hass.async_add_executor_job(hub.get_lights)
-            logger.debug(f"Found {len(lights)} total of all light devices to setup...")
-            self.devices[HubDeviceType.LIGHT] = [ikea_bulb(hub, light) for light in lights]
-
-            #Cover
-            blinds = await hass.async_add_executor_job(hub.get_blinds)
-            logger.debug(f"Found {len(blinds)} total of all blinds devices to setup...")
-            self.devices[HubDeviceType.BLIND] = [ikea_blinds_device(hass, hub, b) for b in blinds]
-
-            #Air Purifier
-            air_purifiers = await hass.async_add_executor_job(hub.get_air_purifiers)
-            logger.debug(f"Found {len(air_purifiers)} total of all air purifiers devices to setup...")
-            self.devices[HubDeviceType.AIR_PURIFIER] = [ikea_starkvind_air_purifier_device(hass, hub, a) for a in air_purifiers]
-
-            #Outlets
-            outlets = await hass.async_add_executor_job(hub.get_outlets)
-            logger.debug(f"Found {len(outlets)} total of all outlets devices to setup...")
-            self.devices[HubDeviceType.OUTLET] = [ ikea_outlet_device(hass, hub, x) for x in outlets ]
-
-            #Environment Sensor
-            environment_sensors = await hass.async_add_executor_job(hub.get_environment_sensors)
-            logger.debug(f"Found {len(environment_sensors)} total of all environment devices entities to setup...")
-            self.devices[HubDeviceType.ENVIRONMENT_SENSOR] = [ikea_vindstyrka_device(hass, hub, env_device) for env_device in environment_sensors]
-
-            #Controllers
-            controllers = await hass.async_add_executor_job(hub.get_controllers)
-            logger.debug(f"Found {len(controllers)} total of all controllers devices to setup...")
-            self.devices[HubDeviceType.CONTROLLER] = [ikea_controller_device(hass, hub, x) for x in controllers]
-
-            #Open Close Sensors
-            open_close_sensors = await hass.async_add_executor_job(hub.get_open_close_sensors)
-            logger.debug(f"Found {len(open_close_sensors)} total of all open_close devices to setup...")
-            self.devices[HubDeviceType.OPEN_CLOSE_SENSOR] = [ikea_open_close_device(hass, hub, x) for x in open_close_sensors]
-
-            #Motion Sensors
-            motion_sensors = await hass.async_add_executor_job(hub.get_motion_sensors)
-            logger.debug(f"Found {len(motion_sensors)} total of all motion_sensors devices to setup...")
-            self.devices[HubDeviceType.MOTION_SENSOR] = [ikea_motion_sensor_device(hass, hub, x) for x in motion_sensors]
-
-            #Light Sensors (MYGGSPRAY illuminance)
-            light_sensors = await hass.async_add_executor_job(hub.get_light_sensors)
-            logger.debug(f"Found {len(light_sensors)} total of all light_sensors devices to setup...")
-            self.devices[HubDeviceType.LIGHT_SENSOR] = [ikea_light_sensor_device(hass, hub, x) for x in light_sensors]
-
-            #Water Sensors
-            water_sensors = await hass.async_add_executor_job(hub.get_water_sensors)
-            logger.debug(f"Found {len(water_sensors)} total of all water_sensors devices to setup...")
-            self.devices[HubDeviceType.WATER_SENSOR] = [ikea_water_sensor_device(hass, hub, x) for x in water_sensors]
-
-            logger.info(
-                "make_devices: coalesced all device-type lookups into %d /devices fetch(es) [issue #38 #1]",
-                hub._devices_fetch_count,
+        # Built from the stored inventory and not yet checked against the hub
+        self.stale = False
+        # controller id -> press patterns needing an empty scene (sensor setup)
+        self.empty_scene_clicks = {}
+
+    async def make_devices(self, hass, hub: HubX, inventory: dict = None) -> dict:
+        """Build the device lists from ``inventory`` ({"devices": ..., "scenes":
+        ...}, the stored one) or, without it, from the live hub. Returns the
+        inventory used."""
+        self.stale = inventory is not None
+        if inventory is None:
+            # One /devices fetch classified in a single pass (used to be ~11
+            # executor jobs filtering the same list), alongside /scenes
+            devices, scenes = await asyncio.gather(
+                hass.async_add_executor_job(hub.get, "/devices"),
+                hass.async_add_executor_job(hub.get, "/scenes"),
             )
-        finally:
-            hub.end_devices_batch()
+            inventory = {"devices": devices, "scenes": scenes}
+
+        def classify():
+            scenes = [HackScene.make_scene(hub, scene) for scene in inventory["scenes"]]
+            return scenes, classify_devices(hub, inventory["devices"])
+
+        scenes, models = await hass.async_add_executor_job(classify)
+
+        #Scenes
+        logger.debug(f"Found {len(scenes)} scenes...")
+        empty_scenes = []
+        non_empty_scenes = []
+        for scene in scenes:
+            if scene.name.startswith(EMPTY_SCENE_PREFIX):
+                empty_scenes.append(ikea_scene(hub,scene))
+            else:
+                non_empty_scenes.append(ikea_scene(hub,scene))
+
+        self.devices[HubDeviceType.EMPTY_SCENE] = empty_scenes
+        self.devices[HubDeviceType.SCENE] = non_empty_scenes
+
+        for kind, (_, _, _, wrapper) in DEVICE_TABLE.items():
+            logger.debug(f"Found {len(models[kind])} total of all {kind.value} devices to setup...")
+            self.devices[kind] = [wrapper(hass, hub, model) for model in models[kind]]
+        return inventory
 
     def get_devices(self, key):
         if key not in self.devices:
@@ -0,0 +1,46 @@
+"""
+Last-known hub inventory, persisted per config entry.
+
+Setup used to block on the hub's /devices and /scenes and raised
+ConfigEntryNotReady while the hub was slow or still booting (it takes 20 s or
+more after a power cut). With a stored inventory, entities are built from it
+at once and catch up once the hub answers (see async_setup_entry).
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from homeassistant import core
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+logger = logging.getLogger("custom_components.dirigera_platform")
+
+STORAGE_VERSION = 1
+
+
+class inventory_store:
+    def __init__(self, hass: core.HomeAssistant, entry_id: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.inventory.{entry_id}")
+
+    async def async_load(self) -> Optional[Dict[str, Any]]:
+        """{"devices": [...], "scenes": [...], "saved_at": epoch} or None."""
+        try:
+            data = await self._store.async_load()
+        except Exception as ex:
+            # A corrupt file only costs the fast start
+            logger.warning(f"Ignoring stored hub inventory: {ex}")
+            return None
+        if not data or "devices" not in data or "scenes" not in data:
+            return None
+        return data
+
+    async def async_save(self, devices: list, scenes: list) -> None:
+        # The raw hub payloads: setup classifies them exactly like live ones
+        await self._store.async_save({"devices": devices, "scenes": scenes, "saved_at": time.time()})
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
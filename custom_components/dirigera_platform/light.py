@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import Optional
 
@@ -10,8 +11,10 @@ from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
     ATTR_COLOR_TEMP_KELVIN,
     ATTR_HS_COLOR,
+    ATTR_TRANSITION,
     ColorMode,
     LightEntity,
+    LightEntityFeature,
 )
 
 from homeassistant.const import CONF_IP_ADDRESS, CONF_TOKEN
@@ -20,10 +23,30 @@ from homeassistant.helpers.entity import DeviceInfo
 
 from .const import DOMAIN, CONF_HIDE_DEVICE_SET_BULBS, PLATFORM, DISCOVERY_COORDINATOR
 from .hub_event_listener import hub_event_listener, registry_entry
+from .dirigera_lib_patch import async_hub_call, PRIORITY_COMMAND
+from .command_queue import device_command_queue
+from .device_commands import device_commands
 from .device_discovery import get_discovery_coordinator
 
 logger = logging.getLogger("custom_components.dirigera_platform")
 
+def light_options(kwargs: dict) -> dict:
+    """Command options next to the attributes: the hub's transitionTime (ms)
+    when HA asked for a transition."""
+    if ATTR_TRANSITION in kwargs:
+        return {"transitionTime": int(kwargs[ATTR_TRANSITION] * 1000)}
+    return {}
+
+# Model attributes a command sets to put a bulb in each colour mode
+COLOR_MODE_ATTRIBUTES = {
+    ColorMode.COLOR_TEMP: frozenset({"color_temperature"}),
+    ColorMode.HS: frozenset({"color_hue", "color_saturation"}),
+}
+
+def to_light_level(brightness: int) -> int:
+    """HASS brightness (0-255) as the hub's lightLevel (1-100)."""
+    return max(1, min(100, int((brightness / 255) * 100)))
+
 async def async_setup_entry(
     hass: core.HomeAssistant,
     config_entry: config_entries.ConfigEntry,
@@ -34,8 +57,7 @@ async def async_setup_entry(
     config = hass.data[DOMAIN][config_entry.entry_id]
     logger.debug(config)
 
-    # hub = dirigera.Hub(config[CONF_TOKEN], config[CONF_IP_ADDRESS])
-    hub = Hub(config[CONF_TOKEN], config[CONF_IP_ADDRESS])
+    hub = config["hub"]
 
     #Backward compatibility
     hide_device_set_bulbs = True
@@ -117,27 +139,56 @@ class device_set_model:
         logger.debug(f"Adding {bulb.name} to device_set : {self.name}")
         self._lights.append(bulb)
 
-class ikea_bulb(LightEntity):
-    
+class ikea_bulb(device_commands, LightEntity):
+    # Sent as the hub's transitionTime next to the attributes (light_options)
+    _attr_supported_features = LightEntityFeature.TRANSITION
+    # See ikea_base_device.silence_threshold
+    silence_threshold = 3600
+    last_event_at = None
+
     def __init__(self, hub, json_data : Light) -> None:
         logger.debug("ikea_bulb ctor...")
         self._hub = hub
         self._json_data = json_data
-        self._ignore_update = False 
+        # The hub's echo frames (it can send stale intermediate levels first)
+        # are absorbed until the target arrives.
+        self._init_commands()
+        # Colour mode to go back to if the write that switched it rolls back
+        self._color_mode_before = None
+        # Built on first use, dropped by invalidate_metadata (rename/room change)
+        self._device_info = None
 
         # Register the device for updates
         hub_event_listener.register(self._hub.websocket_base_url, self._json_data.id, registry_entry(self))
 
         self.set_state()
 
-    # When changing brightness a random update is sent by hub with brightness level before
-    # the actual value is sent. So this is a hack to ignore that random update
     @property
-    def should_ignore_update(self):
-        return self._ignore_update
-    
-    def reset_ignore_update(self):
-        self._ignore_update = False 
+    def _command_hass(self):
+        return self.hass
+
+    def _push_state(self, changed_attributes: set) -> None:
+        if self.hass is None:
+            return
+        self.async_schedule_update_ha_state(False)
+        entry = hub_event_listener.get_registry_entry(self._hub.websocket_base_url, self.unique_id)
+        if entry is not None and entry.cascade_entity is not None:
+            entry.cascade_entity.async_schedule_update_ha_state(False)
+
+    def _switch_color_mode(self, color_mode) -> None:
+        # An earlier colour write still pending keeps the mode from before it
+        pending = self._optimistic.pending
+        if not any(key in pending for keys in COLOR_MODE_ATTRIBUTES.values() for key in keys):
+            self._color_mode_before = self._color_mode
+        self._color_mode = color_mode
+
+    def _push_rollback(self, keys: set) -> None:
+        # The colour mode is not a model attribute, so the rollback of the
+        # write that switched it has to take it back here
+        if self._color_mode_before is not None and not keys.isdisjoint(COLOR_MODE_ATTRIBUTES.get(self._color_mode, ())):
+            self._color_mode = self._color_mode_before
+            self._color_mode_before = None
+        super()._push_rollback(keys)
 
     def set_state(self):
         # Set Color capabilities
@@ -194,9 +245,16 @@ class ikea_bulb(LightEntity):
     def available(self):
         return self._json_data.is_reachable
 
+    def invalidate_metadata(self) -> None:
+        self._device_info = None
+
     @property
     def device_info(self) -> DeviceInfo:
+        if self._device_info is None:
+            self._device_info = self._compute_device_info()
+        return self._device_info
 
+    def _compute_device_info(self) -> DeviceInfo:
         return DeviceInfo(
             identifiers={("dirigera_platform", self._json_data.relation_id or self._json_data.id)},
             name=self.name,
@@ -227,12 +285,7 @@ class ikea_bulb(LightEntity):
     @light_level.setter
     def light_level(self, value):
         # value is HASS brightness (0-255); the hub expects 1-100
-        scaled = int((value/255)*100)
-        if scaled < 1:
-            scaled = 1
-        elif scaled > 100:
-            scaled = 100
-        self._json_data.attributes.light_level = scaled
+        self._json_data.attributes.light_level = to_light_level(value)
 
     @property
     def max_color_temp_kelvin(self):
@@ -297,63 +350,63 @@ class ikea_bulb(LightEntity):
     async def async_update(self):
         try:
             logger.debug("async update called on bulb..")
-            self._json_data = await self.hass.async_add_executor_job(self._hub.get_light_by_id, self._json_data.id)
+            self._json_data = await async_hub_call(self.hass, self._hub, "get_light_by_id", self._json_data.id)
+            self._optimistic.overlay()
             self.set_state()
+            self.invalidate_metadata()
         except Exception as ex:
             logger.error("error encountered running update on : {}".format(self.name))
             logger.error(ex)
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
+
+    async def async_poll(self) -> None:
+        """Refresh from the hub's poll cycle (hub_poll_coordinator)."""
+        await self.async_update()
+        if self.hass is not None:
+            self.async_schedule_update_ha_state(False)
         
     async def async_turn_on(self, **kwargs):
         logger.debug("light turn_on...")
         logger.debug(kwargs)
 
         try:
-            # Probably change
-            self.reset_ignore_update()
-            await self.hass.async_add_executor_job(self._json_data.set_light,True)
+            # Everything requested goes out as one PATCH: "on at 40% warm
+            # white" used to be three sequential round-trips to the hub.
+            attributes = {"isOn": True}
+            local = {"is_on": True}
+            color_mode = None
 
             if ATTR_BRIGHTNESS in kwargs:
                 # brightness requested
-                # The setter will move the HASS value of 0-100 to 1-255
-                self.light_level = int(kwargs[ATTR_BRIGHTNESS])
-                logger.debug("scaled brightness : {}".format(self.light_level))
-                # update
-                await self.hass.async_add_executor_job(self._json_data.set_light_level,self.light_level)
-                self._ignore_update = True 
+                # HASS sends brightness in the range 0-255; the hub expects 1-100
+                level = to_light_level(int(kwargs[ATTR_BRIGHTNESS]))
+                logger.debug("scaled brightness : {}".format(level))
+                attributes["lightLevel"] = local["light_level"] = level
 
             if ATTR_COLOR_TEMP_KELVIN in kwargs and ColorMode.COLOR_TEMP in self._supported_color_modes:
                 # color temp requested
                 logger.debug("Request to set color temp...")
                 ct = kwargs[ATTR_COLOR_TEMP_KELVIN]
                 logger.debug("Set CT (Kelvin): {}".format(ct))
-                # Use direct API patch to bypass library validation issues
-                # The hub expects Kelvin values directly
-                await self.hass.async_add_executor_job(
-                    self._hub.patch,
-                    f"/devices/{self._json_data.id}",
-                    [{"attributes": {"colorTemperature": ct}}]
-                )
-                # The direct patch bypasses the lib, so it does not update the
-                # local model (unlike set_light/set_light_color). Without this
-                # write-through, HA kept showing the old color temperature:
-                # the state write below read stale attributes and the hub echo
-                # is suppressed via _ignore_update.
-                self.color_temperature = ct
-                self._color_mode = ColorMode.COLOR_TEMP
-                self._ignore_update = True
+                # Sent raw to bypass library validation issues; the hub
+                # expects Kelvin values directly.
+                # Shown optimistically like the rest: without it HA kept
+                # showing the old color temperature until the hub echo.
+                attributes["colorTemperature"] = local["color_temperature"] = ct
+                color_mode = ColorMode.COLOR_TEMP
 
             if ATTR_HS_COLOR in kwargs and ColorMode.HS in self._supported_color_modes:
                 logger.debug("Request to set color HS")
                 hs_tuple = kwargs[ATTR_HS_COLOR]
                 hue = hs_tuple[0]
                 saturation = hs_tuple[1] / 100  # Saturation is 0 - 1 at IKEA
+                attributes["colorHue"] = local["color_hue"] = hue
+                attributes["colorSaturation"] = local["color_saturation"] = saturation
+                color_mode = ColorMode.HS
 
-                # set_light_color updates the local model attributes itself
-                await self.hass.async_add_executor_job(self._json_data.set_light_color, hue, saturation)
-                self._color_mode = ColorMode.HS
-                self._ignore_update = True
-            self.async_schedule_update_ha_state(False)
+            if color_mode is not None:
+                self._switch_color_mode(color_mode)
+            await self.submit_command(attributes, local, light_options(kwargs))
         except Exception as ex:
             logger.error("error encountered turning on : {}".format(self.name))
             logger.error(ex)
@@ -362,9 +415,7 @@ class ikea_bulb(LightEntity):
     async def async_turn_off(self, **kwargs):
         logger.debug("light turn_off...")
         try:
-            self.reset_ignore_update()
-            await self.hass.async_add_executor_job(self._json_data.set_light,False)
-            self.async_schedule_update_ha_state(False)
+            await self.submit_command({"isOn": False}, {"is_on": False}, light_options(kwargs))
         except Exception as ex:
             logger.error("error encountered turning off : {}".format(self.name))
             logger.error(ex)
@@ -378,13 +429,16 @@ class ikea_bulb(LightEntity):
 # replicate
 
 class ikea_bulb_device_set(LightEntity):
+    _attr_supported_features = LightEntityFeature.TRANSITION
+
     def __init__(self, hub, device_set: device_set_model, first_bulb: ikea_bulb) -> None:
         logger.debug("ikea_bulb device_set ctor...")
         logger.debug(f"Setting up device_set {device_set.id} with first bulb {first_bulb.unique_id}")
         self._hub = hub
         self._controller = first_bulb
         self._device_set = device_set
-        self._patch_url = f"/devices/set/{device_set.id}?deviceType=light"    
+        self._patch_url = f"/devices/set/{device_set.id}?deviceType=light"
+        self._commands = device_command_queue(self._send_patch)    
 
         # Update cascade entity
         registry_entry_of_bulb = hub_event_listener.get_registry_entry(self._hub.websocket_base_url, first_bulb.unique_id)
@@ -464,14 +518,32 @@ class ikea_bulb_device_set(LightEntity):
             logger.error(ex)
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
 
-    def patch_command(self, key_val : dict):
-        data = [{"attributes" : key_val}]
+    async def _send_patch(self, attributes: dict, options: dict) -> None:
+        await async_hub_call(
+            self.hass, self._hub, "patch", self._patch_url, [{"attributes": attributes, **options}],
+            priority=PRIORITY_COMMAND,
+        )
+
+    async def patch_command(self, key_val : dict, kwargs: Optional[dict] = None, local: Optional[dict] = None):
+        # The set has no state of its own: it shows the first bulb, so that is
+        # where the optimistic values (model names in local) go
+        optimistic = self._controller._optimistic
+        options = light_options(kwargs or {})
+        local = local or {}
+        transition = options.get("transitionTime", 0) / 1000
+        optimistic.expect(local)
+        self._controller._push_state(set(local))
         try:
-            self._hub.patch(self._patch_url, data=data)
+            await self._commands.submit(key_val, options)
+        except asyncio.CancelledError:
+            optimistic.sent(local, transition)
+            raise
         except Exception as ex:
+            optimistic.rollback(local)
             logger.error("error encountered running update on : {}".format(self.name))
             logger.error(ex)
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
+        optimistic.sent(local, transition)
 
     # As indicated the turn on / brightness / color etc can be set by a patch command
     # the corresponding get doesnt work 
@@ -480,8 +552,9 @@ class ikea_bulb_device_set(LightEntity):
         logger.debug(kwargs)
 
         try:
-            self._controller.reset_ignore_update()
-            await self.hass.async_add_executor_job(self.patch_command,{"isOn": True})
+            # One PATCH for the whole set, as for a single bulb
+            attributes = {"isOn": True}
+            local = {"is_on": True}
 
             if ATTR_BRIGHTNESS in kwargs:
                 # brightness requested
@@ -495,8 +568,7 @@ class ikea_bulb_device_set(LightEntity):
                 scaled = max(1, min(100, round(level * 100 / 255)))
                 logger.debug("Set brightness : {}".format(level))
                 logger.debug("Set scaled brightness : {}".format(scaled))
-                await self.hass.async_add_executor_job(self.patch_command, {"lightLevel" : scaled})
-                self._controller._ignore_update = True
+                attributes["lightLevel"] = local["light_level"] = scaled
 
             if ATTR_COLOR_TEMP_KELVIN in kwargs and ColorMode.COLOR_TEMP in self._controller.supported_color_modes:
                 # color temp requested
@@ -504,17 +576,16 @@ class ikea_bulb_device_set(LightEntity):
                 logger.debug("Request to device_set set color temp...")
                 ct = kwargs[ATTR_COLOR_TEMP_KELVIN]
                 logger.debug("Set CT : {}".format(ct))
-                await self.hass.async_add_executor_job(self.patch_command, {"colorTemperature" : ct})
-                self._controller._ignore_update = True
+                attributes["colorTemperature"] = local["color_temperature"] = ct
 
             if ATTR_HS_COLOR in kwargs and ColorMode.HS in self._controller.supported_color_modes:
                 logger.debug("Request to set color HS device_set")
                 hs_tuple = kwargs[ATTR_HS_COLOR]
-                hue = hs_tuple[0]
-                saturation = hs_tuple[1] / 100  # Saturation is 0 - 1 at IKEA
-                self._controller._ignore_update = True
+                attributes["colorHue"] = local["color_hue"] = hs_tuple[0]
+                # Saturation is 0 - 1 at IKEA
+                attributes["colorSaturation"] = local["color_saturation"] = hs_tuple[1] / 100
 
-                await self.hass.async_add_executor_job(self.patch_command,{ "colorHue" : hue, "colorSaturation" : saturation})
+            await self.patch_command(attributes, kwargs, local)
 
         except Exception as ex:
             logger.error("error encountered turning on device_set : {}".format(self.name))
@@ -522,10 +593,9 @@ class ikea_bulb_device_set(LightEntity):
             raise HomeAssistantError(ex, DOMAIN, "hub_exception")
 
     async def async_turn_off(self, **kwargs):
-        self._controller.reset_ignore_update()
         logger.debug("light device_set turn_off...")
         try:
-            await self.hass.async_add_executor_job(self.patch_command, {"isOn": False})
+            await self.patch_command({"isOn": False}, kwargs, {"is_on": False})
         except Exception as ex:
             logger.error("error encountered turning off device_set : {}".format(self.name))
             logger.error(ex)
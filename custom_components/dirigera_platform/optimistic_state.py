@@ -0,0 +1,175 @@
+"""
+Optimistic state for Dirigera writes.
+
+A command used to show up in HA only once the hub echoed it back, and a light
+ignored exactly one echo after a brightness/colour change (_ignore_update) to
+hide the stale intermediate frame the hub sends first. The hub may send more
+than one such frame, so the light still flickered.
+
+Instead, a command writes its target values into the model at once and
+records a pending expectation per attribute. While an attribute is pending,
+hub frames for it are absorbed: the matching echo confirms it without a state
+write, other values (intermediate frames) are held back. A failed write, or no
+matching echo before the deadline, rolls the attribute back to the last value
+the hub reported. The deadline starts once the write has been sent, so a
+command queued behind others or a slow hub does not time out before the hub
+has seen it. A command with a transition (a light fading over 10 s) gets its
+length added to the deadline: the hub only echoes the target at the end of
+the fade.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+# Seconds the hub gets to echo a command before it is rolled back
+OPTIMISTIC_TIMEOUT = 5.0
+
+# The hub rounds some values it echoes: an echo this close to the target
+# confirms it
+ECHO_TOLERANCE = {
+    "light_level": 1,
+    "color_temperature": 10,
+    "color_hue": 1.0,
+    "color_saturation": 0.01,
+}
+
+
+def _same(key: str, expected, value) -> bool:
+    if expected == value:
+        return True
+    if _is_number(expected) and _is_number(value):
+        return math.isclose(expected, value, rel_tol=1e-9, abs_tol=ECHO_TOLERANCE.get(key, 1e-9))
+    # The model keeps enums (fan_mode) where the hub sends their raw value
+    return getattr(expected, "value", expected) == getattr(value, "value", value)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _pending:
+    __slots__ = ("target", "hub_value", "deadline")
+
+    def __init__(self, target, hub_value, deadline):
+        self.target = target
+        # Last value the hub reported; what a rollback restores
+        self.hub_value = hub_value
+        # None until the write has been sent
+        self.deadline = deadline
+
+
+class optimistic_state:
+    def __init__(self, attributes: Callable[[], Any], push: Callable[[Set[str]], None],
+                 timeout: float = OPTIMISTIC_TIMEOUT):
+        # attributes() returns the current model attributes: polls replace the
+        # whole model, so it is looked up on every use. push(keys) is called
+        # with the attributes a rollback restored.
+        self._attributes = attributes
+        self._push = push
+        self._timeout = timeout
+        self._pending: Dict[str, _pending] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.confirmed = 0
+        self.held = 0
+        self.rolled_back = 0
+
+    def expect(self, local: Dict[str, Any]) -> None:
+        """Write ``local`` (model names) into the model and wait for its echo.
+        The wait is only timed once sent() reports the write sent."""
+        attributes = self._attributes()
+        for key, value in local.items():
+            pending = self._pending.get(key)
+            hub_value = pending.hub_value if pending is not None else getattr(attributes, key, None)
+            self._pending[key] = _pending(value, hub_value, None)
+            setattr(attributes, key, value)
+
+    def sent(self, local: Dict[str, Any], transition: float = 0.0) -> None:
+        """The write carrying ``local`` reached the hub: wait for its echo for
+        up to the timeout plus ``transition`` seconds from now."""
+        now = time.monotonic()
+        deadline = now + self._timeout + transition
+        armed = False
+        for key, value in local.items():
+            pending = self._pending.get(key)
+            # Confirmed already, or replaced by a newer command not sent yet
+            if pending is None or pending.target != value:
+                continue
+            pending.deadline = deadline
+            armed = True
+        if armed:
+            self._schedule_next(now)
+
+    def absorb(self, key: str, value) -> bool:
+        """Called by the event listener for every decoded hub attribute.
+
+        True when the frame must not be applied: the echo of a pending write,
+        or another value for an attribute that is still pending.
+        """
+        pending = self._pending.get(key)
+        if pending is None:
+            return False
+        if pending.deadline is not None and pending.deadline <= time.monotonic():
+            # Timed out, the timer just has not run yet: the hub wins
+            del self._pending[key]
+            self.rolled_back += 1
+            return False
+        if _same(key, pending.target, value):
+            del self._pending[key]
+            self.confirmed += 1
+            # A rounded echo is what the hub holds: apply it
+            return not (_is_number(value) and pending.target != value)
+        else:
+            pending.hub_value = value
+            self.held += 1
+        return True
+
+    def overlay(self) -> None:
+        """Re-apply pending targets after a poll replaced the model."""
+        attributes = self._attributes()
+        for key, pending in self._pending.items():
+            pending.hub_value = getattr(attributes, key, None)
+            setattr(attributes, key, pending.target)
+
+    def rollback(self, keys: Iterable[str]) -> None:
+        """Restore the hub's values of ``keys`` (a write failed) and push."""
+        self._restore([key for key in keys if key in self._pending])
+
+    def _restore(self, keys) -> None:
+        attributes = self._attributes()
+        for key in keys:
+            pending = self._pending.pop(key)
+            setattr(attributes, key, pending.hub_value)
+            self.rolled_back += 1
+        if keys:
+            self._push(set(keys))
+
+    def _schedule_next(self, now: float) -> None:
+        # Deadlines differ with the transitions: wake for the earliest
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        deadlines = [p.deadline for p in self._pending.values() if p.deadline is not None]
+        if deadlines:
+            self._timer = asyncio.get_running_loop().call_later(max(0.0, min(deadlines) - now), self._expire)
+
+    def _expire(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        self._restore([key for key, pending in self._pending.items()
+                       if pending.deadline is not None and pending.deadline <= now])
+        self._schedule_next(now)
+
+    @property
+    def pending(self) -> Dict[str, Any]:
+        return {key: pending.target for key, pending in self._pending.items()}
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "confirmed": self.confirmed,
+            "held": self.held,
+            "rolled_back": self.rolled_back,
+        }
@@ -0,0 +1,222 @@
+"""
+One poll cycle per hub instead of one per entity.
+
+HA used to poll every entity on its own: each environment sensor and air
+purifier entity through ikea_base_device._throttled_update, each blind
+through get_blinds_by_id and each scene through get_scene_by_id, which cost
+one /scenes/{id} request per scene. This coordinator runs one cycle per
+interval for the whole hub, and polls a device only when its events may
+have been missed:
+- a device silent for longer than its silence_threshold is due. The event
+  listener stamps last_event_at on every frame, so a device stops being polled
+  as soon as it reports again;
+- once the WebSocket has been down for longer than DISCONNECT_GRACE, every
+  device is due on every cycle, and the scenes (otherwise kept current by
+  their events, see scene.hub_scenes) are reconciled against one /scenes
+  fetch.
+
+Due devices get their model from the /devices snapshot (HubX.devices_snapshot).
+While the stream is up, the snapshot is only refetched once its TTL has run
+out. During an outage no events keep it current, so it is refetched every
+cycle. A cycle costs at most two requests, whatever the number of entities.
+
+Cycles are staggered so the hubs see a flat load instead of a burst on every
+tick: the hubs' cycles take evenly spaced phases within POLL_INTERVAL (see
+poll_phases) and each start is jittered. Each device also gets a stable offset
+on top of its silence threshold, so devices that went quiet together (all of
+them, right after setup) fall due over several cycles instead of in one.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import random
+import time
+import zlib
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger("custom_components.dirigera_platform")
+
+# Seconds between poll cycles (HA's default entity scan interval)
+POLL_INTERVAL = 30
+# Seconds the WebSocket may be down (a reconnect usually takes a few) before
+# every device is polled
+DISCONNECT_GRACE = 60
+# Share of POLL_INTERVAL a cycle may start early or late
+POLL_JITTER = 0.1
+# Share of its silence threshold a device's offset spreads it over
+DEVICE_SPREAD = 0.25
+
+
+class poll_phases:
+    """Spreads the poll cycles of every hub evenly over POLL_INTERVAL."""
+
+    def __init__(self) -> None:
+        self._members = []
+
+    def join(self, member) -> None:
+        if member not in self._members:
+            self._members.append(member)
+
+    def leave(self, member) -> None:
+        if member in self._members:
+            self._members.remove(member)
+
+    def phase(self, member) -> float:
+        # Re-read every cycle: the phases re-space as hubs come and go
+        if member not in self._members:
+            return 0.0
+        return self._members.index(member) * POLL_INTERVAL / len(self._members)
+
+
+_phases = poll_phases()
+
+
+def next_slot(now: float, phase: float, after: Optional[float] = None) -> float:
+    """First phase + k * POLL_INTERVAL later than now and than after."""
+    start = now if after is None else max(now, after)
+    return phase + (math.floor((start - phase) / POLL_INTERVAL) + 1) * POLL_INTERVAL
+
+
+def device_offset(unique_id: str, threshold: float) -> float:
+    # crc32 rather than hash(): the same device keeps its offset across restarts
+    return (zlib.crc32(unique_id.encode()) % 1000) / 1000 * threshold * DEVICE_SPREAD
+
+
+class hub_poll_coordinator:
+    def __init__(self, hass, hub, devices: Callable[[], Iterable[Any]], scenes=None,
+                 disconnected_for: Callable[[], float] = lambda: float("inf")) -> None:
+        # devices() returns the hub's registered devices, read every cycle so
+        # discovered devices join in. scenes reconciles a /scenes list
+        # (scene.hub_scenes). disconnected_for() is how long the event
+        # listener's WebSocket has been down, 0 while it is open.
+        self._hass = hass
+        self._hub = hub
+        self._devices = devices
+        self._scenes = scenes
+        self._disconnected_for = disconnected_for
+        # Setup loaded every device just now: silence counts from here
+        self._started_at = time.monotonic()
+        # unique_id -> when the cycle last polled the device
+        self._polled_at = {}
+        self._running = False
+        self._timer = None
+        self._slot: Optional[float] = None
+        self.outage = False
+        self.polled = 0
+        self.cycles = 0
+        self.skipped = 0
+        self.failures = 0
+        self.devices_fetches = 0
+        self.scenes_fetches = 0
+        self.last_duration: Optional[float] = None
+
+    async def _get(self, route: str) -> Any:
+        # Polls run in the scheduler's default (poll) lane
+        client = self._hub.async_client
+        if client is not None:
+            return await client.get(route)
+        return await self._hass.async_add_executor_job(self._hub.get, route)
+
+    def start(self) -> None:
+        """Join the hubs' phases and schedule the first cycle."""
+        _phases.join(self)
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        _phases.leave(self)
+
+    def _schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # After half an interval past the last slot: a cycle jittered early
+        # must not land on the same slot again
+        after = None if self._slot is None else self._slot + POLL_INTERVAL / 2
+        self._slot = next_slot(now, _phases.phase(self), after)
+        jitter = random.uniform(-POLL_JITTER, POLL_JITTER) * POLL_INTERVAL
+        self._timer = loop.call_later(max(0.0, self._slot + jitter - now), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._schedule()
+        self._hass.async_create_background_task(self.async_refresh(), "dirigera_platform poll cycle")
+
+    async def async_refresh(self, now=None) -> None:
+        """Run one cycle; the cycle timer (see start) calls this."""
+        if self._running:
+            # The previous cycle is still waiting on a slow hub
+            self.skipped += 1
+            return
+        self._running = True
+        start = time.monotonic()
+        try:
+            self.outage = self._disconnected_for() > DISCONNECT_GRACE
+            await self._refresh_devices()
+            await self._refresh_scenes()
+            self.cycles += 1
+        finally:
+            self._running = False
+            self.last_duration = time.monotonic() - start
+
+    def _silent(self, device, now: float) -> bool:
+        threshold = getattr(device, "silence_threshold", None)
+        if threshold is None:
+            return False
+        heard_at = max(getattr(device, "last_event_at", None) or 0.0, self._polled_at.get(device.unique_id, self._started_at))
+        return now - heard_at > threshold + device_offset(device.unique_id, threshold)
+
+    async def _refresh_devices(self) -> None:
+        now = time.monotonic()
+        devices = [
+            device for device in self._devices()
+            if hasattr(device, "async_poll") and (self.outage or self._silent(device, now))
+        ]
+        if not devices:
+            return
+        if self.outage or not self._hub.devices_snapshot.is_fresh():
+            try:
+                await self._get("/devices")
+                self.devices_fetches += 1
+            except Exception as ex:
+                self.failures += 1
+                logger.warning(f"Poll of the hub's devices failed: {ex}")
+                return
+        for device in devices:
+            self._polled_at[device.unique_id] = now
+            self.polled += 1
+            try:
+                # Served from the snapshot seeded above: no request
+                await device.async_poll()
+            except Exception as ex:
+                self.failures += 1
+                logger.error(f"error encountered polling {device.name}: {ex}")
+
+    async def _refresh_scenes(self) -> None:
+        if self._scenes is None or not self.outage:
+            return
+        try:
+            data = await self._get("/scenes")
+            self.scenes_fetches += 1
+        except Exception as ex:
+            self.failures += 1
+            logger.warning(f"Poll of the hub's scenes failed: {ex}")
+            return
+        self._scenes.reconcile(data)
+
+    def stats(self) -> dict:
+        """Cycle counters, for the integration's diagnostics."""
+        return {
+            "interval_seconds": POLL_INTERVAL,
+            "phase_seconds": round(_phases.phase(self), 1),
+            "cycles": self.cycles,
+            "outage": self.outage,
+            "device_polls": self.polled,
+            "skipped_cycles": self.skipped,
+            "failures": self.failures,
+            "devices_fetches": self.devices_fetches,
+            "scenes_fetches": self.scenes_fetches,
+            "last_duration_seconds": None if self.last_duration is None else round(self.last_duration, 3),
+        }
@@ -4,7 +4,7 @@ import logging
 from typing import Any
 
 #from dirigera import Hub
-from .dirigera_lib_patch import HubX, HackScene
+from .dirigera_lib_patch import HubX, HackScene, EMPTY_SCENE_PREFIX, async_hub_call, PRIORITY_COMMAND
 #from dirigera.devices.scene import Scene as DirigeraScene
 #from dirigera.devices.scene import Trigger, TriggerDetails, EndTriggerEvent
 
@@ -12,6 +12,7 @@ from homeassistant.components.scene import Scene
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN, PLATFORM
@@ -31,6 +32,8 @@ async def async_setup_entry(
     #EndTriggerEvent.update_forward_refs()
 
     async_add_entities(hass.data[DOMAIN][entry.entry_id]["gateway"].scenes)
+    # Scenes created on the hub later are added by hub_scenes
+    hass.data[DOMAIN][entry.entry_id]["scenes"].set_add_entities(async_add_entities)
     logger.debug("async_setup_entry complete for scenes...")
 
 class ikea_scene(Scene):
@@ -59,10 +62,25 @@ class ikea_scene(Scene):
         #return to_hass_icon(self._dirigera_scene.info.icon)
         return ikea_to_hass_icon(self._scene.icon)
     
+    @property
+    def should_poll(self) -> bool:
+        # Kept current by the hub's scene events (hub_scenes)
+        return False
+
+    def apply_payload(self, data: dict) -> None:
+        """Take the scene's payload from a scene event or a /scenes list."""
+        scene = HackScene.make_scene(self._hub, data)
+        changed = (scene.name, scene.icon) != (self._scene.name, self._scene.icon)
+        self._scene = scene
+        if changed and self.hass is not None:
+            self.async_write_ha_state()
+
     async def async_activate(self, **kwargs: Any) -> None:
         """Trigger Dirigera Scene."""
         logger.debug("Activating scene '%s' (%s)", self.name, self.unique_id)
-        await self.hass.async_add_executor_job(self._scene.trigger)
+        await async_hub_call(
+            self.hass, self._hub, "post", f"/scenes/{self._scene.id}/trigger", priority=PRIORITY_COMMAND
+        )
 
     async def async_update(self) -> None:
         """Fetch updated scene definition from Dirigera."""
@@ -71,8 +89,85 @@ class ikea_scene(Scene):
             # NB: assign to _scene (the attribute name/icon/activate read) —
             # this used to write to a never-read _dirigera_scene leftover,
             # so hub-side scene renames/icon changes never propagated.
-            self._scene = await self.hass.async_add_executor_job(self._hub.get_scene_by_id, self.unique_id)
+            self._scene = await async_hub_call(self.hass, self._hub, "get_scene_by_id", self.unique_id)
         except Exception as ex:
             logger.error("Error encountered on update of '%s' (%s)", self.name, self.unique_id)
             logger.error(ex)
-            raise HomeAssistantError from ex
\ No newline at end of file
+            raise HomeAssistantError from ex
+
+
+class hub_scenes:
+    """
+    The scenes of one hub, kept current from the event listener's
+    sceneCreated, sceneUpdated and sceneDeleted events instead of polling each
+    scene. After a reconnect (or while the WebSocket is down, from the poll
+    cycle) a whole /scenes list is reconciled in one go.
+
+    The integration's empty controller scenes never become entities; they are
+    only tracked in the gateway's empty_scenes, which sensor setup reconciles.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub: HubX, gateway) -> None:
+        self._hass = hass
+        self._hub = hub
+        self._gateway = gateway
+        self._add_entities: AddEntitiesCallback = None
+
+    def set_add_entities(self, async_add_entities: AddEntitiesCallback) -> None:
+        self._add_entities = async_add_entities
+
+    def _find(self, scene_id: str):
+        for scenes in (self._gateway.scenes, self._gateway.empty_scenes):
+            for entity in scenes:
+                if entity.unique_id == scene_id:
+                    return scenes, entity
+        return None, None
+
+    def scene_updated(self, data: dict) -> None:
+        if "id" not in data or "info" not in data:
+            return
+        _, entity = self._find(data["id"])
+        if entity is not None:
+            entity.apply_payload(data)
+            return
+        # Created while we were not listening
+        self.scene_created(data)
+
+    def scene_created(self, data: dict) -> None:
+        if "id" not in data or "info" not in data:
+            return
+        if self._find(data["id"])[1] is not None:
+            self.scene_updated(data)
+            return
+        entity = ikea_scene(self._hub, HackScene.make_scene(self._hub, data))
+        if entity.name.startswith(EMPTY_SCENE_PREFIX):
+            self._gateway.empty_scenes.append(entity)
+            return
+        logger.info("Scene '%s' (%s) added on the hub", entity.name, entity.unique_id)
+        self._gateway.scenes.append(entity)
+        if self._add_entities is not None:
+            self._add_entities([entity])
+
+    def scene_deleted(self, data: dict) -> None:
+        scenes, entity = self._find(data.get("id"))
+        if entity is None:
+            return
+        scenes.remove(entity)
+        if entity.hass is None:
+            return
+        logger.info("Scene '%s' (%s) deleted on the hub", entity.name, entity.unique_id)
+        registry = er.async_get(self._hass)
+        if entity.entity_id and registry.async_get(entity.entity_id) is not None:
+            registry.async_remove(entity.entity_id)
+        else:
+            self._hass.async_create_task(entity.async_remove())
+
+    def reconcile(self, payloads: list) -> None:
+        """Apply a full /scenes list: update, add and remove to match it."""
+        present = {data["id"] for data in payloads}
+        for scenes in (self._gateway.scenes, self._gateway.empty_scenes):
+            for entity in list(scenes):
+                if entity.unique_id not in present:
+                    self.scene_deleted({"id": entity.unique_id})
+        for data in payloads:
+            self.scene_updated(data)
@@ -1,6 +1,6 @@
 import logging
 
-from .dirigera_lib_patch import HubX
+from .dirigera_lib_patch import HubX, async_reconcile_empty_scenes
 
 from .base_classes import (
     battery_percentage_sensor,
@@ -43,18 +43,14 @@ async def async_setup_entry(
 
     config = hass.data[DOMAIN][config_entry.entry_id]
 
-    hub = HubX(config[CONF_TOKEN], config[CONF_IP_ADDRESS])
+    hub = config["hub"]
 
     platform: ikea_gateway = hass.data[DOMAIN][config_entry.entry_id]["gateway"]
 
-    # Precuationary delete all empty scenes
-    if len(platform.empty_scenes) > 0:
-        await hass.async_add_executor_job(hub.delete_empty_scenes)
-
     # Power-sensor push throttle (#40); configurable via the integration options.
     power_push_throttle = config_entry.data.get(CONF_POWER_PUSH_THROTTLE, DEFAULT_POWER_PUSH_THROTTLE)
 
-    await add_controllers_sensors(hass, async_add_entities, hub, platform.controllers)
+    await add_controllers_sensors(hass, async_add_entities, hub, platform)
     await add_environment_sensors(async_add_entities, platform.environment_sensors)
     await add_outlet_power_attrs(async_add_entities, platform.outlets, power_push_throttle)
 
@@ -207,12 +203,14 @@ async def add_air_purifier_sensors(async_add_entities, air_purifiers):
 
     async_add_entities(air_purifier_entities)
 
-async def add_controllers_sensors(hass, async_add_entities, hub, controllers):
+async def add_controllers_sensors(hass, async_add_entities, hub, platform: ikea_gateway):
     logger.debug("Starting to add controller sensors...")
+    controllers = platform.controllers
     # Multi-button controllers (BILRESA, SOMRIG, RODRET, STYRBAR, ...) are
     # returned by the hub as N separate controller devices that share a
     # relation_id. Each half still needs its own empty scene so that its
     # own button presses generate remotePressEvents.
+    clicks_by_controller = {}
     for controller in controllers:
         clicks_supported = controller._json_data.capabilities.can_send
         clicks_supported = [ x for x in clicks_supported if x.endswith("Press") ]
@@ -220,8 +218,17 @@ async def add_controllers_sensors(hass, async_add_entities, hub, controllers):
         if len(clicks_supported) == 0:
             logger.debug(f"Controller {controller._json_data.id} has no press capabilities in can_send: {controller._json_data.capabilities.can_send} - will still register for remotePressEvent")
         else:
-            logger.debug(f"Will be creating empty scene for {controller._json_data.id}")
-            await hass.async_add_executor_job(hub.create_empty_scene,controller._json_data.id, clicks_supported)
+            clicks_by_controller[controller._json_data.id] = clicks_supported
+
+    # Scenes kept from the last run stay; only missing ones are created and
+    # ones no controller needs deleted (this used to delete and re-create
+    # all of them on every restart or options save). A stale (stored) scene
+    # list is reconciled once the hub answers, see async_setup_entry.
+    platform.empty_scene_clicks = clicks_by_controller
+    if not platform.stale:
+        await async_reconcile_empty_scenes(
+            hass, hub, clicks_by_controller, [scene._scene for scene in platform.empty_scenes]
+        )
 
     # Group by physical device and elect one primary per group: only the
     # primary becomes an HA entity. Rebind the other halves' device_registry
@@ -245,7 +252,7 @@ async def add_controllers_sensors(hass, async_add_entities, hub, controllers):
         for other in group:
             if other is primary:
                 continue
-            hub_event_listener.device_registry.setdefault(primary._hub.websocket_base_url, {})[other._json_data.id] = registry_entry(primary)
+            hub_event_listener.rebind(primary._hub.websocket_base_url, other._json_data.id, registry_entry(primary))
 
     logger.debug("Found {} controller devices to setup...".format(len(controller_entities)))
     async_add_entities(controller_entities)
\ No newline at end of file
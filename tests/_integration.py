@@ -0,0 +1,131 @@
+"""
+Loader for the tests of integration modules that use relative imports
+(light, base_classes, ikea_gateway, the package __init__).
+
+Like benchmarks/_harness.py, it loads them under a synthetic package with
+Home Assistant, dirigera and the other third-party imports replaced by
+permissive stubs, so the real code runs unchanged. The standalone tests
+install stubs of their own under the same names, so ours are put back before
+every import.
+"""
+import asyncio
+import importlib
+import importlib.util
+import os
+import sys
+import types
+
+PACKAGE_DIR = os.path.join(os.path.dirname(__file__), "..", "custom_components", "dirigera_platform")
+PACKAGE = "dirigera_platform_uut"
+_STUBS = {}
+
+
+class _Anything(type):
+    """Metaclass for permissive stand-ins: any class attribute exists."""
+
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return name
+
+
+def _placeholder(name):
+    return _Anything(name, (), {"__init__": lambda self, *args, **kwargs: None})
+
+
+def _stub(name, permissive=True, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    if permissive:
+        def __getattr__(attr):
+            if attr.startswith("__"):
+                raise AttributeError(attr)
+            value = _placeholder(attr)
+            setattr(m, attr, value)
+            return value
+
+        m.__getattr__ = __getattr__
+    sys.modules[name] = _STUBS[name] = m
+    parent, _, child = name.rpartition(".")
+    if parent in sys.modules:
+        setattr(sys.modules[parent], child, m)
+    return m
+
+
+class Entity:
+    """Stand-in for homeassistant.helpers.entity.Entity: records state writes."""
+
+    hass = None
+
+    def async_schedule_update_ha_state(self, force_refresh=False):
+        self.state_writes = getattr(self, "state_writes", 0) + 1
+
+    def schedule_update_ha_state(self, force_refresh=False):
+        self.state_writes = getattr(self, "state_writes", 0) + 1
+
+
+class _Schema:
+    @staticmethod
+    def extend(schema):
+        return schema
+
+
+def _entity(name):
+    return type(name, (Entity,), {})
+
+
+def stub_third_party():
+    for name in ("homeassistant", "homeassistant.components", "homeassistant.helpers", "dirigera",
+                 "dirigera.devices", "dirigera.hub", "requests"):
+        _stub(name)
+    _stub("websocket", WebSocketApp=object)
+    _stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}), ClientResponseError=Exception)
+    _stub("voluptuous")
+    _stub("requests.adapters")
+    _stub("homeassistant.core", HomeAssistantError=Exception)
+    _stub("homeassistant.exceptions", HomeAssistantError=Exception, ConfigEntryNotReady=Exception)
+    _stub("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+    _stub("homeassistant.config_entries")
+    _stub("homeassistant.components.light", LightEntity=_entity("LightEntity"), PLATFORM_SCHEMA=_Schema,
+          ATTR_BRIGHTNESS="brightness", ATTR_COLOR_TEMP_KELVIN="color_temp_kelvin", ATTR_HS_COLOR="hs_color",
+          ATTR_TRANSITION="transition")
+    for platform, entity in (("sensor", "SensorEntity"), ("binary_sensor", "BinarySensorEntity"),
+                             ("cover", "CoverEntity"), ("fan", "FanEntity"), ("switch", "SwitchEntity"),
+                             ("scene", "Scene")):
+        _stub(f"homeassistant.components.{platform}", **{entity: _entity(entity)})
+    _stub("homeassistant.helpers.entity", Entity=Entity, DeviceInfo=dict)
+    for helper in ("storage", "event", "entity_platform", "config_validation", "device_registry",
+                   "entity_registry", "area_registry"):
+        _stub(f"homeassistant.helpers.{helper}")
+    _stub("homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None)
+    for model in ("device", "air_purifier", "blinds", "environment_sensor", "light_sensor", "controller",
+                  "light", "outlet", "scene", "motion_sensor", "open_close_sensor", "water_sensor"):
+        _stub(f"dirigera.devices.{model}")
+    _stub("dirigera.hub.abstract_smart_home_hub")
+
+
+def load_integration(module_name: str):
+    """Import ``module_name`` ("__init__" for the package module itself) from
+    the integration package with the stubs in place. Modules are loaded once
+    per test run and shared by the tests."""
+    if PACKAGE not in sys.modules:
+        stub_third_party()
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        pkg = types.ModuleType(PACKAGE)
+        pkg.__path__ = [PACKAGE_DIR]
+        sys.modules[PACKAGE] = pkg
+    sys.modules.update(_STUBS)
+    if module_name != "__init__":
+        return importlib.import_module(f"{PACKAGE}.{module_name}")
+    # As a plain submodule of the synthetic package, so its relative imports
+    # resolve to the modules the other tests load
+    name = f"{PACKAGE}._entry"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(PACKAGE_DIR, "__init__.py"), submodule_search_locations=None,
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
@@ -0,0 +1,476 @@
+"""
+Tests for AsyncHubX, the event-loop client entities await instead of running
+every command and poll in Home Assistant's shared executor.
+
+Pins that the typed helpers build the same models as HubX (bound to the
+blocking hub, with the outlet energy merge applied), that a 404 maps to the
+ValueError dirigera raises, and that async_hub_call only falls back to the
+executor when the entry has no async client, and the request scheduler's
+lanes, adaptive limit and cancellation of queued requests. Also pins the devices_snapshot
+both clients read get_*_by_id from: served from memory, updated by events
+without mutating what readers hold, refetched after its TTL or invalidate(),
+and that callers joined on one GET do not share the parsed payload.
+
+dirigera_lib_patch.py is loaded standalone with third-party imports stubbed,
+as in the other tests.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import types
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+class _ClientResponseError(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+def _factory(data, client):
+    return types.SimpleNamespace(data=data, client=client, id=data["id"])
+
+
+class _Base:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+_stub("aiohttp", ClientResponseError=_ClientResponseError, ClientTimeout=lambda total: total, ClientSession=object)
+_stub("requests", Session=object, Response=object)
+_stub("requests.adapters", HTTPAdapter=object)
+
+
+class _Hub:
+    def __init__(self, token, ip_address, port="8443", api_version="v1"):
+        self.api_base_url = f"https://{ip_address}:{port}/{api_version}"
+        self.token = token
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+_stub("dirigera", Hub=_Hub)
+_stub("dirigera.devices")
+_stub("dirigera.devices.device", Attributes=_Base, Device=_Base)
+_stub("dirigera.hub")
+_stub("dirigera.hub.abstract_smart_home_hub", AbstractSmartHomeHub=object)
+_stub("dirigera.devices.scene", Info=object, Icon=object, Trigger=object, TriggerDetails=object, ControllerType=object)
+_stub("dirigera.devices.outlet", Outlet=object, dict_to_outlet=_factory)
+_stub("dirigera.devices.environment_sensor", EnvironmentSensor=object, dict_to_environment_sensor=_factory)
+for _mod, _fx in (
+    ("air_purifier", "dict_to_air_purifier"),
+    ("blinds", "dict_to_blind"),
+    ("light", "dict_to_light"),
+    ("light_sensor", "dict_to_light_sensor"),
+    ("open_close_sensor", "dict_to_open_close_sensor"),
+    ("water_sensor", "dict_to_water_sensor"),
+):
+    _stub(f"dirigera.devices.{_mod}", **{_fx: _factory})
+
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "dirigera_lib_patch.py"
+)
+_spec = importlib.util.spec_from_file_location("lib_patch_async_uut", _PATH)
+lib_patch = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lib_patch)
+AsyncHubX = lib_patch.AsyncHubX
+devices_snapshot = lib_patch.devices_snapshot
+async_hub_call = lib_patch.async_hub_call
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status = status
+        self.ok = status < 400
+        self._body = b"" if payload is None else json.dumps(payload).encode()
+
+    async def read(self):
+        return self._body
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise _ClientResponseError(self.status)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def request(self, method, url, json=None, headers=None, ssl=None, timeout=None):
+        route = url.split("/v1", 1)[1]
+        self.calls.append((method, route, json, headers))
+        return FakeResponse(*self.routes.get((method, route), (404, None)))
+
+
+class BlockingHub(_Hub):
+    async_client = None
+
+    def __init__(self):
+        super().__init__("tok", "10.0.0.2")
+        self.gets = []
+        self.devices_snapshot = devices_snapshot(ttl=300)
+
+    def get(self, route):
+        self.gets.append(route)
+        return {"route": route}
+
+
+def test_outlet_is_merged_and_bound_to_the_blocking_hub():
+    hub = BlockingHub()
+    devices = [
+        {"id": "plug_1", "type": "outlet", "deviceType": "outlet", "relationId": "r1", "attributes": {"isOn": True}},
+        {"id": "plug_2", "type": "sensor", "deviceType": "electricalSensor", "relationId": "r1",
+         "attributes": {"currentAmps": 0.4}},
+    ]
+    session = FakeSession({("GET", "/devices"): (200, devices)})
+    client = AsyncHubX(hub, session)
+
+    outlet = asyncio.run(client.get_outlet_by_id("plug_1"))
+
+    assert outlet.client is hub
+    assert outlet.data["attributes"] == {"isOn": True, "currentAmps": 0.4}
+    assert session.calls[0][3] == {"Authorization": "Bearer tok"}
+    stats = client.stats()
+    assert stats.pop("scheduler")["admitted"]["poll"] == 1
+    assert stats == {"requests": 1, "in_flight": 0, "peak_in_flight": 1, "collapsed_gets": 0}
+
+
+def test_typed_helpers_check_the_type_and_map_404_to_value_error():
+    client = AsyncHubX(BlockingHub(), FakeSession({
+        ("GET", "/devices"): (200, [{"id": "blind-1", "type": "blinds", "deviceType": "blinds"}]),
+    }))
+
+    async def _run():
+        assert (await client.get_blinds_by_id("blind-1")).id == "blind-1"
+        for id_ in ("blind-1", "missing"):
+            try:
+                await client.get_light_by_id(id_)
+            except ValueError:
+                continue
+            raise AssertionError(f"{id_} must raise ValueError")
+
+    asyncio.run(_run())
+
+
+def test_async_hub_call_uses_the_executor_only_without_an_async_client():
+    hub = BlockingHub()
+    executor_jobs = []
+
+    class FakeHass:
+        async def async_add_executor_job(self, fx, *args):
+            executor_jobs.append(fx.__name__)
+            return fx(*args)
+
+    async def _run():
+        assert await async_hub_call(FakeHass(), hub, "get", "/scenes") == {"route": "/scenes"}
+        assert executor_jobs == ["get"]
+
+        session = FakeSession({("POST", "/scenes/s1/trigger"): (202, None)})
+        hub.async_client = AsyncHubX(hub, session)
+        assert await async_hub_call(FakeHass(), hub, "post", "/scenes/s1/trigger") is None
+        assert executor_jobs == ["get"]
+        assert session.calls[0][:2] == ("POST", "/scenes/s1/trigger")
+
+    asyncio.run(_run())
+
+
+def test_by_id_reads_are_served_from_the_event_maintained_snapshot():
+    hub = BlockingHub()
+    devices = [
+        {"id": "plug_1", "type": "outlet", "deviceType": "outlet", "relationId": "r1", "attributes": {"isOn": True}},
+        {"id": "plug_2", "type": "sensor", "deviceType": "electricalSensor", "relationId": "r1",
+         "attributes": {"currentAmps": 0.4}},
+    ]
+    session = FakeSession({("GET", "/devices"): (200, devices)})
+    client = AsyncHubX(hub, session)
+
+    async def _run():
+        first = await client.get_outlet_by_id("plug_1")
+        held = hub.devices_snapshot.get("plug_2")
+        # the websocket stream keeps the snapshot current
+        hub.devices_snapshot.apply_state({"id": "plug_2", "attributes": {"currentAmps": 1.5}})
+        second = await client.get_outlet_by_id("plug_1")
+        return first, held, second
+
+    first, held, second = asyncio.run(_run())
+    assert [c[1] for c in session.calls] == ["/devices"]
+    assert first.data["attributes"]["currentAmps"] == 0.4
+    assert second.data["attributes"]["currentAmps"] == 1.5
+    # readers keep a consistent dict; the merge did not write into the snapshot
+    assert held["attributes"] == {"currentAmps": 0.4}
+    assert hub.devices_snapshot.get("plug_1")["attributes"] == {"isOn": True}
+
+
+def test_snapshot_is_refetched_after_ttl_or_invalidate():
+    hub = BlockingHub()
+    hub.devices_snapshot = devices_snapshot(ttl=0)
+    session = FakeSession({("GET", "/devices"): (200, [{"id": "blind-1", "type": "blinds", "deviceType": "blinds"}])})
+    client = AsyncHubX(hub, session)
+
+    async def _run():
+        await client.get_blinds_by_id("blind-1")
+        await asyncio.sleep(0.01)
+        await client.get_blinds_by_id("blind-1")
+        hub.devices_snapshot._ttl = 300
+        await client.get_blinds_by_id("blind-1")
+        hub.devices_snapshot.invalidate()
+        await client.get_blinds_by_id("blind-1")
+
+    asyncio.run(_run())
+    assert [c[1] for c in session.calls] == ["/devices"] * 3
+    assert hub.devices_snapshot.stats()["inventory_fetches"] == 3
+
+
+def test_relation_indexed_merge_matches_full_merge_and_is_invalidated_per_group():
+    devices = [
+        {"id": "env-1_1", "type": "sensor", "deviceType": "environmentSensor", "relationId": "e1",
+         "attributes": {"currentTemperature": 21.0, "currentRH": None}},
+        {"id": "plug_1", "type": "outlet", "deviceType": "outlet", "relationId": "r1", "attributes": {"isOn": True}},
+        {"id": "env-1_2", "type": "sensor", "deviceType": "environmentSensor", "relationId": "e1",
+         "attributes": {"currentRH": 40}},
+        {"id": "plug_2", "type": "sensor", "deviceType": "electricalSensor", "relationId": "r1",
+         "attributes": {"currentAmps": 0.4}},
+        {"id": "lamp", "type": "light", "deviceType": "light", "attributes": {"isOn": False}},
+    ]
+    snapshot = devices_snapshot(ttl=300)
+    snapshot.seed(devices)
+    merge_outlets, merge_env = lib_patch.merge_outlets, lib_patch.merge_environment_sensors
+
+    for merge in (merge_outlets, merge_env):
+        full = {d["id"]: d for d in merge(devices)}
+        for device in devices:
+            assert snapshot.merged(device["id"], merge) == full.get(device["id"])
+    assert snapshot.stats()["split_device_merges"] == 10
+    # served from the per-device cache until its relation group changes
+    snapshot.merged("plug_1", merge_outlets)
+    snapshot.merged("env-1_1", merge_env)
+    assert snapshot.stats()["split_device_merges"] == 10
+
+    snapshot.apply_state({"id": "plug_2", "attributes": {"currentAmps": 1.0}})
+    assert snapshot.merged("plug_1", merge_outlets)["attributes"]["currentAmps"] == 1.0
+    snapshot.merged("env-1_1", merge_env)
+    assert snapshot.stats()["split_device_merges"] == 11
+
+    # the plug's sensor leaves the relation: the energy attributes go with it
+    snapshot.apply_state({"id": "plug_2", "relationId": "r9"})
+    assert "currentAmps" not in snapshot.merged("plug_1", merge_outlets)["attributes"]
+
+
+def test_concurrent_gets_of_one_route_share_a_single_request():
+    hub = BlockingHub()
+    session = FakeSession({
+        ("GET", "/scenes/s1"): (200, {"id": "s1", "info": {"name": "Evening", "icon": "scenes_cake"}}),
+        ("GET", "/scenes/s2"): (200, {"id": "s2", "info": {"name": "Night", "icon": "scenes_cake"}}),
+    })
+    client = AsyncHubX(hub, session)
+
+    async def _run():
+        scenes = await asyncio.gather(
+            client.get_scene_by_id("s1"), client.get_scene_by_id("s1"), client.get_scene_by_id("s2"),
+        )
+        # a later call is a new flight, not a stale shared result
+        await client.get_scene_by_id("s1")
+        return scenes
+
+    scenes = asyncio.run(_run())
+    assert [scene.name for scene in scenes] == ["Evening", "Evening", "Night"]
+    assert [c[1] for c in session.calls] == ["/scenes/s1", "/scenes/s2", "/scenes/s1"]
+    assert client.stats()["collapsed_gets"] == 1
+
+
+def test_joined_callers_and_the_snapshot_get_their_own_payloads():
+    hub = BlockingHub()
+    devices = [{"id": "lamp_1", "type": "light", "deviceType": "light", "attributes": {"isOn": True}}]
+    session = FakeSession({("GET", "/devices"): (200, devices)})
+    client = AsyncHubX(hub, session)
+
+    async def _run():
+        return await asyncio.gather(client.get("/devices"), client.get("/devices"))
+
+    first, second = asyncio.run(_run())
+    assert [c[1] for c in session.calls] == ["/devices"]
+    first[0]["attributes"]["isOn"] = False
+    assert second == devices
+    assert hub.devices_snapshot.get("lamp_1")["attributes"] == {"isOn": True}
+
+
+def test_single_flight_shares_result_and_error_across_threads():
+    import threading
+
+    flights = lib_patch.single_flight()
+    release = threading.Event()
+    started = []
+
+    def slow_fetch():
+        started.append(True)
+        release.wait(5)
+        return {"devices": 3}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.run("/devices", slow_fetch))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        if flights.collapsed + flights.calls == 4:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert started == [True]
+    assert results == [{"devices": 3}] * 4
+    assert (flights.calls, flights.collapsed) == (1, 3)
+
+    def failing_fetch():
+        raise ValueError("Device id not found")
+
+    try:
+        flights.run("/devices/x", failing_fetch)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("the leader's error must propagate")
+    assert flights.calls == 2
+
+
+def test_scheduler_serves_commands_first_and_keeps_a_slot_for_them():
+    scheduler = lib_patch.hub_scheduler(2)
+    order = []
+
+    async def request(name, lane, hold):
+        with lib_patch.request_priority(lane):
+            async with scheduler.slot():
+                order.append(name)
+                await hold.wait()
+
+    async def _run():
+        resync = asyncio.Event()
+        # background traffic takes every slot and queues more behind it
+        busy = [asyncio.ensure_future(request(f"bulk{i}", lib_patch.PRIORITY_BULK, resync)) for i in range(4)]
+        polls = [asyncio.ensure_future(request(f"poll{i}", lib_patch.PRIORITY_POLL, resync)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert order == ["bulk0", "bulk1"]
+
+        # a switch press does not wait for any of it
+        command = asyncio.ensure_future(request("switch", lib_patch.PRIORITY_COMMAND, asyncio.Event()))
+        await asyncio.sleep(0)
+        assert order[-1] == "switch"
+        command.cancel()
+
+        resync.set()
+        await asyncio.gather(*busy, *polls)
+        return scheduler.stats()
+
+    stats = asyncio.run(_run())
+    # the polls overtook the bulk requests that queued before them
+    assert order[2:] == ["switch", "poll0", "poll1", "bulk2", "bulk3"]
+    assert stats["in_flight"] == 0
+    assert stats["admitted"] == {"command": 1, "discovery": 0, "poll": 2, "bulk": 4}
+
+
+def test_a_queued_request_cancelled_as_a_slot_frees_up_just_raises_cancelled():
+    scheduler = lib_patch.hub_scheduler(1, max_limit=1)
+    order = []
+
+    async def request(name, hold):
+        async with scheduler.slot():
+            order.append(name)
+            await hold.wait()
+
+    async def _run():
+        hold, free = asyncio.Event(), asyncio.Event()
+        free.set()
+        holder = asyncio.ensure_future(request("holder", hold))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(request("cancelled", free))
+        queued = asyncio.ensure_future(request("queued", free))
+        await asyncio.sleep(0)
+        # the release runs first and skips the cancelled waiter
+        hold.set()
+        cancelled.cancel()
+        results = await asyncio.gather(holder, cancelled, queued, return_exceptions=True)
+        return results, scheduler.stats()
+
+    results, stats = asyncio.run(_run())
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert order == ["holder", "queued"]
+    assert stats["in_flight"] == 0 and stats["queued"]["poll"] == 0
+
+
+def test_scheduler_limit_grows_with_fast_answers_and_halves_on_timeouts():
+    scheduler = lib_patch.hub_scheduler(4, max_limit=8, target_latency=0.5)
+
+    async def request(fail=False):
+        async with scheduler.slot():
+            if fail:
+                raise asyncio.TimeoutError()
+
+    async def _run():
+        for _ in range(12):
+            await request()
+        grown = scheduler.limit
+        for _ in range(3):
+            try:
+                await request(fail=True)
+            except asyncio.TimeoutError:
+                pass
+        return grown
+
+    grown = asyncio.run(_run())
+    assert grown == 6
+    # one burst of timeouts is one congestion signal
+    assert scheduler.limit == 3
+    assert scheduler.stats()["limit_decreases"] == 1
+
+
+def test_empty_scenes_are_reconciled_not_recreated():
+    hub = BlockingHub()
+    prefix = lib_patch.EMPTY_SCENE_PREFIX
+    session = FakeSession({
+        ("POST", "/scenes/"): (201, {"id": "new"}),
+        ("DELETE", "/scenes/gone"): (200, None),
+        ("DELETE", "/scenes/dup"): (200, None),
+    })
+    hub.async_client = AsyncHubX(hub, session)
+    existing = [
+        lib_patch.HackScene(hub, "kept", f"{prefix}remote-a_1_singlePress", "scenes_cake"),
+        lib_patch.HackScene(hub, "dup", f"{prefix}remote-a_1_singlePress", "scenes_cake"),
+        lib_patch.HackScene(hub, "gone", f"{prefix}removed-remote_1_singlePress", "scenes_cake"),
+        lib_patch.HackScene(hub, "user", "Movie night", "scenes_tv"),
+    ]
+    wanted = {"remote-a_1": ["singlePress", "longPress"], "remote-b_1": ["singlePress"]}
+
+    stats = asyncio.run(lib_patch.async_reconcile_empty_scenes(None, hub, wanted, existing))
+
+    assert stats == {"kept": 1, "created": 2, "deleted": 2}
+    posted = sorted(call[2]["info"]["name"] for call in session.calls if call[0] == "POST")
+    assert posted == [f"{prefix}remote-a_1_longPress", f"{prefix}remote-b_1_singlePress"]
+    assert sorted(call[1] for call in session.calls if call[0] == "DELETE") == ["/scenes/dup", "/scenes/gone"]
+    assert hub.async_client.stats()["scheduler"]["admitted"]["bulk"] == 4
+
+    # a second run with nothing changed writes nothing
+    session.calls.clear()
+    existing = [existing[0], existing[3]] + [
+        lib_patch.HackScene(hub, name, name, "scenes_cake") for name in posted
+    ]
+    stats = asyncio.run(lib_patch.async_reconcile_empty_scenes(None, hub, wanted, existing))
+    assert stats == {"kept": 3, "created": 0, "deleted": 0}
+    assert session.calls == []
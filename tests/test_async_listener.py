@@ -0,0 +1,211 @@
+"""
+Tests for the asyncio-native hub event listener.
+
+The threaded listener needs a thread per hub, a threading.Timer per keepalive
+and a call_soon_threadsafe hop for every loop-side effect. The asyncio variant
+runs as a task on the event loop instead; these tests pin that it keeps the
+same contract: frames go through on_message, a *reconnect* open schedules one
+resync (directly, no thread-safe hop), the keepalive lives on the loop, and
+async_stop() tears the task down and drops the hub's registry. stop(), the
+threaded listener's interface, does the same from any thread.
+
+hub_event_listener.py is loaded standalone with third-party imports stubbed,
+as in the other listener tests.
+"""
+import asyncio
+import importlib.util
+import os
+import sys
+import types
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+_WSMsgType = type("WSMsgType", (), {"TEXT": 1, "ERROR": 8})
+_stub("websocket", WebSocketApp=object)
+_stub("aiohttp", WSMsgType=_WSMsgType)
+_dir = _stub("dirigera", Hub=object)
+_dir_dev = _stub("dirigera.devices")
+_dir_dev_device = _stub("dirigera.devices.device", Room=object)
+_stub("dirigera.devices.air_purifier", FanModeEnum=str)
+_dir.devices = _dir_dev
+_dir_dev.device = _dir_dev_device
+_ha = _stub("homeassistant")
+_ha_const = _stub("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+_ha_comp = _stub("homeassistant.components")
+_ha_light = _stub("homeassistant.components.light", ColorMode=type("ColorMode", (), {}))
+_ha_helpers = _stub(
+    "homeassistant.helpers",
+    device_registry=types.ModuleType("dr"),
+    entity_registry=types.ModuleType("er"),
+    area_registry=types.ModuleType("ar"),
+)
+_ha.const = _ha_const
+_ha.components = _ha_comp
+_ha_comp.light = _ha_light
+_ha.helpers = _ha_helpers
+
+_SESSION = {}
+_ha_helpers.aiohttp_client = _stub(
+    "homeassistant.helpers.aiohttp_client",
+    async_get_clientsession=lambda hass, verify_ssl=True: _SESSION["session"],
+)
+
+asyncio.set_event_loop(asyncio.new_event_loop())
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "hub_event_listener.py"
+)
+_spec = importlib.util.spec_from_file_location("hel_async_uut", _PATH)
+hel = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hel)
+hub_event_listener = hel.hub_event_listener
+async_hub_event_listener = hel.async_hub_event_listener
+registry_entry = hel.registry_entry
+
+
+class FakeHub:
+    websocket_base_url = "wss://hub-async/v1"
+    token = "t"
+
+
+class FakeWs:
+    """Yields the queued frames once, then ends like a closed socket."""
+
+    def __init__(self, frames):
+        self._frames = list(frames)
+        self.closed = False
+        self.close_code = 1000
+        self.sent = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._frames:
+            self.closed = True
+            raise StopAsyncIteration
+        return types.SimpleNamespace(type=_WSMsgType.TEXT, data=self._frames.pop(0))
+
+    async def send_str(self, data):
+        self.sent.append(data)
+
+    async def close(self):
+        self.closed = True
+
+    def exception(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, ws):
+        self._ws = ws
+        self.connect_calls = []
+
+    def ws_connect(self, url, headers=None, heartbeat=None):
+        self.connect_calls.append(url)
+        ws = self._ws
+
+        class _Ctx:
+            async def __aenter__(self_inner):
+                return ws
+
+            async def __aexit__(self_inner, *exc):
+                return False
+
+        return _Ctx()
+
+
+class FakeHass:
+    def __init__(self):
+        self.tasks = []
+
+    def async_create_task(self, coro):
+        self.tasks.append(coro)
+        coro.close()
+
+    def async_create_background_task(self, coro, name):
+        return asyncio.get_running_loop().create_task(coro)
+
+
+def test_reconnect_open_schedules_resync_directly_on_the_loop():
+    async def _run():
+        hass = FakeHass()
+        listener = async_hub_event_listener(FakeHub(), hass)
+        listener._start_keepalive = lambda: None
+        # the asyncio listener must not use a thread-safe hop at all
+        listener._loop = types.SimpleNamespace(
+            call_soon_threadsafe=lambda *a: (_ for _ in ()).throw(AssertionError("cross-thread hop"))
+        )
+        listener._on_open(None)
+        assert hass.tasks == [], "first open must not schedule a resync"
+        listener._on_open(None)
+        assert len(hass.tasks) == 1, "reconnect must schedule exactly one resync"
+
+    asyncio.run(_run())
+
+
+def test_keepalive_is_scheduled_on_the_loop_and_cancelled_on_stop():
+    async def _run():
+        listener = async_hub_event_listener(FakeHub(), FakeHass())
+        listener._start_keepalive()
+        handle = listener._keepalive_timer
+        assert isinstance(handle, asyncio.TimerHandle)
+        await listener.async_stop()
+        assert handle.cancelled()
+        assert listener._keepalive_timer is None
+
+    asyncio.run(_run())
+
+
+def test_frames_are_delivered_to_on_message_and_stop_unregisters_hub():
+    async def _run():
+        hub_event_listener.device_registry.clear()
+        hub_event_listener.register(FakeHub.websocket_base_url, "dev1", registry_entry(types.SimpleNamespace(unique_id="dev1")))
+
+        ws = FakeWs(['{"type":"a"}', '{"type":"b"}'])
+        _SESSION["session"] = FakeSession(ws)
+        listener = async_hub_event_listener(FakeHub(), FakeHass())
+        listener._start_keepalive = lambda: None
+        seen = []
+        listener.on_message = lambda _ws, msg: seen.append(msg)
+
+        listener.start()
+        # let the task drain the frames; the loop then sits in the retry backoff
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert seen == ['{"type":"a"}', '{"type":"b"}']
+        assert _SESSION["session"].connect_calls == [FakeHub.websocket_base_url]
+
+        await listener.async_stop()
+        assert listener._task is None
+        assert hub_event_listener.get_registry_entry(FakeHub.websocket_base_url, "dev1") is None
+
+    asyncio.run(_run())
+
+
+def test_stop_works_like_the_threaded_listeners_from_any_thread():
+    async def _run():
+        hub_event_listener.device_registry.clear()
+        _SESSION["session"] = FakeSession(FakeWs([]))
+        listener = async_hub_event_listener(FakeHub(), FakeHass())
+        listener._start_keepalive = lambda: None
+        listener.start()
+        await asyncio.sleep(0)
+        # an executor job blocks until the listener has stopped
+        await asyncio.get_running_loop().run_in_executor(None, listener.stop)
+        assert listener._task is None
+
+        # on the loop it cannot block: the stop runs as a task
+        listener = async_hub_event_listener(FakeHub(), FakeHass())
+        listener.start()
+        listener.stop()
+        await listener._stop_task
+        assert listener._task is None and listener._request_to_stop
+
+    asyncio.run(_run())
@@ -0,0 +1,121 @@
+"""
+Tests for the device and entity classes in base_classes.py.
+
+Pins that a blind's direction comes from the hub's blindsState while it
+reports one, falling back to comparing the current and target levels. And
+that a controller, its own HA entity, writes its state when polled, and
+that induce_properties makes the properties of a model's fields once, from
+pydantic 1.x and 2.x models alike.
+
+base_classes.py uses relative imports and is loaded through
+tests/_integration.py.
+"""
+import asyncio
+import types
+
+from _integration import load_integration
+
+base_classes = load_integration("base_classes")
+
+
+def make_blinds_sensor(**attributes):
+    device = types.SimpleNamespace(unique_id="blind_1", add_listener=lambda listener: None, **attributes)
+    return base_classes.ikea_blinds_sensor(device)
+
+
+def test_blinds_state_sets_the_direction_while_the_hub_reports_it():
+    # Positions alone say "closing", the hub says it has stopped
+    sensor = make_blinds_sensor(blinds_current_level=40, blinds_target_level=100, blinds_state="stopped")
+    assert (sensor.is_opening, sensor.is_closing) == (False, False)
+    sensor._device.blinds_state = "down"
+    assert (sensor.is_opening, sensor.is_closing) == (False, True)
+    sensor._device.blinds_state = "up"
+    assert (sensor.is_opening, sensor.is_closing) == (True, False)
+    assert "blinds_state" in sensor.depends_on
+
+
+def test_blinds_direction_falls_back_to_the_levels():
+    sensor = make_blinds_sensor(blinds_current_level=40, blinds_target_level=100, blinds_state=None)
+    assert (sensor.is_opening, sensor.is_closing) == (False, True)
+    # Models without the field at all
+    sensor = make_blinds_sensor(blinds_current_level=40, blinds_target_level=0)
+    assert (sensor.is_opening, sensor.is_closing) == (True, False)
+    sensor = make_blinds_sensor(blinds_current_level=None, blinds_target_level=0)
+    assert (sensor.is_opening, sensor.is_closing) == (False, False)
+
+
+def test_a_polled_controller_writes_its_own_state():
+    # A controller is its own HA entity and has no listeners to fan out to
+    refreshed = types.SimpleNamespace(
+        id="remote_1", is_reachable=True, attributes=types.SimpleNamespace(model="STYRBAR", battery_percentage=40),
+    )
+    controller = base_classes.ikea_controller_device.__new__(base_classes.ikea_controller_device)
+    controller._listeners = []
+    controller._json_data = refreshed
+    controller._set_polled_json_data = lambda json_data: None
+
+    async def fetch():
+        return refreshed
+
+    controller._fetch_json_data = fetch
+    asyncio.run(controller.async_poll())
+    assert getattr(controller, "state_writes", 0) == 0, "not added to HA yet"
+
+    controller.hass = object()
+    asyncio.run(controller.async_poll())
+    assert controller.state_writes == 1
+
+
+class _V2Attributes:
+    # pydantic 2.x declares the fields on the class as model_fields
+    model_fields = {"is_on": None, "light_level": None}
+
+    def __init__(self, is_on, light_level):
+        self.is_on = is_on
+        self.light_level = light_level
+
+
+class _V1Attributes(_V2Attributes):
+    model_fields = None
+    __fields__ = {"is_on": None, "light_level": None}
+
+
+def _device_class():
+    return type("induced_device", (), {})
+
+
+def _instance(cls, attributes):
+    device = cls()
+    device._json_data = types.SimpleNamespace(attributes=attributes)
+    return device
+
+
+def test_induce_properties_runs_once_per_field_set(monkeypatch):
+    made = []
+    make_property = base_classes.make_property
+    monkeypatch.setattr(base_classes, "make_property", lambda cls, name: made.append(name) or make_property(cls, name))
+    cls = _device_class()
+    for level in range(5):
+        base_classes.induce_properties(cls, _V2Attributes(True, level))
+    assert sorted(made) == ["is_on", "light_level"]
+
+    # A model with a field more only adds that one
+    extended = type("_Extended", (_V2Attributes,), {"model_fields": {**_V2Attributes.model_fields, "color_hue": None}})
+    attributes = extended(False, 20)
+    attributes.color_hue = 120.0
+    base_classes.induce_properties(cls, attributes)
+    assert sorted(made) == ["color_hue", "is_on", "light_level"]
+    assert _instance(cls, attributes).color_hue == 120.0
+
+
+def test_induce_properties_reads_the_fields_of_either_pydantic_version():
+    v1, v2 = _device_class(), _device_class()
+    base_classes.induce_properties(v1, _V1Attributes(True, 40))
+    base_classes.induce_properties(v2, _V2Attributes(True, 40))
+    names = {name for name, value in vars(v1).items() if isinstance(value, property)}
+    assert names == {name for name, value in vars(v2).items() if isinstance(value, property)} == {"is_on", "light_level"}
+    assert (_instance(v1, _V1Attributes(False, 7)).light_level, _instance(v2, _V2Attributes(False, 7)).light_level) == (7, 7)
+    # No model at all: the instance's own attributes
+    plain = _device_class()
+    base_classes.induce_properties(plain, types.SimpleNamespace(is_on=True))
+    assert _instance(plain, types.SimpleNamespace(is_on=False)).is_on is False
@@ -0,0 +1,100 @@
+"""
+Tests for the per-device command queue.
+
+A slider drag fires a stream of service calls for one device. Each used to
+become its own PATCH, racing the others to the hub. The queue keeps one write
+in flight per device and merges everything submitted meanwhile into a single
+follow-up write, newest value per attribute; these tests pin that contract,
+and that stopping the queue mid-write releases every waiting caller.
+
+command_queue.py has no third-party imports and is loaded standalone.
+"""
+import asyncio
+import importlib.util
+import os
+
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "command_queue.py"
+)
+_spec = importlib.util.spec_from_file_location("command_queue_uut", _PATH)
+command_queue = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(command_queue)
+device_command_queue = command_queue.device_command_queue
+
+
+class FakeDevice:
+    """Records every write; each one takes a loop tick or two, like the hub."""
+
+    def __init__(self, fail=False):
+        self.writes = []
+        self.fail = fail
+        self.queue = device_command_queue(self.send)
+
+    async def send(self, attributes, options):
+        self.writes.append((dict(attributes), dict(options)))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ConnectionError("hub does not respond")
+
+
+def test_pending_commands_collapse_to_the_newest_value_per_attribute():
+    device = FakeDevice()
+
+    async def _run():
+        first = asyncio.ensure_future(device.queue.submit({"isOn": True, "lightLevel": 10}))
+        await asyncio.sleep(0.001)  # first write is now in flight
+        await asyncio.gather(first, *(
+            device.queue.submit({"isOn": True, "lightLevel": level})
+            for level in (20, 30, 40)
+        ), device.queue.submit({"colorTemperature": 2700}, {"transitionTime": 500}))
+
+    asyncio.run(_run())
+    # the first write goes out at once; everything queued behind it is one write
+    assert device.writes == [
+        ({"isOn": True, "lightLevel": 10}, {}),
+        ({"isOn": True, "lightLevel": 40, "colorTemperature": 2700}, {"transitionTime": 500}),
+    ]
+    assert device.queue.stats() == {"submitted": 5, "sent": 2}
+
+
+def test_writes_are_serialised_and_errors_reach_every_merged_caller():
+    device = FakeDevice(fail=True)
+
+    async def _run():
+        first = asyncio.ensure_future(device.queue.submit({"blindsTargetLevel": 10}))
+        await asyncio.sleep(0.001)
+        results = await asyncio.gather(
+            first, *(device.queue.submit({"blindsTargetLevel": level}) for level in (50, 90)),
+            return_exceptions=True,
+        )
+        # the queue recovers: the next command starts a new write
+        device.fail = False
+        await device.queue.submit({"blindsTargetLevel": 0})
+        return results
+
+    results = asyncio.run(_run())
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert [w[0] for w in device.writes] == [
+        {"blindsTargetLevel": 10}, {"blindsTargetLevel": 90}, {"blindsTargetLevel": 0},
+    ]
+    assert device.queue.stats() == {"submitted": 4, "sent": 1}
+
+
+def test_a_cancelled_worker_fails_every_waiting_caller():
+    device = FakeDevice()
+
+    async def _run():
+        first = asyncio.ensure_future(device.queue.submit({"isOn": True}))
+        await asyncio.sleep(0.001)
+        queued = asyncio.ensure_future(device.queue.submit({"isOn": False}))
+        await asyncio.sleep(0)
+        # e.g. the entry is unloaded while the first write is in flight
+        device.queue._worker.cancel()
+        results = await asyncio.wait_for(asyncio.gather(first, queued, return_exceptions=True), 1)
+        # and the next command starts a new worker
+        await device.queue.submit({"isOn": True})
+        return results
+
+    results = asyncio.run(_run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert [w[0] for w in device.writes] == [{"isOn": True}, {"isOn": True}]
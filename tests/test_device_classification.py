@@ -0,0 +1,116 @@
+"""
+Tests for classify_devices, the single pass over a /devices payload that
+replaced a HubX.get_* filter per device type.
+
+Pins the routing of DEVICE_TABLE: every device type reaches its list by
+"type" or "deviceType", MYGGSPRAY's occupancySensor counts as a motion
+sensor, a plug's electricalSensor half is merged into its outlet and the
+halves of a TIMMERFLOTTE into one environment sensor, and devices of an
+unknown type are left out.
+
+ikea_gateway.py uses relative imports and is loaded through
+tests/_integration.py. The dirigera factories are stubs there, so every
+DEVICE_TABLE row gets a factory that records the payload it is given.
+"""
+from _integration import load_integration
+
+gateway = load_integration("ikea_gateway")
+HubDeviceType = gateway.HubDeviceType
+
+HUB = object()
+
+
+def _device(uid, type_, device_type, relation_id=None, **attributes):
+    return {"id": uid, "type": type_, "deviceType": device_type, "relationId": relation_id,
+            "attributes": {"customName": uid, **attributes}}
+
+
+def _payload(payload, hub):
+    assert hub is HUB
+    return payload
+
+
+def _classify(monkeypatch, devices):
+    for kind, (matches, merge, _, wrapper) in list(gateway.DEVICE_TABLE.items()):
+        monkeypatch.setitem(gateway.DEVICE_TABLE, kind, (matches, merge, _payload, wrapper))
+    models = gateway.classify_devices(HUB, devices)
+    return {kind: [payload["id"] for payload in payloads] for kind, payloads in models.items()}
+
+
+def test_every_device_type_reaches_its_list(monkeypatch):
+    devices = [
+        _device("lamp", "light", "light"),
+        _device("blind", "blinds", "blinds"),
+        _device("purifier", "airPurifier", "airPurifier"),
+        _device("plug", "outlet", "outlet"),
+        _device("vindstyrka", "sensor", "environmentSensor"),
+        _device("remote", "controller", "lightController"),
+        _device("door", "sensor", "openCloseSensor"),
+        _device("motion", "sensor", "motionSensor"),
+        _device("myggspray", "sensor", "occupancySensor"),
+        _device("lux", "sensor", "lightSensor"),
+        _device("leak", "sensor", "waterSensor"),
+    ]
+    assert _classify(monkeypatch, devices) == {
+        HubDeviceType.LIGHT: ["lamp"],
+        HubDeviceType.BLIND: ["blind"],
+        HubDeviceType.AIR_PURIFIER: ["purifier"],
+        HubDeviceType.OUTLET: ["plug"],
+        HubDeviceType.ENVIRONMENT_SENSOR: ["vindstyrka"],
+        HubDeviceType.CONTROLLER: ["remote"],
+        HubDeviceType.OPEN_CLOSE_SENSOR: ["door"],
+        HubDeviceType.MOTION_SENSOR: ["motion", "myggspray"],
+        HubDeviceType.LIGHT_SENSOR: ["lux"],
+        HubDeviceType.WATER_SENSOR: ["leak"],
+    }
+
+
+def test_unknown_devices_are_left_out(monkeypatch):
+    devices = [
+        _device("speaker", "speaker", "speaker"),
+        _device("gateway", "gateway", "gateway"),
+        {"id": "bare", "attributes": {}},
+    ]
+    models = _classify(monkeypatch, devices)
+    assert set(models) == set(gateway.DEVICE_TABLE)
+    assert all(ids == [] for ids in models.values())
+
+
+def test_a_plugs_electrical_sensor_is_merged_into_its_outlet(monkeypatch):
+    plug = _device("plug", "outlet", "outlet", relation_id="rel-1", isOn=True)
+    meter = _device("meter", "sensor", "electricalSensor", relation_id="rel-1", currentActivePower=4.5)
+    lone_meter = _device("lone", "sensor", "electricalSensor", relation_id="rel-2", currentActivePower=1.0)
+    captured = {}
+
+    def capture(payload, hub):
+        captured[payload["id"]] = payload
+        return payload
+
+    row = gateway.DEVICE_TABLE[HubDeviceType.OUTLET]
+    monkeypatch.setitem(gateway.DEVICE_TABLE, HubDeviceType.OUTLET, (row[0], row[1], capture, row[3]))
+    gateway.classify_devices(HUB, [plug, meter, lone_meter])
+
+    # Only the outlet is a device; the sensor halves are not
+    assert list(captured) == ["plug"]
+    assert captured["plug"]["attributes"] == {"customName": "plug", "isOn": True, "currentActivePower": 4.5}
+    # Merged into a copy: the payload may be a devices_snapshot entry
+    assert "currentActivePower" not in plug["attributes"]
+
+
+def test_the_halves_of_an_environment_sensor_are_merged(monkeypatch):
+    temperature = _device("env_1", "sensor", "environmentSensor", relation_id="rel-1",
+                          currentTemperature=21.5, currentRH=None)
+    humidity = _device("env_2", "sensor", "environmentSensor", relation_id="rel-1", currentRH=40)
+    standalone = _device("vindstyrka", "sensor", "environmentSensor", currentTemperature=19.0)
+    captured = []
+
+    def capture(payload, hub):
+        captured.append(payload)
+        return payload
+
+    row = gateway.DEVICE_TABLE[HubDeviceType.ENVIRONMENT_SENSOR]
+    monkeypatch.setitem(gateway.DEVICE_TABLE, HubDeviceType.ENVIRONMENT_SENSOR, (row[0], row[1], capture, row[3]))
+    gateway.classify_devices(HUB, [temperature, humidity, standalone])
+
+    assert [payload["id"] for payload in captured] == ["env_1", "vindstyrka"]
+    assert captured[0]["attributes"] == {"customName": "env_1", "currentTemperature": 21.5, "currentRH": 40}
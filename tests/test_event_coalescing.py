@@ -0,0 +1,260 @@
+"""
+Tests for per-device deviceStateChanged coalescing.
+
+Lights send several frames per command and outlets report power, amps and
+voltage in separate frames. Each frame used to trigger its own HA state write.
+The listener now merges the frames for one device within a short window and
+applies them with a single push; these tests pin that contract.
+
+hub_event_listener.py is loaded standalone with third-party imports stubbed,
+as in the other listener tests.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import types
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+_stub("websocket", WebSocketApp=object)
+_stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}))
+_dir = _stub("dirigera", Hub=object)
+_dir_dev = _stub("dirigera.devices")
+_dir_dev_device = _stub("dirigera.devices.device", Room=object)
+_stub("dirigera.devices.air_purifier", FanModeEnum=str)
+_dir.devices = _dir_dev
+_dir_dev.device = _dir_dev_device
+_ha = _stub("homeassistant")
+_ha_const = _stub("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+_ha_comp = _stub("homeassistant.components")
+_ha_light = _stub(
+    "homeassistant.components.light",
+    ColorMode=type("ColorMode", (), {"HS": "hs", "COLOR_TEMP": "color_temp"}),
+)
+_ha_helpers = _stub(
+    "homeassistant.helpers",
+    device_registry=types.ModuleType("dr"),
+    entity_registry=types.ModuleType("er"),
+    area_registry=types.ModuleType("ar"),
+)
+_ha.const = _ha_const
+_ha.components = _ha_comp
+_ha_comp.light = _ha_light
+_ha.helpers = _ha_helpers
+_ha_helpers.aiohttp_client = _stub(
+    "homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None
+)
+
+asyncio.set_event_loop(asyncio.new_event_loop())
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "hub_event_listener.py"
+)
+_spec = importlib.util.spec_from_file_location("hel_coalesce_uut", _PATH)
+hel = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hel)
+hub_event_listener = hel.hub_event_listener
+registry_entry = hel.registry_entry
+
+HUB_KEY = "wss://hub-coalesce/v1"
+
+
+class FakeHub:
+    websocket_base_url = HUB_KEY
+
+
+class FakeHass:
+    def async_create_task(self, coro):
+        coro.close()
+
+
+class FakeEntity:
+    """Minimal device wrapper: a _json_data model and a push counter."""
+
+    def __init__(self, uid, **attributes):
+        self.unique_id = uid
+        self._json_data = types.SimpleNamespace(
+            id=uid,
+            relation_id=None,
+            is_reachable=True,
+            room=None,
+            attributes=types.SimpleNamespace(custom_name=uid, **attributes),
+        )
+        self.pushes = 0
+
+    def schedule_update_ha_state(self, force_refresh=False):
+        self.pushes += 1
+
+
+def _frame(dev_id, device_type, **attributes):
+    return json.dumps({
+        "type": "deviceStateChanged",
+        "data": {"id": dev_id, "deviceType": device_type, "attributes": attributes},
+    })
+
+
+def _make(window):
+    hub_event_listener.device_registry.clear()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    listener = hub_event_listener(FakeHub(), FakeHass(), coalesce_window=window)
+    listener._loop = loop
+    return listener, loop
+
+
+def test_burst_for_one_device_is_applied_with_a_single_push():
+    listener, loop = _make(0.05)
+    plug = FakeEntity("plug_1", is_on=False, current_amps=None, current_active_power=None, current_voltage=None)
+    hub_event_listener.register(HUB_KEY, "plug_1", registry_entry(plug))
+
+    listener.on_message(None, _frame("plug_1", "outlet", isOn=True))
+    listener.on_message(None, _frame("plug_1", "outlet", currentAmps=0.4))
+    listener.on_message(None, _frame("plug_1", "outlet", currentActivePower=92.0, currentVoltage=230.1))
+
+    # nothing is applied or pushed until the window closes
+    assert plug.pushes == 0
+    assert plug._json_data.attributes.is_on is False
+
+    loop.run_until_complete(asyncio.sleep(0.1))
+
+    assert plug.pushes == 1
+    attrs = plug._json_data.attributes
+    assert (attrs.is_on, attrs.current_amps, attrs.current_active_power, attrs.current_voltage) == (
+        True, 0.4, 92.0, 230.1,
+    )
+    loop.close()
+
+
+def test_zero_window_coalesces_frames_of_the_same_loop_tick_per_device():
+    listener, loop = _make(0)
+    a = FakeEntity("lamp-a_1", is_on=False, light_level=10)
+    b = FakeEntity("lamp-b_1", is_on=False, light_level=10)
+    hub_event_listener.register(HUB_KEY, "lamp-a_1", registry_entry(a))
+    hub_event_listener.register(HUB_KEY, "lamp-b_1", registry_entry(b))
+
+    listener.on_message(None, _frame("lamp-a_1", "light", isOn=True))
+    listener.on_message(None, _frame("lamp-a_1", "light", lightLevel=40))
+    listener.on_message(None, _frame("lamp-b_1", "light", lightLevel=70))
+
+    loop.run_until_complete(asyncio.sleep(0))
+
+    assert (a.pushes, b.pushes) == (1, 1)
+    assert a._json_data.attributes.light_level == 40
+    assert b._json_data.attributes.light_level == 70
+    loop.close()
+
+
+def test_split_device_frames_keep_their_own_attribute_filter():
+    """An electricalSensor frame routed to its outlet must not be able to
+    rename the outlet, even when it shares the outlet's pending entry."""
+    listener, loop = _make(0)
+    plug = FakeEntity("plug-x_1", is_on=False, current_amps=None)
+    hub_event_listener.register(HUB_KEY, "plug-x_1", registry_entry(plug))
+
+    listener.on_message(None, _frame("plug-x_2", "electricalSensor", currentAmps=1.5, customName="sub device"))
+    listener.on_message(None, _frame("plug-x_1", "outlet", isOn=True))
+    loop.run_until_complete(asyncio.sleep(0))
+
+    attrs = plug._json_data.attributes
+    assert (attrs.is_on, attrs.current_amps, attrs.custom_name) == (True, 1.5, "plug-x_1")
+    assert plug.pushes == 1
+    loop.close()
+
+
+class FakeAttributeDevice(FakeEntity):
+    """A device that accepts the changed-attribute set, like ikea_base_device."""
+
+    pushes_by_attribute = True
+
+    def __init__(self, uid, **attributes):
+        super().__init__(uid, **attributes)
+        self.changed = []
+
+    def schedule_update_ha_state(self, force_refresh=False, changed_attributes=None):
+        self.pushes += 1
+        self.changed.append(changed_attributes)
+
+
+def test_merged_state_push_names_the_changed_attributes():
+    listener, loop = _make(0)
+    plug = FakeAttributeDevice("plug-y_1", is_on=True, current_voltage=None, current_amps=None)
+    hub_event_listener.register(HUB_KEY, "plug-y_1", registry_entry(plug))
+
+    listener.on_message(None, _frame("plug-y_1", "outlet", currentVoltage=229.8))
+    listener.on_message(None, _frame("plug-y_2", "electricalSensor", currentAmps=0.2))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.changed == [{"current_voltage", "current_amps"}]
+
+    # reachability shows on every entity of the device: no attribute filter
+    listener.on_message(None, json.dumps({
+        "type": "deviceStateChanged",
+        "data": {"id": "plug-y_1", "deviceType": "outlet", "isReachable": False, "attributes": {"currentVoltage": 0}},
+    }))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.changed[-1] is None
+    loop.close()
+
+
+def test_unchanged_state_is_gated_and_counted():
+    """A resync replay or hub echo carrying the current values pushes nothing."""
+    listener, loop = _make(0)
+    plug = FakeEntity("plug-z_1", is_on=True, current_amps=0.4)
+    hub_event_listener.register(HUB_KEY, "plug-z_1", registry_entry(plug))
+
+    replay = json.dumps({
+        "type": "deviceStateChanged",
+        "data": {"id": "plug-z_1", "deviceType": "outlet", "isReachable": True,
+                 "attributes": {"isOn": True, "currentAmps": 0.4, "customName": "plug-z_1"}},
+    })
+    listener.on_message(None, replay)
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.pushes == 0
+    assert listener.stats() == {"value_gate_hits": 1, "value_gate_misses": 0}
+
+    listener.on_message(None, _frame("plug-z_1", "outlet", currentAmps=0.5))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.pushes == 1
+    assert plug._json_data.attributes.current_amps == 0.5
+    assert listener.stats() == {"value_gate_hits": 1, "value_gate_misses": 1}
+    loop.close()
+
+
+class FakeCachingDevice(FakeEntity):
+    def __init__(self, uid, **attributes):
+        super().__init__(uid, **attributes)
+        self.invalidations = 0
+
+    def invalidate_metadata(self):
+        self.invalidations += 1
+
+
+def test_metadata_is_invalidated_only_on_rename_room_or_relation_change():
+    listener, loop = _make(0)
+    plug = FakeCachingDevice("plug-m_1", is_on=False)
+    hub_event_listener.register(HUB_KEY, "plug-m_1", registry_entry(plug))
+
+    listener.on_message(None, _frame("plug-m_1", "outlet", isOn=True))
+    listener.on_message(None, _frame("plug-m_1", "outlet", customName="plug-m_1"))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.invalidations == 0
+
+    listener.on_message(None, _frame("plug-m_1", "outlet", customName="Kitchen plug"))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.invalidations == 1
+
+    listener.on_message(None, json.dumps({
+        "type": "deviceStateChanged",
+        "data": {"id": "plug-m_1", "deviceType": "outlet", "relationId": "rel-m"},
+    }))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert plug.invalidations == 2
+    assert hub_event_listener.get_device_index(HUB_KEY).relation_members("rel-m")[0].entity is plug
+    loop.close()
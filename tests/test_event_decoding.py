@@ -0,0 +1,124 @@
+"""
+Tests for the import-time event decoder table and controller id parsing.
+
+The listener used to convert every attribute key with a regex and scan a list
+per frame; it now looks both up in event_decoders, built once from
+process_events_from. These tests pin that the table agrees with the old
+per-key conversion, that button ids still split the same way, and that air
+purifier frames reach the model.
+
+hub_event_listener.py is loaded standalone with third-party imports stubbed,
+as in the other listener tests.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import types
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+_stub("websocket", WebSocketApp=object)
+_stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}))
+_dir = _stub("dirigera", Hub=object)
+_dir_dev = _stub("dirigera.devices")
+_dir_dev_device = _stub("dirigera.devices.device", Room=object)
+_stub("dirigera.devices.air_purifier", FanModeEnum=str)
+_dir.devices = _dir_dev
+_dir_dev.device = _dir_dev_device
+_ha = _stub("homeassistant")
+_ha_const = _stub("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+_ha_comp = _stub("homeassistant.components")
+_ha_light = _stub(
+    "homeassistant.components.light",
+    ColorMode=type("ColorMode", (), {"HS": "hs", "COLOR_TEMP": "color_temp"}),
+)
+_ha_helpers = _stub(
+    "homeassistant.helpers",
+    device_registry=types.ModuleType("dr"),
+    entity_registry=types.ModuleType("er"),
+    area_registry=types.ModuleType("ar"),
+)
+_ha.const = _ha_const
+_ha.components = _ha_comp
+_ha_comp.light = _ha_light
+_ha.helpers = _ha_helpers
+_ha_helpers.aiohttp_client = _stub(
+    "homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None
+)
+
+asyncio.set_event_loop(asyncio.new_event_loop())
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "hub_event_listener.py"
+)
+_spec = importlib.util.spec_from_file_location("hel_decode_uut", _PATH)
+hel = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hel)
+
+
+def test_decoder_table_matches_process_events_from():
+    assert set(hel.event_decoders) == set(hel.process_events_from)
+    for device_type, keys in hel.process_events_from.items():
+        decoders = hel.event_decoders[device_type]
+        assert list(decoders) == keys
+        for key in keys:
+            assert decoders[key][0] == hel.to_snake_case(key)
+    assert hel.event_decoders["environmentSensor"]["currentPM25"][0] == "current_p_m25"
+    # only the outlet date/time attributes and the purifier fan mode carry a converter
+    converted = {key for d in hel.event_decoders.values() for key, (_, conv) in d.items() if conv is not None}
+    assert converted == {"timeOfLastEnergyReset", "totalEnergyConsumedLastUpdated", "fanMode"}
+    parsed = hel.attribute_decoders["timeOfLastEnergyReset"][1]("2026-10-18T10:00:00.000Z")
+    assert (parsed.year, parsed.tzinfo is not None) == (2026, True)
+    assert hel.attribute_decoders["timeOfLastEnergyReset"][1]("not a date") == "not a date"
+
+
+def test_split_button_id():
+    assert hel.split_button_id("6f1c-remote-ab12_3") == ("6f1c-remote-ab12_1", 3)
+    assert hel.split_button_id("6f1c-remote-ab12_1") == ("6f1c-remote-ab12_1", 1)
+    assert hel.split_button_id("plainid") == ("plainid", 0)
+
+
+class FakePurifier:
+    def __init__(self):
+        self.unique_id = "purifier_1"
+        self._json_data = types.SimpleNamespace(
+            id="purifier_1", relation_id=None, is_reachable=True, room=None,
+            attributes=types.SimpleNamespace(custom_name="purifier", fan_mode="low", motor_state=10,
+                                             current_p_m25=3, filter_alarm_status=False),
+        )
+        self.pushes = []
+
+    def schedule_update_ha_state(self, force_refresh=False, changed_attributes=None):
+        self.pushes.append(changed_attributes)
+
+
+def test_air_purifier_frames_reach_the_model():
+    hub_key = "wss://hub-decode/v1"
+    hel.hub_event_listener.device_registry.clear()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    listener = hel.hub_event_listener(types.SimpleNamespace(websocket_base_url=hub_key), None)
+    listener._loop = loop
+    purifier = FakePurifier()
+    purifier.pushes_by_attribute = True
+    hel.hub_event_listener.register(hub_key, "purifier_1", hel.registry_entry(purifier))
+
+    listener.on_message(None, json.dumps({
+        "type": "deviceStateChanged",
+        "data": {"id": "purifier_1", "deviceType": "airPurifier",
+                 "attributes": {"fanMode": "auto", "motorState": 1, "currentPM25": 3, "filterAlarmStatus": True}},
+    }))
+    loop.run_until_complete(asyncio.sleep(0))
+
+    attributes = purifier._json_data.attributes
+    assert (attributes.fan_mode, attributes.motor_state, attributes.filter_alarm_status) == ("auto", 1, True)
+    assert purifier.pushes == [{"fan_mode", "motor_state", "filter_alarm_status"}]
+    loop.close()
@@ -0,0 +1,222 @@
+"""
+Tests for HubX's pooled keep-alive session.
+
+The dirigera library opened a new connection (and TLS handshake) for every
+request. HubX sends all of its REST calls through one requests.Session with
+a bounded, blocking connection pool. Pins that every verb goes through that
+session with the hub's auth headers, that the pool is mounted as configured,
+and that pool_stats reports the requests and the pool's connections. Also
+that callers joined on one GET each get their own result.
+
+dirigera_lib_patch.py is loaded standalone with third-party imports stubbed,
+as in the other tests; requests is replaced by a recording session.
+"""
+import importlib.util
+import json
+import os
+import sys
+import types
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+class FakeResponse:
+    def __init__(self, status, payload):
+        self.status_code = status
+        self.ok = status < 400
+        self.content = b"" if payload is None else json.dumps(payload).encode()
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise ConnectionError(self.status_code)
+
+
+class FakePool:
+    def __init__(self):
+        self.num_connections = 0
+        # urllib3 keeps None placeholders for connections not opened yet
+        self.pool = types.SimpleNamespace(queue=[])
+
+
+class FakeAdapter:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.pool = FakePool()
+        self.poolmanager = types.SimpleNamespace(connection_from_url=lambda url: self.pool)
+
+
+class FakeSession:
+    instances = []
+
+    def __init__(self):
+        self.headers = {}
+        self.verify = True
+        self.mounts = {}
+        self.calls = []
+        self.routes = {}
+        self.closed = False
+        FakeSession.instances.append(self)
+
+    def mount(self, prefix, adapter):
+        self.mounts[prefix] = adapter
+
+    def request(self, method, url, json=None, timeout=None):
+        route = url.split("/v1", 1)[1]
+        self.calls.append((method, route, json, timeout))
+        pool = self.mounts["https://"].pool
+        # one connection, kept alive and reused
+        if pool.num_connections == 0:
+            pool.num_connections = 1
+            pool.pool.queue = [object(), None, None, None]
+        return FakeResponse(*self.routes.get((method, route), (200, None)))
+
+    def close(self):
+        self.closed = True
+
+
+class _Hub:
+    def __init__(self, token, ip_address, port="8443", api_version="v1"):
+        self.api_base_url = f"https://{ip_address}:{port}/{api_version}"
+        self.token = token
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+def _factory(data, client):
+    return types.SimpleNamespace(data=data, client=client, id=data["id"])
+
+
+class _Base:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+_stub("aiohttp", ClientResponseError=Exception, ClientTimeout=lambda total: total, ClientSession=object)
+_stub("requests", Session=FakeSession, Response=FakeResponse)
+_stub("requests.adapters", HTTPAdapter=FakeAdapter)
+_stub("dirigera", Hub=_Hub)
+_stub("dirigera.devices")
+_stub("dirigera.devices.device", Attributes=_Base, Device=_Base)
+_stub("dirigera.hub")
+_stub("dirigera.hub.abstract_smart_home_hub", AbstractSmartHomeHub=object)
+_stub("dirigera.devices.scene", Info=object, Icon=object, Trigger=object, TriggerDetails=object, ControllerType=object)
+_stub("dirigera.devices.outlet", Outlet=object, dict_to_outlet=_factory)
+_stub("dirigera.devices.environment_sensor", EnvironmentSensor=object, dict_to_environment_sensor=_factory)
+for _mod, _fx in (
+    ("air_purifier", "dict_to_air_purifier"),
+    ("blinds", "dict_to_blind"),
+    ("light", "dict_to_light"),
+    ("light_sensor", "dict_to_light_sensor"),
+    ("open_close_sensor", "dict_to_open_close_sensor"),
+    ("water_sensor", "dict_to_water_sensor"),
+):
+    _stub(f"dirigera.devices.{_mod}", **{_fx: _factory})
+
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "dirigera_lib_patch.py"
+)
+_spec = importlib.util.spec_from_file_location("lib_patch_session_uut", _PATH)
+lib_patch = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(lib_patch)
+HubX = lib_patch.HubX
+
+
+def test_every_verb_goes_through_one_pooled_session():
+    FakeSession.instances.clear()
+    hub = HubX("tok", "10.0.0.3")
+    session = FakeSession.instances[0]
+    session.routes[("GET", "/scenes")] = (200, [{"id": "s1"}])
+    session.routes[("POST", "/scenes/s1/trigger")] = (202, None)
+
+    assert hub.get("/scenes") == [{"id": "s1"}]
+    hub.patch("/devices/lamp_1", [{"attributes": {"isOn": True}}])
+    assert hub.post("/scenes/s1/trigger") is None
+    hub.delete("/scenes/s1")
+
+    assert len(FakeSession.instances) == 1, "no request may open a session of its own"
+    assert [c[:2] for c in session.calls] == [
+        ("GET", "/scenes"), ("PATCH", "/devices/lamp_1"), ("POST", "/scenes/s1/trigger"), ("DELETE", "/scenes/s1"),
+    ]
+    assert session.calls[1][2] == [{"attributes": {"isOn": True}}]
+    assert all(c[3] == 10 for c in session.calls)
+    assert session.headers == {"Authorization": "Bearer tok"}
+    assert session.verify is False
+
+    adapter = session.mounts["https://"]
+    assert adapter.kwargs == {"pool_connections": 1, "pool_maxsize": HubX.POOL_SIZE, "pool_block": True}
+
+    hub.close()
+    assert session.closed
+
+
+def test_pool_stats_report_requests_and_connections():
+    FakeSession.instances.clear()
+    hub = HubX("tok", "10.0.0.3")
+    session = FakeSession.instances[0]
+    session.routes[("GET", "/scenes")] = (200, [])
+    session.routes[("GET", "/devices/missing")] = (404, None)
+
+    for _ in range(3):
+        hub.get("/scenes")
+    try:
+        hub.get("/devices/missing")
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("a failed request must raise")
+
+    assert hub.pool_stats() == {
+        "pool_size": HubX.POOL_SIZE,
+        "requests": 4,
+        "connections_opened": 1,
+        "idle_connections": 1,
+        "in_flight": 0,
+        "peak_in_flight": 1,
+        "collapsed_gets": 0,
+    }
+
+
+def test_joined_gets_and_the_snapshot_do_not_share_mutable_results():
+    import threading
+
+    FakeSession.instances.clear()
+    hub = HubX("tok", "10.0.0.3")
+    session = FakeSession.instances[0]
+    session.routes[("GET", "/devices")] = (200, [{"id": "lamp_1", "type": "light", "attributes": {"isOn": True}}])
+    release = threading.Event()
+    request = session.request
+
+    def slow_request(*args, **kwargs):
+        release.wait(5)
+        return request(*args, **kwargs)
+
+    session.request = slow_request
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hub.get("/devices"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        if hub._get_flights.collapsed == 2:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(session.calls) == 1 and len(results) == 3
+    # dump_data sanitises the ids of its result in place
+    results[0][0]["id"] = 1
+    results[0][0]["attributes"]["isOn"] = False
+    assert results[1] == results[2] == [{"id": "lamp_1", "type": "light", "attributes": {"isOn": True}}]
+    assert hub.devices_snapshot.get("lamp_1")["attributes"] == {"isOn": True}
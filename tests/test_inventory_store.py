@@ -0,0 +1,142 @@
+"""
+Tests for the start from the stored hub inventory.
+
+Setup used to wait for the hub's /devices and /scenes. It now builds the
+entities from the inventory stored by the last run and marks the platform
+stale. Pins that the inventory round-trips through its Store (and that a
+missing, partial or unreadable file only costs the fast start), and the
+background refresh after such a start: retry until the hub answers, clear
+stale, store the live inventory, discover only the devices that are new
+since, then reconcile the controllers' empty scenes.
+
+inventory_store.py and the package __init__ use relative imports and are
+loaded through tests/_integration.py, with HA's Store replaced by one kept in
+memory.
+"""
+import asyncio
+import contextlib
+import types
+
+from _integration import load_integration
+
+store_module = load_integration("inventory_store")
+entry = load_integration("__init__")
+
+
+class FakeStore:
+    files = {}
+
+    def __init__(self, hass, version, key):
+        self.key = key
+
+    async def async_load(self):
+        data = FakeStore.files.get(self.key)
+        if isinstance(data, Exception):
+            raise data
+        return data
+
+    async def async_save(self, data):
+        FakeStore.files[self.key] = data
+
+    async def async_remove(self):
+        FakeStore.files.pop(self.key, None)
+
+
+def _store(monkeypatch, entry_id="entry_1"):
+    monkeypatch.setattr(store_module, "Store", FakeStore)
+    FakeStore.files.clear()
+    return store_module.inventory_store(object(), entry_id)
+
+
+def test_the_inventory_round_trips_per_entry(monkeypatch):
+    store = _store(monkeypatch)
+    other = store_module.inventory_store(object(), "entry_2")
+    devices = [{"id": "lamp_1", "type": "light"}]
+    scenes = [{"id": "scene_1"}]
+
+    assert asyncio.run(store.async_load()) is None
+    asyncio.run(store.async_save(devices, scenes))
+    loaded = asyncio.run(store.async_load())
+    assert (loaded["devices"], loaded["scenes"]) == (devices, scenes)
+    assert loaded["saved_at"] > 0
+    assert asyncio.run(other.async_load()) is None
+
+    asyncio.run(store.async_remove())
+    assert asyncio.run(store.async_load()) is None
+
+
+def test_a_partial_or_unreadable_inventory_is_ignored(monkeypatch):
+    store = _store(monkeypatch)
+    key = store._store.key
+    FakeStore.files[key] = {"devices": []}
+    assert asyncio.run(store.async_load()) is None
+    FakeStore.files[key] = ValueError("corrupt json")
+    assert asyncio.run(store.async_load()) is None
+
+
+class FakeClient:
+    BULK = "bulk"
+
+    def __init__(self, devices, scenes, failures=0):
+        self.routes = {"/devices": devices, "/scenes": scenes}
+        self.failures = failures
+        self.lanes = []
+
+    def priority(self, lane):
+        self.lanes.append(lane)
+        return contextlib.nullcontext()
+
+    async def get(self, route):
+        if self.failures and route == "/devices":
+            self.failures -= 1
+            raise ConnectionError("hub still booting")
+        return self.routes[route]
+
+
+class FakeDiscovery:
+    def __init__(self):
+        self.discovered = []
+
+    async def discover_devices(self, devices):
+        self.discovered.append([device["id"] for device in devices])
+        return len(devices)
+
+
+def test_a_stale_start_refreshes_rediscovers_and_reconciles(monkeypatch):
+    store = _store(monkeypatch)
+    stored = {"devices": [{"id": "lamp_1"}, {"id": "plug_1"}], "scenes": []}
+    live_devices = [{"id": "lamp_1"}, {"id": "plug_1"}, {"id": "blind_1"}]
+    live_scenes = [{"id": "scene_1"}, {"id": "scene_2"}]
+    client = FakeClient(live_devices, live_scenes, failures=2)
+    hub = types.SimpleNamespace(async_client=client)
+    platform = types.SimpleNamespace(stale=True, empty_scene_clicks=object())
+    discovery = FakeDiscovery()
+    order = []
+    reconciled = []
+
+    async def reconcile(hass, hub_, clicks, scenes):
+        order.append("reconcile")
+        reconciled.append((hub_, clicks, scenes))
+
+    discover = discovery.discover_devices
+
+    async def discover_devices(devices):
+        order.append("discover")
+        assert not platform.stale
+        assert FakeStore.files[store._store.key]["devices"] == live_devices
+        return await discover(devices)
+
+    discovery.discover_devices = discover_devices
+    monkeypatch.setattr(entry, "INVENTORY_RETRY_DELAY", 0)
+    monkeypatch.setattr(entry, "async_reconcile_empty_scenes", reconcile)
+    monkeypatch.setattr(entry, "HackScene", types.SimpleNamespace(make_scene=lambda hub_, scene: scene["id"]))
+
+    asyncio.run(entry._async_refresh_inventory(object(), hub, platform, store, discovery, stored))
+
+    assert client.lanes == [client.BULK] * 3, "retried until the hub answered"
+    assert platform.stale is False
+    assert FakeStore.files[store._store.key]["scenes"] == live_scenes
+    # Only the device that appeared since the stored inventory
+    assert discovery.discovered == [["blind_1"]]
+    assert order == ["discover", "reconcile"]
+    assert reconciled == [(hub, platform.empty_scene_clicks, ["scene_1", "scene_2"])]
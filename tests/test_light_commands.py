@@ -0,0 +1,173 @@
+"""
+Tests for the light command path.
+
+"On at 40% warm white over 1.5 s" used to be three sequential PATCHes. Pins
+that everything a turn_on asks for goes out as a single PATCH, with the
+transition as the hub's transitionTime next to the attributes, and how HA
+brightness (0-255) maps to the hub's lightLevel (1-100). Also that a colour
+mode switch is undone with the write that made it, and that the wait for
+the echo starts once the PATCH has been sent.
+
+light.py uses relative imports and is loaded through tests/_integration.py.
+"""
+import asyncio
+import contextlib
+import types
+
+from _integration import load_integration
+
+light = load_integration("light")
+
+HUB_KEY = "wss://hub-light-commands/v1"
+
+
+class FakeClient:
+    def __init__(self, fail=False, delay=0):
+        self.patches = []
+        self.fail = fail
+        self.delay = delay
+
+    def priority(self, lane):
+        return contextlib.nullcontext()
+
+    async def patch(self, route, data):
+        self.patches.append((route, data))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("hub does not respond")
+
+
+class FakeHub:
+    websocket_base_url = HUB_KEY
+
+    def __init__(self, client):
+        self.async_client = client
+
+
+def make_bulb(client, uid="lamp_1"):
+    json_data = types.SimpleNamespace(
+        id=uid, relation_id=None, is_reachable=True, room=None,
+        capabilities=types.SimpleNamespace(
+            can_receive=["customName", "isOn", "lightLevel", "colorTemperature", "colorHue", "colorSaturation"],
+        ),
+        attributes=types.SimpleNamespace(
+            custom_name=uid, is_on=False, light_level=10, color_temperature=4000,
+            color_temperature_min=2200, color_temperature_max=4000, color_hue=30.0, color_saturation=0.5,
+        ),
+    )
+    return light.ikea_bulb(FakeHub(client), json_data)
+
+
+def test_light_options_carry_the_transition_in_milliseconds():
+    assert light.light_options({}) == {}
+    assert light.light_options({"brightness": 10}) == {}
+    assert light.light_options({"transition": 1.5}) == {"transitionTime": 1500}
+    assert light.light_options({"transition": 0}) == {"transitionTime": 0}
+
+
+def test_to_light_level_scales_and_clamps_to_the_hub_range():
+    # HA brightness 1-2 would scale to 0, which the hub rejects
+    assert [light.to_light_level(b) for b in (0, 1, 2, 3)] == [1, 1, 1, 1]
+    assert light.to_light_level(128) == 50
+    assert light.to_light_level(255) == 100
+    assert light.to_light_level(300) == 100
+
+
+def test_brightness_colour_temperature_and_transition_go_out_as_one_patch():
+    client = FakeClient()
+    bulb = make_bulb(client)
+
+    asyncio.run(bulb.async_turn_on(brightness=102, color_temp_kelvin=2700, transition=1.5))
+
+    assert client.patches == [("/devices/lamp_1", [{
+        "attributes": {"isOn": True, "lightLevel": 40, "colorTemperature": 2700},
+        "transitionTime": 1500,
+    }])]
+    # shown at once, before the hub echoes it
+    attributes = bulb._json_data.attributes
+    assert (attributes.is_on, attributes.light_level, attributes.color_temperature) == (True, 40, 2700)
+
+
+def test_colour_and_off_commands_are_single_patches_too():
+    client = FakeClient()
+    bulb = make_bulb(client)
+
+    async def _run():
+        await bulb.async_turn_on(hs_color=(120.0, 80.0), brightness=1)
+        await bulb.async_turn_off()
+
+    asyncio.run(_run())
+    assert [data for _, data in client.patches] == [
+        [{"attributes": {"isOn": True, "lightLevel": 1, "colorHue": 120.0, "colorSaturation": 0.8}}],
+        [{"attributes": {"isOn": False}}],
+    ]
+
+
+def test_a_colour_mode_switch_is_rolled_back_with_its_write():
+    bulb = make_bulb(FakeClient(fail=True))
+    assert bulb.color_mode == "HS"
+
+    try:
+        asyncio.run(bulb.async_turn_on(color_temp_kelvin=2700))
+    except Exception:
+        pass
+    else:
+        raise AssertionError("a failed write must raise")
+
+    assert bulb.color_mode == "HS"
+    assert bulb._json_data.attributes.color_temperature == 4000
+
+
+def test_a_colour_mode_switch_without_an_echo_times_out_with_it():
+    bulb = make_bulb(FakeClient())
+    bulb._optimistic._timeout = 0.01
+
+    async def _run():
+        await bulb.async_turn_on(color_temp_kelvin=2700)
+        assert bulb.color_mode == "COLOR_TEMP"
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_run())
+    assert bulb.color_mode == "HS"
+
+    async def _confirmed():
+        await bulb.async_turn_on(color_temp_kelvin=2700)
+        assert bulb._optimistic.absorb("color_temperature", 2700)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_confirmed())
+    assert bulb.color_mode == "COLOR_TEMP"
+
+
+def test_the_echo_deadline_starts_once_the_patch_is_sent():
+    # A busy command lane or a slow hub: the PATCH takes longer than the timeout
+    client = FakeClient(delay=0.05)
+    bulb = make_bulb(client)
+    bulb._optimistic._timeout = 0.02
+    pushes = []
+    bulb._push_state = pushes.append
+
+    async def _run():
+        await bulb.async_turn_on(brightness=255)
+        assert bulb._optimistic.pending == {"is_on": True, "light_level": 100}
+        await asyncio.sleep(0.01)
+        assert bulb._optimistic.absorb("is_on", True) and bulb._optimistic.absorb("light_level", 100)
+
+    asyncio.run(_run())
+    assert bulb._optimistic.stats()["rolled_back"] == 0
+    # only the optimistic write itself, no rollback
+    assert pushes == [{"is_on", "light_level"}]
+
+
+def test_a_command_class_must_implement_the_hooks():
+    class incomplete(light.device_commands):
+        @property
+        def _command_hass(self):
+            return None
+
+    try:
+        incomplete()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("a missing _push_state must fail when instantiated")
@@ -0,0 +1,255 @@
+"""
+Tests for optimistic command state.
+
+A command writes its target into the model at once and records a pending
+expectation per attribute; the hub's echo confirms it, stale intermediate
+frames are held back, and a failed write or a missing echo rolls back. An
+echo the hub rounded confirms its target too. The
+listener test shows the multi-frame light echo (an old brightness first, then
+the target) causing no state write at all, and the blind and air purifier
+echoes confirming their writes the same way.
+
+optimistic_state.py has no third-party imports and is loaded standalone;
+hub_event_listener.py is loaded with its third-party imports stubbed, as in
+the other listener tests.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import types
+
+_DIR = os.path.join(os.path.dirname(__file__), "..", "custom_components", "dirigera_platform")
+
+
+def _load(file, name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(_DIR, file))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+optimistic_state = _load("optimistic_state.py", "optimistic_state_uut").optimistic_state
+
+
+def _stub(name, **attrs):
+    m = types.ModuleType(name)
+    for k, v in attrs.items():
+        setattr(m, k, v)
+    sys.modules[name] = m
+    return m
+
+
+_stub("websocket", WebSocketApp=object)
+_stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}))
+_dir = _stub("dirigera", Hub=object)
+_dir_dev = _stub("dirigera.devices")
+_dir_dev_device = _stub("dirigera.devices.device", Room=object)
+_stub("dirigera.devices.air_purifier", FanModeEnum=str)
+_dir.devices = _dir_dev
+_dir_dev.device = _dir_dev_device
+_ha = _stub("homeassistant")
+_ha.const = _stub("homeassistant.const", ATTR_ENTITY_ID="entity_id")
+_ha.components = _stub("homeassistant.components")
+_ha.components.light = _stub(
+    "homeassistant.components.light",
+    ColorMode=type("ColorMode", (), {"HS": "hs", "COLOR_TEMP": "color_temp"}),
+)
+_ha.helpers = _stub(
+    "homeassistant.helpers",
+    device_registry=types.ModuleType("dr"),
+    entity_registry=types.ModuleType("er"),
+    area_registry=types.ModuleType("ar"),
+)
+_ha.helpers.aiohttp_client = _stub(
+    "homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None
+)
+
+hel = _load("hub_event_listener.py", "hel_optimistic_uut")
+hub_event_listener = hel.hub_event_listener
+registry_entry = hel.registry_entry
+
+HUB_KEY = "wss://hub-optimistic/v1"
+
+
+class FakeDevice:
+    def __init__(self, uid, timeout=5.0, **attributes):
+        self.unique_id = uid
+        self._json_data = types.SimpleNamespace(
+            id=uid, relation_id=None, is_reachable=True, room=None,
+            attributes=types.SimpleNamespace(custom_name=uid, **attributes),
+        )
+        self.pushes = 0
+        self._optimistic = optimistic_state(lambda: self._json_data.attributes, self._push, timeout)
+
+    def _push(self, keys):
+        self.pushes += 1
+        self.rolled_back_keys = keys
+
+    def schedule_update_ha_state(self, force_refresh=False):
+        self.pushes += 1
+
+
+def _frame(dev_id, device_type, **attributes):
+    return json.dumps({
+        "type": "deviceStateChanged",
+        "data": {"id": dev_id, "deviceType": device_type, "attributes": attributes},
+    })
+
+
+class FakeHub:
+    websocket_base_url = HUB_KEY
+
+
+class FakeHass:
+    def async_create_task(self, coro):
+        coro.close()
+
+
+def test_multi_frame_echo_is_absorbed_without_a_state_write():
+    hub_event_listener.device_registry.clear()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    listener = hub_event_listener(FakeHub(), FakeHass(), coalesce_window=0)
+    listener._loop = loop
+    lamp = FakeDevice("lamp_1", is_on=True, light_level=10)
+    hub_event_listener.register(HUB_KEY, "lamp_1", registry_entry(lamp))
+
+    async def _command():
+        lamp._optimistic.expect({"light_level": 80})
+    loop.run_until_complete(_command())
+    assert lamp._json_data.attributes.light_level == 80
+
+    # the hub first reports a stale level, then the target, each in its own tick
+    for level in (10, 45, 80):
+        listener.on_message(None, _frame("lamp_1", "light", lightLevel=level))
+        loop.run_until_complete(asyncio.sleep(0))
+
+    assert lamp.pushes == 0
+    assert lamp._json_data.attributes.light_level == 80
+    assert lamp._optimistic.stats() == {"pending": 0, "confirmed": 1, "held": 2, "rolled_back": 0}
+
+    # once confirmed, frames apply as usual
+    listener.on_message(None, _frame("lamp_1", "light", lightLevel=30))
+    loop.run_until_complete(asyncio.sleep(0))
+    assert (lamp.pushes, lamp._json_data.attributes.light_level) == (1, 30)
+    loop.close()
+
+
+def test_cover_and_fan_echoes_confirm_their_pending_writes():
+    # Covers and fans write optimistically too: without their echoes decoded
+    # every command would roll back after OPTIMISTIC_TIMEOUT
+    hub_event_listener.device_registry.clear()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    listener = hub_event_listener(FakeHub(), FakeHass(), coalesce_window=0)
+    listener._loop = loop
+    blind = FakeDevice("blind_1", blinds_target_level=0, blinds_current_level=0)
+    purifier = FakeDevice("purifier_1", fan_mode="low", motor_state=10)
+    hub_event_listener.register(HUB_KEY, "blind_1", registry_entry(blind))
+    hub_event_listener.register(HUB_KEY, "purifier_1", registry_entry(purifier))
+
+    async def _commands():
+        blind._optimistic.expect({"blinds_target_level": 60})
+        purifier._optimistic.expect({"fan_mode": "auto", "motor_state": 25})
+    loop.run_until_complete(_commands())
+
+    listener.on_message(None, _frame("blind_1", "blinds", blindsTargetLevel=60))
+    listener.on_message(None, _frame("purifier_1", "airPurifier", fanMode="auto", motorState=25))
+    loop.run_until_complete(asyncio.sleep(0))
+
+    assert blind._optimistic.stats()["confirmed"] == 1
+    assert purifier._optimistic.stats()["confirmed"] == 2
+    assert blind._optimistic.pending == purifier._optimistic.pending == {}
+    assert (blind.pushes, purifier.pushes) == (0, 0)
+    loop.close()
+
+
+def test_failed_write_rolls_back_to_the_hub_value():
+    device = FakeDevice("plug_1", is_on=False)
+
+    async def _run():
+        device._optimistic.expect({"is_on": True})
+        assert device._json_data.attributes.is_on is True
+        device._optimistic.rollback({"is_on": True})
+
+    asyncio.run(_run())
+    assert device._json_data.attributes.is_on is False
+    assert (device.pushes, device.rolled_back_keys) == (1, {"is_on"})
+    assert device._optimistic.pending == {}
+
+
+def test_missing_echo_times_out_to_the_last_reported_value():
+    device = FakeDevice("blind_1", timeout=0.01, blinds_target_level=0)
+
+    async def _run():
+        device._optimistic.expect({"blinds_target_level": 60})
+        # a newer command keeps the original hub value to roll back to
+        device._optimistic.expect({"blinds_target_level": 70})
+        device._optimistic.sent({"blinds_target_level": 70})
+        assert device._optimistic.absorb("blinds_target_level", 20) is True
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_run())
+    assert device._json_data.attributes.blinds_target_level == 20
+    assert device.pushes == 1
+    assert device._optimistic.stats()["rolled_back"] == 1
+
+
+def test_a_transition_extends_the_deadline_of_its_own_command():
+    device = FakeDevice("lamp_1", timeout=0.01, light_level=10, is_on=True)
+
+    async def _run():
+        # a 100 ms fade, and a switch without one
+        device._optimistic.expect({"light_level": 80})
+        device._optimistic.sent({"light_level": 80}, transition=0.1)
+        device._optimistic.expect({"is_on": False})
+        device._optimistic.sent({"is_on": False})
+        await asyncio.sleep(0.05)
+        assert device._optimistic.pending == {"light_level": 80}
+        assert device._optimistic.absorb("light_level", 80) is True
+
+    asyncio.run(_run())
+    assert device._json_data.attributes.light_level == 80
+    assert device._json_data.attributes.is_on is True
+    assert device._optimistic.stats()["confirmed"] == 1
+
+
+def test_enum_targets_match_their_raw_echo_and_polls_keep_pending_values():
+    import enum
+
+    class FanMode(enum.Enum):
+        AUTO = "auto"
+
+    device = FakeDevice("fan_1", fan_mode="low", motor_state=10)
+
+    async def _run():
+        device._optimistic.expect({"fan_mode": FanMode.AUTO, "motor_state": 25})
+        # a poll answered before the hub applied the command
+        device._json_data = types.SimpleNamespace(
+            attributes=types.SimpleNamespace(fan_mode="low", motor_state=10)
+        )
+        device._optimistic.overlay()
+        assert device._json_data.attributes.motor_state == 25
+        assert device._optimistic.absorb("fan_mode", "auto") is True
+
+    asyncio.run(_run())
+    assert device._json_data.attributes.fan_mode is FanMode.AUTO
+    assert device._optimistic.pending == {"motor_state": 25}
+
+
+def test_a_rounded_echo_confirms_its_target_and_is_applied():
+    device = FakeDevice("lamp_1", color_hue=30.0, color_saturation=0.5, light_level=10)
+
+    async def _run():
+        device._optimistic.expect({"color_hue": 120.4, "color_saturation": 0.804, "light_level": 40})
+        # the hub rounds what it echoes
+        assert device._optimistic.absorb("color_hue", 120) is False
+        assert device._optimistic.absorb("color_saturation", 0.8) is False
+        # a different value is still an intermediate frame
+        assert device._optimistic.absorb("light_level", 38) is True
+
+    asyncio.run(_run())
+    assert device._optimistic.pending == {"light_level": 40}
+    assert device._optimistic.stats()["confirmed"] == 2
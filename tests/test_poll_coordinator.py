@@ -0,0 +1,184 @@
+"""
+Tests for hub_poll_coordinator, the one poll cycle per hub that replaced HA
+polling every entity.
+
+Pins that a device is polled only once it has been silent for longer than
+its threshold, or on every cycle once the WebSocket has been down past the
+grace period, and that events stop the polling again. Also that a cycle
+costs at most one /devices and one /scenes request however many devices and
+scenes it refreshes, that a cycle still running makes the next one skip, and
+that one failing device does not stop the rest. And that the hubs' cycles
+take evenly spaced phases, and that devices silent since setup fall due over
+several cycles instead of in one.
+
+poll_coordinator.py has no third-party imports and is loaded standalone.
+"""
+import asyncio
+import importlib.util
+import os
+import time
+
+_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "dirigera_platform", "poll_coordinator.py"
+)
+_spec = importlib.util.spec_from_file_location("poll_coordinator_uut", _PATH)
+poll_coordinator = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(poll_coordinator)
+hub_poll_coordinator = poll_coordinator.hub_poll_coordinator
+DISCONNECT_GRACE = poll_coordinator.DISCONNECT_GRACE
+POLL_INTERVAL = poll_coordinator.POLL_INTERVAL
+
+
+class FakeSnapshot:
+    def __init__(self, fresh):
+        self.fresh = fresh
+
+    def is_fresh(self):
+        return self.fresh
+
+
+class FakeClient:
+    def __init__(self, scenes=(), delay=0):
+        self.routes = []
+        self._scenes = list(scenes)
+        self._delay = delay
+
+    async def get(self, route):
+        self.routes.append(route)
+        await asyncio.sleep(self._delay)
+        return self._scenes if route == "/scenes" else []
+
+
+class FakeHub:
+    def __init__(self, client, fresh=False):
+        self.async_client = client
+        self.devices_snapshot = FakeSnapshot(fresh)
+
+
+class FakeDevice:
+    def __init__(self, name, silence_threshold=60, fail=False):
+        self.name = self.unique_id = name
+        self.silence_threshold = silence_threshold
+        self.last_event_at = None
+        self.fail = fail
+        self.polls = 0
+
+    async def async_poll(self):
+        if self.fail:
+            raise RuntimeError("hub_exception")
+        self.polls += 1
+
+
+class FakeScenes:
+    def __init__(self):
+        self.reconciled = None
+
+    def reconcile(self, data):
+        self.reconciled = data
+
+
+def _scene_payload(scene_id):
+    return {"id": scene_id, "info": {"name": scene_id, "icon": "scenes_arrive_home"}}
+
+
+def _age(poller, seconds):
+    # As if the poller had been set up ``seconds`` ago
+    poller._started_at -= seconds
+    for device_id in poller._polled_at:
+        poller._polled_at[device_id] -= seconds
+
+
+def test_only_devices_silent_past_their_threshold_are_polled():
+    chatty, quiet, push_only = FakeDevice("env sensor", 600), FakeDevice("water sensor", 3600), FakeDevice("remote", None)
+    client = FakeClient()
+    poller = hub_poll_coordinator(None, FakeHub(client, fresh=True), lambda: [chatty, quiet, push_only], FakeScenes(),
+                                  lambda: 0.0)
+
+    asyncio.run(poller.async_refresh())
+    assert (chatty.polls, quiet.polls) == (0, 0), "setup just loaded every device"
+
+    _age(poller, 900)
+    chatty.last_event_at = time.monotonic() - 30
+    asyncio.run(poller.async_refresh())
+    assert (chatty.polls, quiet.polls) == (0, 0), "a device that reports is left alone"
+
+    chatty.last_event_at -= 900
+    asyncio.run(poller.async_refresh())
+    asyncio.run(poller.async_refresh())
+    # polled once, then the poll counts as hearing from it
+    assert (chatty.polls, quiet.polls, push_only.polls) == (1, 0, 0)
+    # the snapshot is fresh and the stream is up: no requests at all
+    assert client.routes == []
+
+
+def test_an_outage_past_the_grace_period_polls_everything_until_the_stream_is_back():
+    devices = [FakeDevice(f"sensor {i}") for i in range(20)] + [FakeDevice("remote", None)]
+    scenes = FakeScenes()
+    down_for = [DISCONNECT_GRACE / 2]
+    client = FakeClient([_scene_payload(f"scene-{i}") for i in range(10)])
+    poller = hub_poll_coordinator(None, FakeHub(client, fresh=True), lambda: devices, scenes, lambda: down_for[0])
+
+    asyncio.run(poller.async_refresh())
+    assert client.routes == [] and sum(d.polls for d in devices) == 0, "a short reconnect is not an outage"
+
+    down_for[0] = DISCONNECT_GRACE + 1
+    asyncio.run(poller.async_refresh())
+    # no events keep the snapshot current: refetched despite its TTL, once
+    assert client.routes == ["/devices", "/scenes"]
+    assert [d.polls for d in devices] == [1] * 21
+    assert [s["id"] for s in scenes.reconciled] == [f"scene-{i}" for i in range(10)]
+
+    down_for[0] = 0.0
+    asyncio.run(poller.async_refresh())
+    assert client.routes == ["/devices", "/scenes"]
+    assert poller.stats()["outage"] is False
+
+
+def test_a_slow_cycle_makes_the_next_one_skip_and_failures_are_contained():
+    devices = [FakeDevice("purifier", fail=True), FakeDevice("blind")]
+    client = FakeClient(delay=0.02)
+    poller = hub_poll_coordinator(None, FakeHub(client), lambda: devices)
+
+    async def _run():
+        await asyncio.gather(poller.async_refresh(), poller.async_refresh())
+
+    asyncio.run(_run())
+
+    # without an event listener every cycle polls everything
+    assert client.routes == ["/devices"]
+    assert devices[1].polls == 1
+    stats = poller.stats()
+    assert (stats["cycles"], stats["skipped_cycles"], stats["failures"]) == (1, 1, 1)
+
+
+def test_hub_cycles_take_evenly_spaced_phases_and_respace_when_a_hub_leaves():
+    phases = poll_coordinator.poll_phases()
+    hubs = ["hub a", "hub b", "hub c"]
+    for hub in hubs:
+        phases.join(hub)
+    assert [phases.phase(hub) for hub in hubs] == [0.0, POLL_INTERVAL / 3, 2 * POLL_INTERVAL / 3]
+
+    phases.leave("hub b")
+    assert [phases.phase(hub) for hub in ("hub a", "hub c")] == [0.0, POLL_INTERVAL / 2]
+
+    # a cycle jittered early does not land on its own slot again
+    next_slot = poll_coordinator.next_slot
+    slot = next_slot(100.0, 10.0)
+    assert slot == 10.0 + 4 * POLL_INTERVAL
+    assert next_slot(slot - 2, 10.0, after=slot + POLL_INTERVAL / 2) == slot + POLL_INTERVAL
+
+
+def test_devices_silent_since_setup_fall_due_over_several_cycles():
+    devices = [FakeDevice(f"env sensor {i}", 600) for i in range(40)]
+    poller = hub_poll_coordinator(None, FakeHub(FakeClient(), fresh=True), lambda: devices, None, lambda: 0.0)
+
+    due = []
+    _age(poller, 600)
+    for _ in range(6):
+        before = sum(d.polls for d in devices)
+        asyncio.run(poller.async_refresh())
+        due.append(sum(d.polls for d in devices) - before)
+        _age(poller, POLL_INTERVAL)
+
+    assert sum(due) == 40, "every device falls due within its spread"
+    assert max(due) < 20
@@ -33,9 +33,11 @@ def _stub(name, **attrs):
 
 # --- stub module-level imports of hub_event_listener.py ------------------
 _stub("websocket", WebSocketApp=object)
+_stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}))
 _dir = _stub("dirigera", Hub=object)
 _dir_dev = _stub("dirigera.devices")
 _dir_dev_device = _stub("dirigera.devices.device", Room=object)
+_stub("dirigera.devices.air_purifier", FanModeEnum=str)
 _dir.devices = _dir_dev
 _dir_dev.device = _dir_dev_device
 
@@ -54,6 +56,9 @@ _ha.const = _ha_const
 _ha.components = _ha_comp
 _ha_comp.light = _ha_light
 _ha.helpers = _ha_helpers
+_ha_helpers.aiohttp_client = _stub(
+    "homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None
+)
 
 # --- load the real module standalone -------------------------------------
 asyncio.set_event_loop(asyncio.new_event_loop())  # __init__ calls get_event_loop()
@@ -128,3 +133,74 @@ def test_on_open_triggers_resync_only_on_reconnect_not_first_open():
 
     listener._on_open(None)  # reconnect = catch up missed state
     assert len(scheduled) == 1, "reconnect must schedule exactly one resync"
+
+
+def test_reconnect_invalidates_the_hub_devices_snapshot():
+    listener = _make()
+    listener._start_keepalive = lambda: None
+    listener._loop = types.SimpleNamespace(call_soon_threadsafe=lambda cb, *a: None)
+    invalidated = []
+    listener._hub.devices_snapshot = types.SimpleNamespace(invalidate=lambda: invalidated.append(True))
+
+    listener._on_open(None)
+    assert invalidated == []
+    listener._on_open(None)
+    assert invalidated == [True], "events missed while disconnected must not be served from memory"
+
+
+def test_first_open_resyncs_when_entities_came_from_the_stored_inventory():
+    listener = _make()
+    listener._start_keepalive = lambda: None
+    scheduled = []
+    listener._loop = types.SimpleNamespace(
+        call_soon_threadsafe=lambda cb, *a: scheduled.append(cb)
+    )
+    listener.resync_on_first_open()
+
+    listener._on_open(None)
+    assert len(scheduled) == 1, "stored state must be caught up on the first connect"
+    listener._on_open(None)
+    assert len(scheduled) == 2
+
+
+class FakeSceneHandler:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        return lambda data: self.calls.append((method, data))
+
+
+def test_scene_events_reach_the_scene_handler_and_reconnect_reconciles_scenes():
+    scenes = [{"id": "scene-1", "info": {"name": "Evening", "icon": "scenes_arrive_home"}}]
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    handler = FakeSceneHandler()
+    listener = hub_event_listener(FakeHub(scenes), FakeHass(), scene_handler=handler)
+    listener._call_in_loop = lambda cb: cb()
+
+    listener.on_message(None, json.dumps({"type": "sceneCreated", "data": scenes[0]}))
+    listener.on_message(None, json.dumps({"type": "sceneUpdated", "data": scenes[0]}))
+    listener.on_message(None, json.dumps({"type": "sceneDeleted", "data": {"id": "scene-1"}}))
+    assert [method for method, _ in handler.calls] == ["scene_created", "scene_updated", "scene_deleted"]
+
+    handler.calls.clear()
+    asyncio.run(listener._resync_scenes())
+    # one /scenes fetch for every scene, not one per scene
+    assert listener._hub.get_calls == ["/scenes"]
+    assert handler.calls == [("reconcile", scenes)]
+
+
+def test_listener_reports_how_long_the_socket_has_been_down():
+    listener = _make()
+    listener._start_keepalive = lambda: None
+    listener._loop = types.SimpleNamespace(call_soon_threadsafe=lambda cb, *a: None)
+    assert listener.disconnected_for() >= 0 and not listener.connected
+
+    listener._on_open(None)
+    assert (listener.connected, listener.disconnected_for()) == (True, 0.0)
+
+    listener._on_close(None, 1000, "disconnected due to inactivity")
+    first_close = listener._disconnected_at
+    listener._on_close(None, 1006, None)
+    # the outage counts from the first close
+    assert listener._disconnected_at == first_close and not listener.connected
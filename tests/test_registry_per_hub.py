@@ -31,9 +31,11 @@ def _stub(name, **attrs):
 
 
 _stub("websocket", WebSocketApp=object)
+_stub("aiohttp", WSMsgType=type("WSMsgType", (), {"TEXT": 1, "ERROR": 8}))
 _dir = _stub("dirigera", Hub=object)
 _dir_dev = _stub("dirigera.devices")
 _dir_dev_device = _stub("dirigera.devices.device", Room=object)
+_stub("dirigera.devices.air_purifier", FanModeEnum=str)
 _dir.devices = _dir_dev
 _dir_dev.device = _dir_dev_device
 _ha = _stub("homeassistant")
@@ -50,6 +52,9 @@ _ha.const = _ha_const
 _ha.components = _ha_comp
 _ha_comp.light = _ha_light
 _ha.helpers = _ha_helpers
+_ha_helpers.aiohttp_client = _stub(
+    "homeassistant.helpers.aiohttp_client", async_get_clientsession=lambda hass, verify_ssl=True: None
+)
 
 asyncio.set_event_loop(asyncio.new_event_loop())
 _PATH = os.path.join(
@@ -98,3 +103,69 @@ def test_unregister_one_hub_leaves_other_hub_intact():
     assert hub_event_listener.get_registry_entry("wss://hubA/v1", "dev1") is None
     # hub B's device must still resolve, so its events keep updating its entity
     assert hub_event_listener.get_registry_entry("wss://hubB/v1", "dev2") is eB
+
+
+class _SplitEnt:
+    def __init__(self, uid, relation_id):
+        self.unique_id = uid
+        self._json_data = types.SimpleNamespace(id=uid, relation_id=relation_id)
+
+
+def test_device_index_secondary_indexes():
+    _fresh()
+    hub = "wss://hubA/v1"
+    temp = registry_entry(_SplitEnt("env-1_1", "rel-1"))
+    hum = registry_entry(_SplitEnt("env-1_2", "rel-1"))
+    other = registry_entry(_SplitEnt("env-2_1", None))
+    for uid, entry in (("env-1_1", temp), ("env-1_2", hum), ("env-2_1", other)):
+        hub_event_listener.register(hub, uid, entry)
+
+    index = hub_event_listener.get_device_index(hub)
+    assert index.relation_members("rel-1") == [temp, hum]
+    assert index.relation_members("rel-x") == []
+    # base-id routing for an unregistered sub-device id
+    assert index.find_related("env-1_3") == "env-1_1"
+    assert index.find_related("env-9_1") is None
+
+    # rebind keeps the id in the indexes but resolves to the new entry
+    hub_event_listener.rebind(hub, "env-1_2", temp)
+    assert hub_event_listener.get_registry_entry(hub, "env-1_2") is temp
+    assert index.relation_members("rel-1") == [temp, temp]
+    # plain register never overwrites
+    hub_event_listener.register(hub, "env-1_2", other)
+    assert hub_event_listener.get_registry_entry(hub, "env-1_2") is temp
+
+
+def test_device_index_snapshot_is_stable_while_registering():
+    _fresh()
+    hub = "wss://hubA/v1"
+    hub_event_listener.register(hub, "dev1", registry_entry(_Ent("dev1")))
+    snapshot = hub_event_listener.get_device_index(hub).snapshot()
+    seen = []
+    for uid in snapshot:
+        # discovery registering mid-iteration used to raise
+        # "dictionary changed size during iteration" on a shared dict
+        hub_event_listener.register(hub, uid + "x", registry_entry(_Ent(uid + "x")))
+        seen.append(uid)
+    assert seen == ["dev1"]
+    assert "dev1x" in hub_event_listener.get_device_index(hub)
+
+
+def test_poll_cycle_gets_each_rebound_device_once():
+    # The package __init__ runs on the permissive stubs of tests/_integration.py,
+    # with its own copy of hub_event_listener
+    from _integration import load_integration
+
+    entry = load_integration("__init__")
+    listener = load_integration("hub_event_listener")
+    hub = types.SimpleNamespace(websocket_base_url="wss://hub-poll-devices/v1")
+    env = listener.registry_entry(_SplitEnt("env-1_1", "rel-1"))
+    lamp = listener.registry_entry(_SplitEnt("lamp-1", None))
+    listener.hub_event_listener.register(hub.websocket_base_url, "env-1_1", env)
+    listener.hub_event_listener.register(hub.websocket_base_url, "env-1_2", lamp)
+    listener.hub_event_listener.register(hub.websocket_base_url, "lamp-1", lamp)
+    # sensor.py points the sub-device id at the entity that shows it
+    listener.hub_event_listener.rebind(hub.websocket_base_url, "env-1_2", env)
+
+    assert entry._registered_devices(hub) == [env.entity, lamp.entity]
+    listener.hub_event_listener.unregister_hub(hub.websocket_base_url)